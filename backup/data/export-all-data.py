@@ -4,11 +4,22 @@ Comprehensive Data Export Script for Care Home Accelerator
 Exports all data from custom objects with proper field handling
 """
 
-import subprocess
-import json
+import argparse
 import os
 import sys
 
+# Shared tooling lives in scripts/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+
+import api_scheduler
+import backup_delta
+import backup_manifest
+import column_groups
+import describe_cache
+import export_checkpoint
+import org_client
+import record_export
+
 ORG_ALIAS = "your-org-alias"
 OUTPUT_DIR = "backup/data"
 
@@ -33,90 +44,175 @@ OBJECTS = [
     "BenefitManagementRecertification__c",
 ]
 
-def get_object_fields(sobject_name):
-    """Get all queryable fields for a given object"""
+# Describes are cached on disk and only re-fetched when the object changed
+DESCRIBES = describe_cache.DescribeCache(ORG_ALIAS)
+
+# Id + SystemModstamp checksum per exported object, indexed into MANIFEST.json
+CHECKSUMS = {}
+
+# Latest SystemModstamp per exported object; the next --incremental run starts there
+WATERMARKS = {}
+
+# Objects whose export failed; a full export resumes from its checkpoint on the next run
+FAILED = set()
+
+# Export every queryable field, not just the ones a restore can write (--all-fields)
+ALL_FIELDS = False
+
+def get_object_fields(sobject_name, log=print):
+    """Get the fields to export for a given object (the restorable ones unless ALL_FIELDS)"""
     try:
-        result = subprocess.run(
-            ["sf", "sobject", "describe", "--sobject", sobject_name,
-             "--target-org", ORG_ALIAS, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        data = json.loads(result.stdout)
-        fields = [f['name'] for f in data['result']['fields']
+        describe_fields = DESCRIBES.fields(sobject_name)
+        if not ALL_FIELDS:
+            return column_groups.restorable_fields(describe_fields)
+        fields = [f['name'] for f in describe_fields
                  if not f['name'].endswith('__pr') and f.get('type') != 'address']
         return fields
     except Exception as e:
-        print(f"  Error getting fields for {sobject_name}: {e}")
+        log(f"  Error getting fields for {sobject_name}: {e}")
         return None
 
-def export_object_data(sobject_name, fields):
-    """Export data for a given object"""
+def export_object_delta(sobject_name, fields, since, fmt="json", log=print):
+    """Export the records changed (or deleted) since `since` as a delta segment"""
     try:
-        # Build SOQL query
-        field_list = ", ".join(fields)
-        query = f"SELECT {field_list} FROM {sobject_name}"
-
-        # Export to JSON
-        result = subprocess.run(
-            ["sf", "data", "query", "--query", query,
-             "--target-org", ORG_ALIAS, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        data = json.loads(result.stdout)
-        records = data.get('result', {}).get('records', [])
-
-        if records:
-            # Save to file
-            output_file = os.path.join(OUTPUT_DIR, f"{sobject_name}.json")
-            with open(output_file, 'w') as f:
-                json.dump({
-                    'records': records,
-                    'totalSize': len(records),
-                    'object': sobject_name
-                }, f, indent=2)
-            print(f"  ✓ Exported {len(records)} records to {output_file}")
-            return len(records)
+        records = column_groups.iter_records(ORG_ALIAS, sobject_name, [*fields, "IsDeleted"],
+                                             where=backup_delta.changed_since_clause(since), include_deleted=True,
+                                             describe_fields=DESCRIBES.fields(sobject_name))
+
+        output_file = backup_delta.new_delta_file(sobject_name, fmt, OUTPUT_DIR)
+        watermark = record_export.HighWaterMark()
+        changed = record_export.export_records(records, output_file, sobject_name, fmt, watermark=watermark)
+        WATERMARKS[sobject_name] = watermark.value or since
+
+        # Counts and checksums in the manifest describe the backup with its deltas applied
+        checksum = backup_manifest.backup_checksum(sobject_name, OUTPUT_DIR)
+        CHECKSUMS[sobject_name] = checksum.hexdigest()
+        if changed:
+            log(f"  ✓ {changed} changed records since {since} → {output_file}")
         else:
-            print(f"  ⊘ No records found for {sobject_name}")
+            log(f"  ⊘ No changes since {since}")
+        return checksum.count
+
+    except Exception as e:
+        FAILED.add(sobject_name)
+        log(f"  ✗ Error exporting {sobject_name}: {e}")
+        return 0
+
+def export_object_data(sobject_name, fields, fmt="json", log=print, restart=False):
+    """Export data for a given object, checkpointing each page so a failed run can resume"""
+    try:
+        output_file = os.path.join(OUTPUT_DIR, f"{sobject_name}.{fmt}")
+        checksum = record_export.RecordChecksum()
+        watermark = record_export.HighWaterMark()
+        count = export_checkpoint.export_resumable(ORG_ALIAS, sobject_name, fields, output_file, fmt,
+                                                   checksum=checksum, watermark=watermark,
+                                                   restart=restart, log=log,
+                                                   describe_fields=DESCRIBES.fields(sobject_name))
+        CHECKSUMS[sobject_name] = checksum.hexdigest()
+        WATERMARKS[sobject_name] = watermark.value
+        # A full export replaces the base file, so earlier deltas no longer apply
+        backup_delta.clear_deltas(sobject_name, OUTPUT_DIR)
+
+        if count:
+            log(f"  ✓ Exported {count} records to {output_file}")
+            return count
+        else:
+            log(f"  ⊘ No records found for {sobject_name}")
             return 0
 
     except Exception as e:
-        print(f"  ✗ Error exporting {sobject_name}: {e}")
+        FAILED.add(sobject_name)
+        log(f"  ✗ Error exporting {sobject_name}: {e}")
+        log(f"    Progress is checkpointed; rerun to resume {sobject_name}")
+        return 0
+
+def export_object(sobject_name, fmt="json", log=print, since=None, restart=False):
+    """Describe and export one object; returns the number of records in its backup
+
+    With `since` (the object's high water mark) only the changes are exported,
+    as long as the object already has a base file in the same format.
+    """
+    fields = get_object_fields(sobject_name, log)
+    if not fields:
+        FAILED.add(sobject_name)
         return 0
+    base = backup_delta.base_file(sobject_name, OUTPUT_DIR)
+    if since and base and base.endswith(f".{fmt}"):
+        return export_object_delta(sobject_name, fields, since, fmt, log)
+    return export_object_data(sobject_name, fields, fmt, log, restart)
 
 def main():
+    parser = argparse.ArgumentParser(description="Export custom object data from the org")
+    parser.add_argument("--format", choices=record_export.FORMATS, default="json",
+                        help="json: one indented document per object (default); "
+                             "ndjson: one record per line; "
+                             "columnar: compressed column chunks, about 30x smaller")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Export up to N objects concurrently (default: 1)")
+    parser.add_argument("--refresh-describes", action="store_true",
+                        help="Ignore the describe cache and fetch every describe again")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only export records changed since the last export (high water marks in "
+                             "MANIFEST.json), as delta segments; fold them in with scripts/backup_delta.py")
+    parser.add_argument("--all-fields", action="store_true",
+                        help="Also export fields a restore can't write (formulas, auto-numbers, audit fields)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the checkpoints of an interrupted export and start every object again")
+    parser.add_argument("--api-headroom", type=float, default=api_scheduler.HEADROOM * 100, metavar="PCT",
+                        help="Share of the org's daily API limits to leave unused (default: %(default).0f)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Do not update record counts and checksums in backup/MANIFEST.json")
+    args = parser.parse_args()
+    org_client.connect(ORG_ALIAS).scheduler.headroom = args.api_headroom / 100
+    DESCRIBES.refresh = args.refresh_describes
+    global ALL_FIELDS
+    ALL_FIELDS = args.all_fields
+
     print("=" * 60)
     print("Care Home Accelerator - Data Export")
     print("=" * 60)
     print(f"Org: {ORG_ALIAS}")
-    print(f"Output: {OUTPUT_DIR}")
+    print(f"Output: {OUTPUT_DIR} ({args.format})")
     print()
 
-    total_records = 0
-    successful_exports = 0
-
-    for sobject in OBJECTS:
-        print(f"Processing {sobject}...")
-        fields = get_object_fields(sobject)
+    pending = export_checkpoint.pending_exports(OUTPUT_DIR)
+    if pending and not args.restart:
+        print(f"Resuming interrupted exports: {', '.join(pending)}")
+        print()
 
-        if fields:
-            count = export_object_data(sobject, fields)
-            total_records += count
-            if count > 0:
-                successful_exports += 1
+    # One query revalidates every cached describe before the objects are exported
+    DESCRIBES.revalidate(OBJECTS)
 
+    watermarks = {}
+    if args.incremental:
+        watermarks = backup_manifest.high_water_marks(backup_manifest.load_manifest())
+        print(f"Incremental: {len(watermarks)} objects have a high water mark")
         print()
 
+    counts = record_export.run_per_object(
+        OBJECTS, lambda sobject, log: export_object(sobject, args.format, log, watermarks.get(sobject), args.restart),
+        args.parallel)
+    total_records = sum(counts.values())
+    successful_exports = sum(1 for count in counts.values() if count > 0)
+
+    if args.parallel > 1:
+        print()
     print("=" * 60)
     print(f"Export Complete!")
+    record_export.print_object_counts(counts)
     print(f"Objects exported: {successful_exports}/{len(OBJECTS)}")
     print(f"Total records: {total_records}")
+    print(f"API: {org_client.connect(ORG_ALIAS).scheduler.summary()}")
+    if not args.no_manifest:
+        manifest = backup_manifest.load_manifest()
+        backup_manifest.update_data_index(manifest, counts, CHECKSUMS, WATERMARKS)
+        backup_manifest.save_manifest(manifest)
+        print(f"Indexed counts and checksums in {os.path.relpath(backup_manifest.MANIFEST_FILE, backup_manifest.REPO_ROOT)}")
+    if FAILED:
+        print(f"Failed: {', '.join(sorted(FAILED))} (rerun to resume; --restart starts over)")
     print("=" * 60)
+    if FAILED:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
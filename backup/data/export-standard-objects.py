@@ -4,9 +4,17 @@ Export Standard Object Data
 Exports Account, Contact, and other standard objects
 """
 
-import subprocess
-import json
+import argparse
 import os
+import sys
+
+# Shared tooling lives in scripts/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+
+import api_scheduler
+import export_checkpoint
+import org_client
+import record_export
 
 ORG_ALIAS = "your-org-alias"
 OUTPUT_DIR = "backup/data/standard"
@@ -38,53 +46,61 @@ STANDARD_OBJECTS = {
     ],
 }
 
-def export_object(sobject_name, fields):
-    """Export data for a standard object"""
-    try:
-        field_list = ", ".join(fields)
-        query = f"SELECT {field_list} FROM {sobject_name} LIMIT 2000"
-
-        result = subprocess.run(
-            ["sf", "data", "query", "--query", query,
-             "--target-org", ORG_ALIAS, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+# Objects whose export failed; they resume from their checkpoint on the next run
+FAILED = set()
 
-        data = json.loads(result.stdout)
-        records = data.get('result', {}).get('records', [])
+def export_object(sobject_name, fields, fmt="json", log=print, restart=False):
+    """Export data for a standard object, checkpointing each page so a failed run can resume"""
+    try:
+        output_file = os.path.join(OUTPUT_DIR, f"{sobject_name}.{fmt}")
+        count = export_checkpoint.export_resumable(ORG_ALIAS, sobject_name, fields, output_file, fmt,
+                                                   restart=restart, log=log)
 
-        if records:
-            output_file = os.path.join(OUTPUT_DIR, f"{sobject_name}.json")
-            with open(output_file, 'w') as f:
-                json.dump({
-                    'records': records,
-                    'totalSize': len(records),
-                    'object': sobject_name
-                }, f, indent=2)
-            print(f"  ✓ Exported {len(records)} {sobject_name} records")
-            return len(records)
+        if count:
+            log(f"  ✓ Exported {count} {sobject_name} records")
+            return count
         else:
-            print(f"  ⊘ No {sobject_name} records found")
+            log(f"  ⊘ No {sobject_name} records found")
             return 0
 
     except Exception as e:
-        print(f"  ✗ Error exporting {sobject_name}: {e}")
+        FAILED.add(sobject_name)
+        log(f"  ✗ Error exporting {sobject_name}: {e}")
+        log(f"    Progress is checkpointed; rerun to resume {sobject_name}")
         return 0
 
 def main():
+    parser = argparse.ArgumentParser(description="Export standard object data from the org")
+    parser.add_argument("--format", choices=record_export.FORMATS, default="json",
+                        help="json: one indented document per object (default); "
+                             "ndjson: one record per line; "
+                             "columnar: compressed column chunks, about 30x smaller")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Export up to N objects concurrently (default: 1)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the checkpoints of an interrupted export and start every object again")
+    parser.add_argument("--api-headroom", type=float, default=api_scheduler.HEADROOM * 100, metavar="PCT",
+                        help="Share of the org's daily API limits to leave unused (default: %(default).0f)")
+    args = parser.parse_args()
+    org_client.connect(ORG_ALIAS).scheduler.headroom = args.api_headroom / 100
+
     print("Exporting Standard Object Data...")
     print()
 
-    total = 0
-    for sobject, fields in STANDARD_OBJECTS.items():
-        print(f"Exporting {sobject}...")
-        count = export_object(sobject, fields)
-        total += count
-        print()
+    counts = record_export.run_per_object(
+        list(STANDARD_OBJECTS),
+        lambda sobject, log: export_object(sobject, STANDARD_OBJECTS[sobject], args.format, log, args.restart),
+        args.parallel, verb="Exporting")
+    total = sum(counts.values())
 
+    if args.parallel > 1:
+        print()
+        record_export.print_object_counts(counts)
     print(f"Total standard object records exported: {total}")
+    print(f"API: {org_client.connect(ORG_ALIAS).scheduler.summary()}")
+    if FAILED:
+        print(f"Failed: {', '.join(sorted(FAILED))} (rerun to resume; --restart starts over)")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -4,22 +4,28 @@ Deployment Validation Script
 Validates that a deployment matches the backup
 """
 
-import subprocess
-import json
+import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Shared tooling lives in scripts/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+
+import api_scheduler
+import backup_delta
+import backup_manifest
+import describe_cache
+import org_client
+import record_export
+
+BACKUP_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
 
 def get_installed_packages(org_alias):
     """Get installed packages from an org"""
     try:
-        result = subprocess.run(
-            ["sf", "package", "installed", "list", "--target-org", org_alias, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        data = json.loads(result.stdout)
-        return {pkg['SubscriberPackageName']: pkg['SubscriberPackageVersionNumber']
-                for pkg in data.get('result', [])}
+        return org_client.connect(org_alias).installed_packages()
     except Exception as e:
         print(f"Error getting packages: {e}")
         return {}
@@ -27,78 +33,149 @@ def get_installed_packages(org_alias):
 def get_custom_objects(org_alias):
     """Get custom objects from an org"""
     try:
-        result = subprocess.run(
-            ["sf", "sobject", "list", "--sobject-type", "custom",
-             "--target-org", org_alias, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        data = json.loads(result.stdout)
-        return set(data.get('result', []))
+        return {obj['name'] for obj in org_client.connect(org_alias).sobjects() if obj.get('custom')}
     except Exception as e:
         print(f"Error getting custom objects: {e}")
         return set()
 
-def count_records(org_alias, sobject):
-    """Count records in an object"""
+def get_record_counts(org_alias, sobjects):
+    """Record counts for all objects from the limits/recordCount resource (one request).
+
+    The counts come from storage statistics, which Salesforce refreshes
+    periodically, so they can lag a load that has just finished.
+    """
+    names = ",".join(sorted(sobjects))
     try:
-        result = subprocess.run(
-            ["sf", "data", "query", "--query", f"SELECT COUNT() FROM {sobject}",
-             "--target-org", org_alias, "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        data = json.loads(result.stdout)
-        return data.get('result', {}).get('totalSize', 0)
-    except Exception:
+        data = org_client.connect(org_alias).get(f"limits/recordCount?sObjects={names}")
+    except Exception as e:
+        print(f"Error getting record counts: {e}")
+        return {}
+    counts = {entry['name']: entry['count'] for entry in data.get('sObjects', [])}
+    # Objects without records are left out of the response
+    return {obj: counts.get(obj, 0) for obj in sobjects}
+
+def get_exact_record_counts(org_alias, sobjects):
+    """Exact COUNT() for all objects in one composite batch request (25 subrequests per batch)"""
+    sobjects = list(sobjects)
+    counts = {}
+    for start in range(0, len(sobjects), record_export.COMPOSITE_BATCH_LIMIT):
+        chunk = sobjects[start:start + record_export.COMPOSITE_BATCH_LIMIT]
+        requests = [{"method": "GET",
+                     "url": f"v{record_export.API_VERSION}/query?q={quote(f'SELECT COUNT() FROM {obj}')}"}
+                    for obj in chunk]
+        try:
+            results = org_client.connect(org_alias).composite_batch(requests)
+        except Exception as e:
+            print(f"Error getting record counts: {e}")
+            results = []
+        for i, obj in enumerate(chunk):
+            result = results[i] if i < len(results) else {}
+            ok = result.get('statusCode') == 200
+            counts[obj] = result.get('result', {}).get('totalSize', 0) if ok else 0
+    return counts
+
+def backup_field_names(sobject):
+    """Field names present in the backed-up records of an object"""
+    path = backup_delta.base_file(sobject, BACKUP_DATA_DIR)
+    if path is None:
+        return None
+    for record in record_export.read_records(path):
+        return {name for name in record if name != 'attributes'}
+    return set()
+
+def validate_fields(target_org, sobjects):
+    """Check that every field in the backup data exists in the target org; returns missing count"""
+    describes = describe_cache.DescribeCache(target_org)
+    describes.revalidate(sobjects)
+    missing_total = 0
+    for obj in sobjects:
+        expected = backup_field_names(obj)
+        if expected is None:
+            print(f"  ⊘ {obj}: no backup data")
+            continue
+        try:
+            deployed = {f['name'] for f in describes.fields(obj)}
+        except Exception as e:
+            print(f"  ✗ {obj}: describe failed ({e})")
+            missing_total += len(expected)
+            continue
+        missing = sorted(expected - deployed)
+        missing_total += len(missing)
+        if missing:
+            print(f"  ⚠ {obj}: missing {', '.join(missing)}")
+        else:
+            print(f"  ✓ {obj}: {len(expected)} fields")
+    return missing_total
+
+def org_checksum(org_alias, sobject):
+    """RecordChecksum of the org's records, streamed page by page"""
+    soql = f"SELECT {', '.join(record_export.CHECKSUM_FIELDS)} FROM {sobject}"
+    return record_export.RecordChecksum().update(record_export.iter_records(org_alias, soql))
+
+def diff_records(org_alias, sobject):
+    """(missing, changed, extra) record counts between the backup (deltas applied) and the org"""
+    backup = {r['Id']: r.get('SystemModstamp')
+              for r in backup_delta.read_backup(sobject, BACKUP_DATA_DIR, record_export.CHECKSUM_FIELDS)}
+    changed = extra = 0
+    soql = f"SELECT {', '.join(record_export.CHECKSUM_FIELDS)} FROM {sobject}"
+    for record in record_export.iter_records(org_alias, soql):
+        if record['Id'] not in backup:
+            extra += 1
+        elif backup.pop(record['Id']) != record.get('SystemModstamp'):
+            changed += 1
+    return len(backup), changed, extra
+
+def validate_checksums(target_org, sobject, expected, log=print):
+    """Compare one object's Id/SystemModstamp checksum with the backup; returns mismatched records"""
+    has_backup = (backup_delta.base_file(sobject, BACKUP_DATA_DIR) is not None
+                  or bool(backup_delta.delta_files(sobject, BACKUP_DATA_DIR)))
+    if expected is None:
+        if not has_backup:
+            log(f"  ⊘ {sobject}: no backup checksum")
+            return 0
+        expected = backup_manifest.backup_checksum(sobject, BACKUP_DATA_DIR).hexdigest()
+
+    actual = org_checksum(target_org, sobject)
+    if actual.hexdigest() == expected:
+        log(f"  ✓ {sobject}: {actual.count} records match the backup")
         return 0
+    if not has_backup:
+        log(f"  ⚠ {sobject}: checksum differs ({actual.count} records), no backup file to compare")
+        return max(actual.count, 1)
+
+    # Only a mismatching object costs a second, itemised pass
+    missing, changed, extra = diff_records(target_org, sobject)
+    log(f"  ⚠ {sobject}: {missing} missing, {changed} changed, {extra} not in backup")
+    return missing + changed + extra
 
-def validate_deployment(target_org):
-    """Validate a deployment against expected configuration"""
+def validate_deployment(target_org, check_fields=False, estimated_counts=False, deep=False,
+                        parallel=4, manifest_file=backup_manifest.MANIFEST_FILE):
+    """Validate a deployment against the backup manifest"""
 
     print("=" * 70)
     print("Care Home Accelerator - Deployment Validation")
     print("=" * 70)
     print(f"Target Org: {target_org}\n")
 
-    # Expected configuration from backup
-    EXPECTED_PACKAGES = {
-        "QLabs_Utilities": "1.193.0.1",
-        "Salesforce - Postspin DevOps": "1.6.0.1",
-        "Time Warp": "1.15.0.1",
-        "XDO Automation": "2.11.0.1",
-        "Sales Insights": "1.0.0.1",
-        "Nintex DocGen": "20.22.1.1",
-        "Data Tool": "1.31.0.1",
-        "b2bmaIntegration": "1.7.0.2"
-    }
-
-    EXPECTED_OBJECTS = {
-        'Assessment__c', 'Property__c', 'Room__c', 'Room_Occupancy__c',
-        'Resident__c', 'Resident_Assessment__c', 'Resident_Preference__c',
-        'Preference__c', 'Payment__c', 'Survey__c', 'Survey_Response__c',
-        'Contract__c', 'BenefitManagementRecertification__c', 'Room_Feature__c'
-    }
-
-    EXPECTED_DATA_COUNTS = {
-        'Property__c': 22,
-        'Room__c': 216,
-        'Room_Occupancy__c': 295,
-        'Resident__c': 1,
-        'Resident_Assessment__c': 6,
-        'Resident_Preference__c': 17,
-        'Preference__c': 12,
-        'Assessment__c': 5,
-        'Survey__c': 15,
-        'Survey_Response__c': 3
-    }
+    # Expected configuration from the backup manifest
+    manifest = backup_manifest.load_manifest(manifest_file)
+    EXPECTED_PACKAGES = backup_manifest.expected_packages(manifest)
+    EXPECTED_OBJECTS = backup_manifest.expected_objects(manifest)
+    EXPECTED_DATA_COUNTS = backup_manifest.expected_counts(manifest)
+
+    # The three org queries are independent; run them together
+    fetch_counts = get_record_counts if estimated_counts else get_exact_record_counts
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        packages_future = pool.submit(get_installed_packages, target_org)
+        objects_future = pool.submit(get_custom_objects, target_org)
+        counts_future = pool.submit(fetch_counts, target_org, EXPECTED_DATA_COUNTS)
+    installed_packages = packages_future.result()
+    deployed_objects = objects_future.result()
+    record_counts = counts_future.result()
 
     # Validate packages
     print("📦 Validating Managed Packages...")
     print("-" * 70)
-    installed_packages = get_installed_packages(target_org)
 
     all_packages_ok = True
     for pkg_name, expected_version in EXPECTED_PACKAGES.items():
@@ -121,7 +198,6 @@ def validate_deployment(target_org):
     # Validate custom objects
     print("🏗️  Validating Custom Objects...")
     print("-" * 70)
-    deployed_objects = get_custom_objects(target_org)
 
     missing_objects = EXPECTED_OBJECTS - deployed_objects
     extra_objects = deployed_objects - EXPECTED_OBJECTS
@@ -145,7 +221,7 @@ def validate_deployment(target_org):
 
     for obj, expected_count in EXPECTED_DATA_COUNTS.items():
         if obj in deployed_objects:
-            actual_count = count_records(target_org, obj)
+            actual_count = record_counts.get(obj, 0)
             total_actual += actual_count
 
             if actual_count >= expected_count * 0.9:  # Allow 10% variance
@@ -162,6 +238,34 @@ def validate_deployment(target_org):
     else:
         print("⚠️  Data import may be incomplete\n")
 
+    missing_fields = 0
+    if check_fields:
+        print("🔎 Validating Fields...")
+        print("-" * 70)
+        missing_fields = validate_fields(
+            target_org, sorted(obj for obj in EXPECTED_DATA_COUNTS if obj in deployed_objects))
+        if not missing_fields:
+            print("\n✅ All backed-up fields exist in the target org\n")
+        else:
+            print(f"\n⚠️  {missing_fields} backed-up fields missing in the target org\n")
+
+    mismatched_records = 0
+    if deep:
+        print("🧬 Validating Record Checksums...")
+        print("-" * 70)
+        checksums = backup_manifest.expected_checksums(manifest)
+        checked = [obj for obj in EXPECTED_DATA_COUNTS if obj in deployed_objects]
+        results = record_export.run_per_object(
+            checked, lambda obj, log: validate_checksums(target_org, obj, checksums.get(obj), log),
+            parallel, verb='Checking')
+        mismatched_records = sum(results.values())
+        if parallel > 1:
+            print()
+        if not mismatched_records:
+            print("✅ All records match the backup\n")
+        else:
+            print(f"⚠️  {mismatched_records} records differ from the backup\n")
+
     # Summary
     print("=" * 70)
     print("VALIDATION SUMMARY")
@@ -174,6 +278,10 @@ def validate_deployment(target_org):
         issues.append("- Some custom objects not deployed")
     if total_actual < total_expected * 0.8:
         issues.append("- Data import appears incomplete")
+    if missing_fields:
+        issues.append("- Some backed-up fields are missing in the target org")
+    if mismatched_records:
+        issues.append("- Some records differ from the backup (missing, changed or extra)")
 
     if not issues:
         print("✅ All validation checks passed!")
@@ -186,8 +294,24 @@ def validate_deployment(target_org):
         return 1
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python3 validate-deployment.py <target-org-alias>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validate a deployment against the backup")
+    parser.add_argument("target_org")
+    parser.add_argument("--check-fields", action="store_true",
+                        help="Also check that every backed-up field exists in the org (uses the describe cache)")
+    parser.add_argument("--estimated-counts", action="store_true",
+                        help="Read record counts from the recordCount resource (one request) instead of COUNT() "
+                             "queries; its storage statistics can lag a recent load")
+    parser.add_argument("--deep", action="store_true",
+                        help="Compare Id/SystemModstamp checksums of every object with the backup "
+                             "(meaningful when record Ids are preserved, e.g. a refreshed sandbox)")
+    parser.add_argument("--parallel", type=int, default=4, metavar="N",
+                        help="Objects checked concurrently in --deep mode (default: 4)")
+    parser.add_argument("--api-headroom", type=float, default=api_scheduler.HEADROOM * 100, metavar="PCT",
+                        help="Share of the org's daily API limits to leave unused (default: %(default).0f)")
+    parser.add_argument("--manifest", default=backup_manifest.MANIFEST_FILE,
+                        help="Backup manifest with the expected packages, objects and counts")
+    args = parser.parse_args()
+    org_client.connect(args.target_org).scheduler.headroom = args.api_headroom / 100
 
-    sys.exit(validate_deployment(sys.argv[1]))
+    sys.exit(validate_deployment(args.target_org, args.check_fields, args.estimated_counts, args.deep,
+                                 args.parallel, args.manifest))
@@ -1,7 +1,7 @@
 #!/bin/bash
 #===============================================================================
 # Care Home Accelerator - Data Loading Script
-# Loads exported data into target org in correct dependency order
+# Loads exported data into target org in dependency order, one tier at a time
 #
 # Usage: ./load-data.sh <target_alias> [--dry-run]
 #        target_alias: Required SF org alias
@@ -135,101 +135,70 @@ upsert_records() {
 }
 
 #------------------------------------------------------------------------------
-# Phase 1: Reference Data
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 1/9] Loading reference data...${NC}"
-
-load_records "${DATA_DIR}/01-reference-data/preferences.json" "Preference__c" "Preferences"
-load_records "${DATA_DIR}/01-reference-data/assessment-types.json" "Assessment__c" "Assessment Types"
-load_records "${DATA_DIR}/01-reference-data/products.json" "Product2" "Products"
-
-echo -e "${GREEN}Phase 1 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 2: Properties
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 2/9] Loading properties...${NC}"
-
-load_records "${DATA_DIR}/02-properties/properties.json" "Property__c" "Properties"
-
-echo -e "${GREEN}Phase 2 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 3: Rooms
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 3/9] Loading rooms...${NC}"
-
-load_records "${DATA_DIR}/03-rooms/rooms.json" "Room__c" "Rooms"
-
-echo -e "${GREEN}Phase 3 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 4: Accounts & Contacts
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 4/9] Loading accounts & contacts...${NC}"
-
-load_records "${DATA_DIR}/04-accounts-contacts/accounts.json" "Account" "Accounts"
-load_records "${DATA_DIR}/04-accounts-contacts/contacts.json" "Contact" "Contacts"
-
-echo -e "${GREEN}Phase 4 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 5: Residents
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 5/9] Loading residents...${NC}"
-
-load_records "${DATA_DIR}/05-residents/residents.json" "Resident__c" "Residents"
-load_records "${DATA_DIR}/05-residents/resident-preferences.json" "Resident_Preference__c" "Resident Preferences"
-
-echo -e "${GREEN}Phase 5 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 6: Assessments
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 6/9] Loading assessments...${NC}"
-
-load_records "${DATA_DIR}/06-assessments/resident-assessments.json" "Resident_Assessment__c" "Resident Assessments"
-
-echo -e "${GREEN}Phase 6 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 7: Room Occupancy
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 7/9] Loading room occupancy...${NC}"
-
-load_records "${DATA_DIR}/07-occupancy/room-occupancy.json" "Room_Occupancy__c" "Room Occupancy Records"
-
-echo -e "${GREEN}Phase 7 complete${NC}"
-echo ""
-
-#------------------------------------------------------------------------------
-# Phase 8: Opportunities & Enquiries
+# Load Plan
+#
+# Tiers come from scripts/load_planner.py, which sorts the objects by their
+# lookup/master-detail references. Objects in the same tier don't depend on
+# each other and load concurrently; each load writes to its own log, shown
+# once the tier is done.
 #------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 8/9] Loading opportunities & enquiries...${NC}"
-
-load_records "${DATA_DIR}/08-opportunities/enquiries.json" "Enquiry__c" "Enquiries"
-load_records "${DATA_DIR}/08-opportunities/opportunities.json" "Opportunity" "Opportunities"
+PLAN=$(python3 "${SCRIPT_DIR}/../../scripts/load_planner.py" --format tsv) || {
+    echo -e "${RED}Error: Could not plan the load order${NC}"
+    exit 1
+}
+TIER_COUNT=$(echo "${PLAN}" | tail -n 1 | cut -f 1)
+
+# Objects in a reference cycle have lookups (the plan's last column) that
+# can only be set once the other side exists. sf data import tree can't
+# leave them out and patch them afterwards, so such loads are handed to
+# scripts/data_loader.py, which maps old Ids to new ones and sets the
+# deferred lookups in a second pass.
+CYCLIC_OBJECTS=$(echo "${PLAN}" | awk -F '\t' '$5 != "" { print $2 }' | paste -sd ' ' -)
+if [ -n "${CYCLIC_OBJECTS}" ]; then
+    echo -e "${YELLOW}Reference cycle in ${CYCLIC_OBJECTS}; loading with scripts/data_loader.py${NC}"
+    echo ""
+    LOADER_ARGS=(--target-org "${ORG_ALIAS}" --data-dir "${DATA_DIR}")
+    if [ "${DRY_RUN}" == "--dry-run" ]; then
+        LOADER_ARGS+=(--dry-run)
+    fi
+    exec python3 "${SCRIPT_DIR}/../../scripts/data_loader.py" "${LOADER_ARGS[@]}"
+fi
 
-echo -e "${GREEN}Phase 8 complete${NC}"
-echo ""
+LOG_DIR="${MAPPING_DIR}/logs"
+mkdir -p "${LOG_DIR}"
+
+load_tier() {
+    local TIER=$1
+    local PIDS=()
+    local OBJECTS=()
+
+    while IFS=$'\t' read -r ROW_TIER OBJECT FILE DESCRIPTION DEFERRED; do
+        [ "${ROW_TIER}" == "${TIER}" ] || continue
+        load_records "${DATA_DIR}/${FILE}" "${OBJECT}" "${DESCRIPTION}" > "${LOG_DIR}/${OBJECT}.log" 2>&1 &
+        PIDS+=($!)
+        OBJECTS+=("${OBJECT}")
+    done <<< "${PLAN}"
+
+    local FAILED=0
+    for i in "${!PIDS[@]}"; do
+        wait "${PIDS[$i]}" || FAILED=1
+        cat "${LOG_DIR}/${OBJECTS[$i]}.log"
+    done
+    return ${FAILED}
+}
 
-#------------------------------------------------------------------------------
-# Phase 9: Surveys & Contracts
-#------------------------------------------------------------------------------
-echo -e "${BLUE}[Phase 9/9] Loading surveys & contracts...${NC}"
+for TIER in $(seq 1 "${TIER_COUNT}"); do
+    TIER_OBJECTS=$(echo "${PLAN}" | awk -F '\t' -v tier="${TIER}" '$1 == tier { print $2 }' | paste -sd ' ' -)
+    echo -e "${BLUE}[Tier ${TIER}/${TIER_COUNT}] Loading ${TIER_OBJECTS}...${NC}"
 
-load_records "${DATA_DIR}/09-surveys/surveys.json" "Survey__c" "Surveys"
-load_records "${DATA_DIR}/09-surveys/survey-responses.json" "Survey_Response__c" "Survey Responses"
-load_records "${DATA_DIR}/09-surveys/contracts.json" "Contract__c" "Contracts"
+    load_tier "${TIER}" || {
+        echo -e "${RED}Error: Tier ${TIER} failed${NC}"
+        exit 1
+    }
 
-echo -e "${GREEN}Phase 9 complete${NC}"
-echo ""
+    echo -e "${GREEN}Tier ${TIER} complete${NC}"
+    echo ""
+done
 
 #------------------------------------------------------------------------------
 # Summary
@@ -0,0 +1,181 @@
+"""
+API-limit-aware concurrency for calls to an org.
+
+Every OrgClient request takes a slot from the client's ApiScheduler, which
+keeps the scripts from draining the org's daily allocation or tripping its
+concurrent request limits while real users are working in it:
+
+- Budget: the org's limits (/limits: DailyApiRequests, DailyBulkApiBatches,
+  ...) are read before the first call and every LIMITS_INTERVAL seconds
+  after; the `Sforce-Limit-Info: api-usage=n/max` header of each response
+  keeps DailyApiRequests current in between. A call that would eat into the
+  reserved headroom (HEADROOM of each limit's maximum) raises ApiLimitError
+  instead of being sent.
+- Concurrency: at most `window` requests are in flight. The window grows by
+  about one for every window's worth of fast responses (additive increase)
+  and is halved when a response is slower than TARGET_LATENCY, the org
+  answers 503, or it reports REQUEST_LIMIT_EXCEEDED for concurrent requests
+  (multiplicative decrease). Like TCP, only requests sent after the last
+  decrease can trigger the next one, so a burst of rejections halves the
+  window once.
+
+Callers can run as many worker threads as they like (--parallel); the
+scheduler decides how many of their requests reach the org at once.
+
+    client = org_client.connect('my-org')
+    client.scheduler.headroom = 0.3              # keep 30% of every limit
+    client.scheduler.reserve('DailyBulkApiBatches')
+    print(client.scheduler.summary())
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Share of each daily limit left for the org's users and integrations
+HEADROOM = 0.2
+MIN_CONCURRENCY = 1
+INITIAL_CONCURRENCY = 2
+MAX_CONCURRENCY = 16
+# Responses slower than this (seconds) are taken as a sign of congestion
+TARGET_LATENCY = 10.0
+LIMITS_INTERVAL = 300
+# Limits shown by summary(); any limit /limits reports can be reserved
+WATCHED_LIMITS = ('DailyApiRequests', 'DailyBulkApiBatches')
+
+_API_USAGE = re.compile(r'api-usage=(\d+)/(\d+)')
+
+
+class ApiLimitError(Exception):
+    pass
+
+
+class ApiScheduler:
+    def __init__(self, fetch_limits=None, headroom=HEADROOM, min_concurrency=MIN_CONCURRENCY,
+                 initial_concurrency=INITIAL_CONCURRENCY, max_concurrency=MAX_CONCURRENCY,
+                 target_latency=TARGET_LATENCY, limits_interval=LIMITS_INTERVAL):
+        self.fetch_limits = fetch_limits
+        self.headroom = headroom
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.limits_interval = limits_interval
+        self.window = float(initial_concurrency)
+        # {limit name: {'Max': n, 'Remaining': n}}, as /limits reports them
+        self.limits = {}
+        self.requests = 0
+        self.throttled = 0
+        self.peak = 0
+        self._in_flight = 0
+        # Bumped by every decrease; a slot remembers the epoch it started in
+        self._epoch = 0
+        self._limits_fetched = None
+        self._cond = threading.Condition()
+        self._limits_lock = threading.Lock()
+
+    # --- Budget -----------------------------------------------------------
+
+    def refresh_limits(self, force=False):
+        """Re-read /limits if LIMITS_INTERVAL has passed (or `force`); failures keep the old values."""
+        if self.fetch_limits is None:
+            return
+        with self._limits_lock:
+            now = time.monotonic()
+            if not force and self._limits_fetched is not None and now - self._limits_fetched < self.limits_interval:
+                return
+            self._limits_fetched = now
+            try:
+                limits = self.fetch_limits()
+            except Exception:
+                # Not fatal: the org may not allow /limits; the header still reports API usage
+                return
+            with self._cond:
+                self.limits.update({name: dict(value) for name, value in limits.items()
+                                    if isinstance(value, dict) and 'Max' in value and 'Remaining' in value})
+
+    def reserve(self, limit='DailyApiRequests', cost=1):
+        """Count `cost` against `limit`, or raise ApiLimitError if that would dip into the headroom."""
+        self.refresh_limits()
+        with self._cond:
+            value = self.limits.get(limit)
+            if value is None:
+                return
+            floor = value['Max'] * self.headroom
+            if value['Remaining'] - cost < floor:
+                raise ApiLimitError(f"{limit}: {value['Remaining']} of {value['Max']} left, "
+                                    f"{floor:.0f} ({self.headroom:.0%}) reserved for the org's users")
+            value['Remaining'] -= cost
+
+    def observe_usage(self, header):
+        """Update DailyApiRequests from a `Sforce-Limit-Info` response header."""
+        match = _API_USAGE.search(header or '')
+        if match:
+            used, maximum = int(match.group(1)), int(match.group(2))
+            with self._cond:
+                self.limits['DailyApiRequests'] = {'Max': maximum, 'Remaining': maximum - used}
+
+    # --- Concurrency ------------------------------------------------------
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.window):
+                self._cond.wait()
+            self._in_flight += 1
+            self.requests += 1
+            self.peak = max(self.peak, self._in_flight)
+            return Slot(self._epoch)
+
+    def _release(self, slot, latency):
+        with self._cond:
+            self._in_flight -= 1
+            if slot.is_congested:
+                self.throttled += 1
+            if slot.is_congested or (latency is not None and latency > self.target_latency):
+                self._decrease(slot)
+            else:
+                self.window = min(self.max_concurrency, self.window + 1 / self.window)
+            self._cond.notify_all()
+
+    def _decrease(self, slot):
+        # Requests that were already in flight when the window was halved report
+        # the same congestion; only the first of them halves it
+        if slot.epoch == self._epoch:
+            self._epoch += 1
+            self.window = max(self.min_concurrency, self.window / 2)
+
+    def congested(self, slot):
+        """Back off after a response to `slot` turned out to be a rejection (after the slot was released)."""
+        with self._cond:
+            self.throttled += 1
+            self._decrease(slot)
+
+    @contextmanager
+    def slot(self, limit='DailyApiRequests', timed=True):
+        """Hold one of the window's slots for a request; yields a Slot to report congestion on."""
+        self.reserve(limit)
+        slot = self._acquire()
+        started = time.monotonic()
+        try:
+            yield slot
+        finally:
+            self._release(slot, time.monotonic() - started if timed else None)
+
+    def summary(self):
+        """One line of limits and concurrency for the end of a run."""
+        with self._cond:
+            parts = [f"{name} {value['Remaining']:,}/{value['Max']:,} left"
+                     for name, value in self.limits.items() if name in WATCHED_LIMITS]
+            parts.append(f"{self.requests} requests, up to {self.peak} at once")
+            if self.throttled:
+                parts.append(f"throttled {self.throttled}x")
+            return '; '.join(parts)
+
+
+class Slot:
+    def __init__(self, epoch=0):
+        self.epoch = epoch
+        self.is_congested = False
+
+    def congested(self):
+        self.is_congested = True
@@ -0,0 +1,151 @@
+"""
+Delta segments for incremental backups.
+
+An incremental export writes the records changed since an object's high
+water mark (the latest SystemModstamp of the previous run) to a segment
+under <data dir>/deltas/<Object>/, queried with queryAll so deleted records
+come back with IsDeleted = true. The backup of an object is then its base
+file plus its segments in order: read_backup() merges them by Id (later
+versions win, deleted records drop out), and compact() folds the segments
+back into a new base file.
+
+    python3 scripts/backup_delta.py                 # compact every object with deltas
+    python3 scripts/backup_delta.py Room__c         # just one
+
+Segments are small, so merging holds them in memory and streams the base.
+"""
+
+import argparse
+import glob
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import record_export
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DATA_DIR = os.path.join(REPO_ROOT, 'backup', 'data')
+DELTA_DIR = 'deltas'
+# Re-read records stamped shortly before the mark: SystemModstamp is set when a
+# transaction starts, so a long transaction can commit behind an earlier export
+OVERLAP = timedelta(minutes=5)
+
+
+def base_file(sobject_name, data_dir=DATA_DIR):
+    """Path of the full export of an object in any of the export formats, or None."""
+    for ext in record_export.FORMATS:
+        path = os.path.join(data_dir, f'{sobject_name}.{ext}')
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def delta_dir(sobject_name, data_dir=DATA_DIR):
+    return os.path.join(data_dir, DELTA_DIR, sobject_name)
+
+
+def delta_files(sobject_name, data_dir=DATA_DIR):
+    """Segments of an object, oldest first (names start with a UTC timestamp)."""
+    return sorted(path for path in glob.glob(os.path.join(delta_dir(sobject_name, data_dir), '*'))
+                  if os.path.splitext(path)[1].lstrip('.') in record_export.FORMATS)
+
+
+def new_delta_file(sobject_name, fmt, data_dir=DATA_DIR):
+    directory = delta_dir(sobject_name, data_dir)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    return os.path.join(directory, f'{stamp}.{fmt}')
+
+
+def clear_deltas(sobject_name, data_dir=DATA_DIR):
+    """Remove an object's segments (after a full export or a compaction)."""
+    for path in delta_files(sobject_name, data_dir):
+        os.remove(path)
+    try:
+        os.rmdir(delta_dir(sobject_name, data_dir))
+    except OSError:
+        pass
+
+
+def changed_since_clause(watermark):
+    """SOQL condition for records modified since a SystemModstamp, less OVERLAP."""
+    stamp = datetime.strptime(watermark, '%Y-%m-%dT%H:%M:%S.%f%z') - OVERLAP
+    return f"SystemModstamp >= {stamp.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+
+def read_backup(sobject_name, data_dir=DATA_DIR, fields=None):
+    """Records of an object's backup with its delta segments applied."""
+    base = base_file(sobject_name, data_dir)
+    segments = delta_files(sobject_name, data_dir)
+    if not segments:
+        if base is not None:
+            yield from record_export.read_records(base, fields)
+        return
+
+    # IsDeleted is needed to drop deleted records even if the caller didn't ask for it
+    read_fields = None if fields is None else list(dict.fromkeys([*fields, 'Id', 'IsDeleted']))
+    changes = {}
+    for path in segments:
+        for record in record_export.read_records(path, read_fields):
+            changes.pop(record['Id'], None)
+            changes[record['Id']] = record
+
+    def visible(record):
+        if fields is not None:
+            record = {field: record[field] for field in fields if field in record}
+        return record
+
+    if base is not None:
+        for record in record_export.read_records(base, read_fields):
+            if record['Id'] not in changes:
+                yield visible(record)
+    for record in changes.values():
+        if not record.get('IsDeleted'):
+            yield visible(record)
+
+
+def compact(sobject_name, data_dir=DATA_DIR):
+    """Fold an object's segments into its base file; returns the record count, or None if there was nothing to do."""
+    segments = delta_files(sobject_name, data_dir)
+    if not segments:
+        return None
+    base = base_file(sobject_name, data_dir)
+    fmt = os.path.splitext(base or segments[-1])[1].lstrip('.')
+    output_file = os.path.join(data_dir, f'{sobject_name}.{fmt}')
+    # RecordWriter only replaces the base file once every record is written
+    with record_export.RecordWriter(output_file, sobject_name, fmt) as writer:
+        for record in read_backup(sobject_name, data_dir):
+            writer.write(record)
+    if not writer.count and base is not None:
+        # Every record was deleted; RecordWriter creates no file for zero records
+        os.remove(base)
+    clear_deltas(sobject_name, data_dir)
+    return writer.count
+
+
+def objects_with_deltas(data_dir=DATA_DIR):
+    root = os.path.join(data_dir, DELTA_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if delta_files(name, data_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fold incremental backup segments into full snapshots')
+    parser.add_argument('objects', nargs='*', help='Objects to compact (default: every object with deltas)')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    for sobject_name in args.objects or objects_with_deltas(args.data_dir):
+        segments = len(delta_files(sobject_name, args.data_dir))
+        count = compact(sobject_name, args.data_dir)
+        if count is None:
+            print(f"  ⊘ {sobject_name}: no deltas")
+        else:
+            print(f"  ✓ {sobject_name}: {segments} deltas folded in, {count} records")
+    print(f"Compaction finished in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
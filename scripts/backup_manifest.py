@@ -0,0 +1,121 @@
+"""
+Read and index backup/MANIFEST.json.
+
+The validator takes its expectations (packages, custom objects, record
+counts, record checksums) from the manifest instead of hard-coding them.
+Counts and checksums are indexed at backup time by export-all-data.py, or
+for existing backup files with:
+
+    python3 scripts/backup_manifest.py
+
+Checksums are RecordChecksum digests over Id + SystemModstamp, stored under
+dataExport.checksums. Incremental exports also keep each object's latest
+SystemModstamp under dataExport.highWaterMarks; counts and checksums always
+describe the backup with its delta segments applied (see backup_delta).
+"""
+
+import argparse
+import glob
+import json
+import os
+
+import backup_delta
+import record_export
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+MANIFEST_FILE = os.path.join(REPO_ROOT, 'backup', 'MANIFEST.json')
+DATA_DIR = os.path.join(REPO_ROOT, 'backup', 'data')
+
+
+def load_manifest(path=MANIFEST_FILE):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def expected_packages(manifest):
+    """{package name: version}"""
+    return {pkg['name']: pkg['version'] for pkg in manifest.get('managedPackages', {}).get('packages', [])}
+
+
+def expected_objects(manifest):
+    return set(manifest.get('customObjects', {}).get('objects', []))
+
+
+def expected_counts(manifest):
+    """{custom object: record count at backup time}"""
+    return dict(manifest.get('dataExport', {}).get('objects', {}).get('custom', {}))
+
+
+def expected_checksums(manifest):
+    return dict(manifest.get('dataExport', {}).get('checksums', {}))
+
+
+def high_water_marks(manifest):
+    """{object: latest SystemModstamp in its backup}"""
+    return dict(manifest.get('dataExport', {}).get('highWaterMarks', {}))
+
+
+def update_data_index(manifest, counts, checksums, watermarks=None):
+    """Record per-object counts/checksums (and high water marks) of custom objects and refresh the totals."""
+    data_export = manifest.setdefault('dataExport', {})
+    custom = data_export.setdefault('objects', {}).setdefault('custom', {})
+    stored = data_export.setdefault('checksums', {})
+    for sobject_name, count in counts.items():
+        # Empty or failed exports keep the previous expectation
+        if not count:
+            continue
+        custom[sobject_name] = count
+        if sobject_name in checksums:
+            stored[sobject_name] = checksums[sobject_name]
+        if watermarks and watermarks.get(sobject_name):
+            data_export.setdefault('highWaterMarks', {})[sobject_name] = watermarks[sobject_name]
+    standard = data_export['objects'].get('standard', {})
+    data_export['customObjectRecords'] = sum(custom.values())
+    data_export['standardObjectRecords'] = sum(standard.values())
+    data_export['totalRecords'] = data_export['customObjectRecords'] + data_export['standardObjectRecords']
+    return manifest
+
+
+def index_backup_files(manifest, data_dir=DATA_DIR):
+    """Count and checksum the custom object backups (base files plus deltas) already on disk."""
+    sobject_names = set(backup_delta.objects_with_deltas(data_dir))
+    for path in glob.glob(os.path.join(data_dir, '*__c.*')):
+        sobject_name, ext = os.path.splitext(os.path.basename(path))
+        if ext.lstrip('.') in record_export.FORMATS:
+            sobject_names.add(sobject_name)
+
+    counts, checksums = {}, {}
+    for sobject_name in sorted(sobject_names):
+        checksum = backup_checksum(sobject_name, data_dir)
+        counts[sobject_name] = checksum.count
+        checksums[sobject_name] = checksum.hexdigest()
+    return update_data_index(manifest, counts, checksums)
+
+
+def backup_checksum(sobject_name, data_dir=DATA_DIR):
+    """RecordChecksum of an object's backup with its deltas applied."""
+    return record_export.RecordChecksum().update(
+        backup_delta.read_backup(sobject_name, data_dir, record_export.CHECKSUM_FIELDS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index record counts and checksums of backup/data into MANIFEST.json')
+    parser.add_argument('--manifest', default=MANIFEST_FILE)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    manifest = index_backup_files(load_manifest(args.manifest), args.data_dir)
+    save_manifest(manifest, args.manifest)
+    counts = expected_counts(manifest)
+    record_export.print_object_counts(counts)
+    print(f"Indexed {len(counts)} objects into {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Bulk API 2.0 ingest for the data scripts.
+
+Records are grouped per object into CSV uploads, one ingest job per batch.
+All jobs of a load are submitted before any of them is polled, so
+independent objects are processed by the org in parallel. Results come back
+in input order as RowResult(success, id, error, record).
+
+    loader = BulkLoader.from_org('my-org')
+    results = loader.insert('Account', [{'Name': 'Acme'}, ...])
+
+Requests go through an OrgClient, so an OrgClient built from any base URL
+and token points the loader at a local stand-in for the API.
+"""
+
+import csv
+import io
+import time
+from collections import defaultdict, deque, namedtuple
+
+import org_client
+
+# Rows per ingest job; well below the 150 MB upload limit for our objects
+BATCH_SIZE = 10000
+TERMINAL_STATES = ('JobComplete', 'Failed', 'Aborted')
+
+RowResult = namedtuple('RowResult', ['success', 'id', 'error', 'record'])
+
+
+class BulkError(Exception):
+    pass
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def records_to_csv(records):
+    """Return (columns, csv text) for a list of flat record dicts."""
+    columns = []
+    for record in records:
+        for key in record:
+            if key not in columns and key != 'attributes':
+                columns.append(key)
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(columns)
+    for record in records:
+        writer.writerow([csv_value(record.get(column)) for column in columns])
+    return columns, out.getvalue()
+
+
+class BulkLoader:
+    def __init__(self, client, batch_size=BATCH_SIZE, poll_interval=2.0, timeout=600):
+        self.client = client
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    @classmethod
+    def from_org(cls, org_alias, **kwargs):
+        """Use the session of an org authenticated with the sf CLI."""
+        return cls(org_client.connect(org_alias), **kwargs)
+
+    # --- HTTP -------------------------------------------------------------
+
+    def _request(self, method, path, body=None, content_type='application/json'):
+        try:
+            return self.client.request(method, f"jobs/ingest{path}", body, content_type)
+        except org_client.ApiError as e:
+            raise BulkError(str(e)) from e
+
+    # --- Jobs -------------------------------------------------------------
+
+    def submit(self, operation, sobject, records, external_id_field=None):
+        """Create a job, upload `records` and close it; returns (job id, columns)."""
+        job_spec = {'object': sobject, 'operation': operation, 'contentType': 'CSV', 'lineEnding': 'LF'}
+        if external_id_field:
+            job_spec['externalIdFieldName'] = external_id_field
+        # Ingest jobs count against the daily Bulk batch allocation, one per BATCH_SIZE records
+        self.client.scheduler.reserve('DailyBulkApiBatches', -(-len(records) // BATCH_SIZE))
+        job = self._request('POST', '/', job_spec)
+        columns, body = records_to_csv(records)
+        self._request('PUT', f"/{job['id']}/batches", body, content_type='text/csv')
+        self._request('PATCH', f"/{job['id']}/", {'state': 'UploadComplete'})
+        return job['id'], columns
+
+    def wait(self, job_id):
+        """Poll a job until it reaches a terminal state."""
+        deadline = time.monotonic() + self.timeout
+        interval = self.poll_interval
+        while True:
+            info = self._request('GET', f"/{job_id}/")
+            if info.get('state') in TERMINAL_STATES:
+                return info
+            if time.monotonic() > deadline:
+                raise BulkError(f"Bulk job {job_id} still {info.get('state')} after {self.timeout}s")
+            time.sleep(interval)
+            interval = min(interval * 1.5, 10.0)
+
+    def _results(self, job_id, kind):
+        text = self._request('GET', f"/{job_id}/{kind}/")
+        return list(csv.DictReader(io.StringIO(text))) if text else []
+
+    def collect(self, job_id, columns, records):
+        """Match a finished job's result rows back to the submitted records, in input order."""
+        info = self.wait(job_id)
+
+        # Result rows echo the submitted values, which is the only link back to
+        # the input; identical rows are interchangeable so they are taken in order
+        pending = defaultdict(deque)
+        for index, record in enumerate(records):
+            pending[tuple(csv_value(record.get(c)) for c in columns)].append(index)
+
+        results = [None] * len(records)
+
+        def assign(row, result):
+            key = tuple(row.get(c, '') for c in columns)
+            if pending.get(key):
+                index = pending[key].popleft()
+                results[index] = result(records[index])
+
+        for row in self._results(job_id, 'successfulResults'):
+            assign(row, lambda record, row=row: RowResult(True, row.get('sf__Id'), None, record))
+        for row in self._results(job_id, 'failedResults'):
+            assign(row, lambda record, row=row: RowResult(False, row.get('sf__Id') or None, row.get('sf__Error'), record))
+
+        if info.get('state') == 'JobComplete':
+            reason = 'not processed'
+        else:
+            reason = info.get('errorMessage') or f"job {info.get('state')}"
+        return [result or RowResult(False, None, reason, records[i]) for i, result in enumerate(results)]
+
+    # --- Public API -------------------------------------------------------
+
+    def load_many(self, operation, records_by_object, external_id_fields=None):
+        """
+        Load several independent objects at once: every batch of every object is
+        submitted first, then all jobs are polled. Returns {sobject: [RowResult]}.
+        """
+        external_id_fields = external_id_fields or {}
+        submitted = []
+        for sobject, records in records_by_object.items():
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start:start + self.batch_size]
+                job_id, columns = self.submit(operation, sobject, batch, external_id_fields.get(sobject))
+                submitted.append((sobject, job_id, columns, batch))
+
+        results = {sobject: [] for sobject in records_by_object}
+        for sobject, job_id, columns, batch in submitted:
+            results[sobject].extend(self.collect(job_id, columns, batch))
+        return results
+
+    def insert(self, sobject, records):
+        return self.load_many('insert', {sobject: records})[sobject]
+
+    def insert_many(self, records_by_object):
+        return self.load_many('insert', records_by_object)
+
+    def upsert(self, sobject, records, external_id_field):
+        return self.load_many('upsert', {sobject: records}, {sobject: external_id_field})[sobject]
+
+
+def report(sobject, results):
+    """Print a one-line summary plus the first few failures; returns the created IDs."""
+    ok = [r for r in results if r.success]
+    print(f"  {sobject}: {len(ok)}/{len(results)} succeeded")
+    for failure in [r for r in results if not r.success][:5]:
+        print(f"    ✗ {failure.error}")
+    return [r.id for r in ok]
@@ -1,31 +1,40 @@
 import os
 
-SOURCE_DIR = "force-app/main/default/objects/Assessment__c/fields"
-TARGET_DIR = "force-app/main/default/objects/Resident_Assessment__c/fields"
+from metadata_index import MetadataIndex
+
+SOURCE_OBJECT = "Assessment__c"
+TARGET_OBJECT = "Resident_Assessment__c"
+
+def remove_field(index, object_name, field_name):
+    path = index.path(object_name, field_name)
+    os.remove(path)
+    index.forget(path)
 
 def cleanup_duplicates():
-    # List files in Resident_Assessment__c
-    if not os.path.exists(TARGET_DIR):
+    index = MetadataIndex()
+
+    # List fields in Resident_Assessment__c
+    if not index.has_object(TARGET_OBJECT):
         print("Target dir not found.")
         return
 
-    new_fields = os.listdir(TARGET_DIR)
+    new_fields = index.field_names(TARGET_OBJECT)
     
     print(f"Scanning {len(new_fields)} fields in Resident_Assessment__c...")
     
-    for filename in new_fields:
-        # Check if this file exists in Assessment__c
-        old_path = os.path.join(SOURCE_DIR, filename)
-        if os.path.exists(old_path):
-            os.remove(old_path)
-            print(f"Removed duplicate {filename} from Assessment__c")
+    for field_name in new_fields:
+        # Check if this field exists in Assessment__c
+        if index.has_field(SOURCE_OBJECT, field_name):
+            remove_field(index, SOURCE_OBJECT, field_name)
+            print(f"Removed duplicate {field_name}.field-meta.xml from Assessment__c")
 
     # Also remove Assessment_Type__c from Assessment__c as we renamed it to Type__c
     # But retrieve brought it back.
-    assess_type = os.path.join(SOURCE_DIR, "Assessment_Type__c.field-meta.xml")
-    if os.path.exists(assess_type):
-        os.remove(assess_type)
+    if index.has_field(SOURCE_OBJECT, "Assessment_Type__c"):
+        remove_field(index, SOURCE_OBJECT, "Assessment_Type__c")
         print("Removed Assessment_Type__c from Assessment__c (replaced by Type__c)")
 
+    index.save()
+
 if __name__ == "__main__":
     cleanup_duplicates()
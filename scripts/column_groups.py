@@ -0,0 +1,133 @@
+"""
+Column groups for exporting wide objects.
+
+Selecting every field of a wide object (Account has well over a hundred)
+makes long SOQL statements that are slow to run and time out on large
+objects, and most of the width is formula and system fields that a restore
+can't write back anyway. The exporters instead:
+
+- keep the restorable fields of the describe: createable or updateable,
+  not calculated (formulas, roll-ups), not auto-numbers, not system audit
+  fields. Id and SystemModstamp are always kept for checksums and high
+  water marks;
+- pack them into groups of at most MAX_COLUMNS columns and
+  MAX_SELECT_LENGTH characters of select list (long text areas weigh more);
+- run one `ORDER BY Id` query per group and merge the streams by Id, so
+  only one page per group is in memory.
+
+    fields = column_groups.restorable_fields(describe['fields'])
+    for record in column_groups.iter_records(org_alias, 'Account', fields):
+        ...
+
+An object that fits in one group is exported with a single query, as before.
+"""
+
+import record_export
+
+MAX_COLUMNS = 50
+MAX_SELECT_LENGTH = 4000
+# A long/rich text area counts as this many columns
+LONG_TEXT_WEIGHT = 10
+LONG_TEXT_LENGTH = 4000
+
+ALWAYS_KEPT = ('Id', 'SystemModstamp')
+SYSTEM_AUDIT_FIELDS = {'CreatedDate', 'CreatedById', 'LastModifiedDate', 'LastModifiedById',
+                       'LastActivityDate', 'LastViewedDate', 'LastReferencedDate'}
+# Compound fields; their components are exported as separate fields
+COMPOUND_TYPES = ('address', 'location')
+
+
+def restorable_fields(fields):
+    """Names of the fields of a describe worth backing up, in describe order."""
+    names = []
+    for field in fields:
+        name = field['name']
+        if name in ALWAYS_KEPT:
+            names.append(name)
+            continue
+        if name.endswith('__pr') or field.get('type') in COMPOUND_TYPES or name in SYSTEM_AUDIT_FIELDS:
+            continue
+        if field.get('calculated') or field.get('autoNumber'):
+            continue
+        if field.get('createable') or field.get('updateable'):
+            names.append(name)
+    return names
+
+
+def _weight(name, field_types):
+    field = field_types.get(name) or {}
+    if field.get('type') == 'textarea' and (field.get('length') or 0) > LONG_TEXT_LENGTH:
+        return LONG_TEXT_WEIGHT
+    return 1
+
+
+def plan_groups(fields, describe_fields=None, max_columns=MAX_COLUMNS, max_select_length=MAX_SELECT_LENGTH):
+    """
+    Split field names into groups that each fit the column and length
+    budgets; Id is left out (every query selects it) and SystemModstamp goes
+    in the first group. `describe_fields` (the describe's field list) lets
+    long text areas weigh more.
+    """
+    field_types = {field['name']: field for field in describe_fields or []}
+    ordered = [name for name in ALWAYS_KEPT[1:] if name in fields]
+    ordered += [name for name in dict.fromkeys(fields) if name not in ALWAYS_KEPT]
+
+    groups, group, columns, length = [], [], 1, len('Id')
+    for name in ordered:
+        weight = _weight(name, field_types)
+        if group and (columns + weight > max_columns or length + len(name) + 2 > max_select_length):
+            groups.append(group)
+            group, columns, length = [], 1, len('Id')
+        group.append(name)
+        columns += weight
+        length += len(name) + 2
+    if group or not groups:
+        groups.append(group)
+    return groups
+
+
+def keyset_query(fields, sobject_name, where=None, after_id=None):
+    """SOQL for the records after `after_id` in Id order."""
+    conditions = [f"({where})"] if where else []
+    if after_id:
+        conditions.append(f"Id > '{after_id}'")
+    soql = f"SELECT {', '.join(fields)} FROM {sobject_name}"
+    if conditions:
+        soql += " WHERE " + " AND ".join(conditions)
+    return soql + " ORDER BY Id"
+
+
+def group_queries(sobject_name, fields, where=None, after_id=None, describe_fields=None):
+    """One keyset query per column group."""
+    return [keyset_query(['Id', *group], sobject_name, where, after_id)
+            for group in plan_groups(fields, describe_fields)]
+
+
+def merge_by_id(streams, fields):
+    """
+    Join record streams sorted by Id into whole records, fields in `fields`
+    order. The first stream drives: a record another stream has no row for
+    (deleted between the queries) just lacks that group's fields, and rows
+    only other streams have (created between the queries) are skipped.
+    """
+    driver, others = streams[0], streams[1:]
+    heads = [next(stream, None) for stream in others]
+    order = ['attributes', 'Id', *fields]
+    for record in driver:
+        merged = dict(record)
+        for i, stream in enumerate(others):
+            while heads[i] is not None and heads[i]['Id'] < record['Id']:
+                heads[i] = next(stream, None)
+            if heads[i] is not None and heads[i]['Id'] == record['Id']:
+                merged.update((key, value) for key, value in heads[i].items() if key != 'attributes')
+        yield {key: merged[key] for key in order if key in merged}
+
+
+def iter_records(org_alias, sobject_name, fields, where=None, after_id=None, include_deleted=False,
+                 describe_fields=None, page_size=record_export.PAGE_SIZE):
+    """Records of `sobject_name` with `fields`, in Id order, queried a column group at a time."""
+    queries = group_queries(sobject_name, fields, where, after_id, describe_fields)
+    streams = [record_export.iter_records(org_alias, soql, page_size, include_deleted) for soql in queries]
+    if len(streams) == 1:
+        return streams[0]
+    return merge_by_id(streams, [name for name in fields if name != 'Id'])
@@ -0,0 +1,237 @@
+"""
+Compact columnar backup files.
+
+Records are buffered into chunks of CHUNK_ROWS; each column of a chunk is
+stored as its own zlib-compressed JSON array, so repeated values (system
+fields, mostly-null custom fields) compress to almost nothing and a reader
+can decompress a single column without touching the rest. The `attributes`
+block is dropped when it is the usual {type, url} pair and rebuilt on read.
+
+    MAGIC
+    chunk 0: column blob, column blob, ...
+    chunk 1: ...
+    footer   zlib JSON: object, columns, url prefix, per-chunk
+             row count and (offset, length) of every column blob
+    footer length (8 bytes, big endian)
+    MAGIC
+
+    with ColumnarWriter('Room__c.columnar', 'Room__c') as writer:
+        writer.write(record)
+    reader = ColumnarReader('Room__c.columnar')
+    reader.records()                          # dicts, chunk by chunk
+    reader.records(['Id', 'SystemModstamp'])  # only those columns are decompressed
+    reader.column('Status__c')
+
+python3 scripts/columnar.py backup/data/*.json converts existing dumps.
+"""
+
+import argparse
+import json
+import os
+import struct
+import zlib
+
+MAGIC = b'SFCOL01\n'
+CHUNK_ROWS = 10000
+COMPRESSION_LEVEL = 6
+EXTENSION = '.columnar'
+_LENGTH = struct.Struct('>Q')
+
+
+def _pack(values):
+    return zlib.compress(json.dumps(values, separators=(',', ':')).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+class ColumnarWriter:
+    """Streams records into a columnar file; the file is only created once a record arrives."""
+
+    def __init__(self, output_file, sobject_name, chunk_rows=CHUNK_ROWS):
+        self.output_file = output_file
+        self.sobject_name = sobject_name
+        self.chunk_rows = chunk_rows
+        self.count = 0
+        self.columns = []
+        self.url_prefix = None
+        # Membership test for self.columns, which keeps first-seen order
+        self._column_set = set()
+        self._chunks = []
+        self._rows = []
+        self._f = None
+
+    def _strip_attributes(self, record):
+        """Drop an attributes block that can be rebuilt from the object name and Id."""
+        attributes = record.get('attributes')
+        if not isinstance(attributes, dict) or set(attributes) != {'type', 'url'}:
+            return record
+        url, record_id = attributes['url'], record.get('Id')
+        if attributes['type'] != self.sobject_name or not record_id or not url.endswith('/' + record_id):
+            return record
+        prefix = url[:-len(record_id)]
+        if self.url_prefix is None:
+            self.url_prefix = prefix
+        if prefix != self.url_prefix:
+            return record
+        # A null marker (cheap once compressed) tells the reader to rebuild it
+        return {**record, 'attributes': None}
+
+    def write(self, record):
+        if self._f is None:
+            self._f = open(self.output_file, 'wb')
+            self._f.write(MAGIC)
+        record = self._strip_attributes(record)
+        for key in record:
+            if key not in self._column_set:
+                self._column_set.add(key)
+                self.columns.append(key)
+        self._rows.append(record)
+        self.count += 1
+        if len(self._rows) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        chunk = {'rows': len(self._rows), 'columns': {}, 'missing': {}}
+        for column in self.columns:
+            values = [row.get(column) for row in self._rows]
+            missing = [i for i, row in enumerate(self._rows) if column not in row]
+            if len(missing) == len(self._rows):
+                continue
+            if missing:
+                chunk['missing'][column] = missing
+            blob = _pack(values)
+            chunk['columns'][column] = [self._f.tell(), len(blob)]
+            self._f.write(blob)
+        self._chunks.append(chunk)
+        self._rows = []
+
+    def close(self):
+        if self._f is None:
+            return
+        self._flush()
+        footer = zlib.compress(json.dumps({
+            'object': self.sobject_name,
+            'columns': self.columns,
+            'urlPrefix': self.url_prefix,
+            'totalSize': self.count,
+            'chunks': self._chunks,
+        }).encode('utf-8'), COMPRESSION_LEVEL)
+        self._f.write(footer)
+        self._f.write(_LENGTH.pack(len(footer)))
+        self._f.write(MAGIC)
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarReader:
+    """Schema and lazy record/column access for a columnar file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a columnar backup file")
+            f.seek(-(len(MAGIC) + _LENGTH.size), os.SEEK_END)
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is truncated")
+            f.seek(-(len(MAGIC) + _LENGTH.size + length), os.SEEK_END)
+            footer = json.loads(zlib.decompress(f.read(length)))
+        self.sobject_name = footer['object']
+        self.columns = footer['columns']
+        self.count = footer['totalSize']
+        self._url_prefix = footer['urlPrefix']
+        self._chunks = footer['chunks']
+
+    def _read_chunk(self, f, chunk, columns):
+        values = {}
+        for column in columns:
+            location = chunk['columns'].get(column)
+            if location is None:
+                continue
+            f.seek(location[0])
+            values[column] = _unpack(f.read(location[1]))
+        return values
+
+    def records(self, columns=None):
+        """Yield records as dicts, decompressing only `columns` (default: all, with attributes)."""
+        selected = self.columns if columns is None else [c for c in columns if c in self.columns]
+        with_attributes = columns is None or 'attributes' in columns
+        wanted = list(selected)
+        if with_attributes and 'attributes' in self.columns:
+            # Stripped attributes are rebuilt from the Id
+            wanted += [c for c in ('attributes', 'Id') if c not in wanted and c in self.columns]
+
+        with open(self.path, 'rb') as f:
+            for chunk in self._chunks:
+                rows = chunk['rows']
+                values = self._read_chunk(f, chunk, wanted)
+                missing = {column: set(indexes) for column, indexes in chunk['missing'].items()}
+                ids = values.get('Id', [None] * rows)
+                for i in range(rows):
+                    record = {}
+                    if 'attributes' in values and i not in missing.get('attributes', ()):
+                        attributes = values['attributes'][i]
+                        if attributes is None:
+                            attributes = {'type': self.sobject_name, 'url': self._url_prefix + ids[i]}
+                        record['attributes'] = attributes
+                    for column in selected:
+                        if column == 'attributes' or column not in values or i in missing.get(column, ()):
+                            continue
+                        record[column] = values[column][i]
+                    yield record
+
+    def column(self, name):
+        """Yield the values of one column in record order."""
+        with open(self.path, 'rb') as f:
+            for chunk in self._chunks:
+                values = self._read_chunk(f, chunk, [name]).get(name, [None] * chunk['rows'])
+                yield from values
+
+    def __iter__(self):
+        return self.records()
+
+
+def convert(path, output_file=None):
+    """Write a columnar copy of a .json/.ndjson backup file; returns its path."""
+    import record_export
+
+    sobject_name = os.path.splitext(os.path.basename(path))[0]
+    output_file = output_file or os.path.splitext(path)[0] + EXTENSION
+    with ColumnarWriter(output_file, sobject_name) as writer:
+        for record in record_export.read_records(path):
+            writer.write(record)
+    return output_file if writer.count else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert JSON/NDJSON backup files to the columnar format')
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    before = after = 0
+    for path in args.files:
+        output_file = convert(path)
+        if output_file is None:
+            print(f"  ⊘ {path}: no records")
+            continue
+        size, columnar_size = os.path.getsize(path), os.path.getsize(output_file)
+        before += size
+        after += columnar_size
+        print(f"  ✓ {output_file}: {size:,} → {columnar_size:,} bytes")
+    if after:
+        print(f"Total: {before:,} → {after:,} bytes ({before / after:.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    main()
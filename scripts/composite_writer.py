@@ -0,0 +1,173 @@
+"""
+Small writes batched into Composite API calls.
+
+The Bulk API pays for a job, an upload and polling on every load, which is
+most of the time taken by a handful of records. CompositeWriter sends small
+writes straight to the REST API instead:
+
+- independent records go to sObject Collections, up to 200 records (of any
+  mix of objects) per call;
+- records that depend on each other are built into a Graph and sent as a
+  composite graph, where later nodes use the Id of earlier ones through
+  references like @{newAccount.id}. A graph commits or rolls back as a
+  whole, and up to GRAPHS_PER_REQUEST graphs travel in one call.
+
+    graph = Graph('resident1')
+    account = graph.add('Account', {'LastName': 'Smith'}, 'account')
+    graph.add('Opportunity', {'Name': 'Enquiry', 'Resident__c': account, ...})
+    results = CompositeWriter(client).insert_graphs([graph])
+
+Results are bulk_loader.RowResult(success, id, error, record) so callers
+can report them the same way as bulk loads.
+"""
+
+import re
+from collections import namedtuple
+
+import org_client
+from bulk_loader import RowResult
+
+# Records per sObject Collections call
+COLLECTION_SIZE = 200
+# Graphs per composite graph call, and nodes per graph
+GRAPHS_PER_REQUEST = 75
+GRAPH_NODES = 500
+
+GraphResult = namedtuple('GraphResult', ['success', 'results'])
+
+
+class CompositeError(Exception):
+    pass
+
+
+def _error_text(errors):
+    """One line from a list of REST errors ({statusCode|errorCode, message, fields})."""
+    if isinstance(errors, dict):
+        errors = [errors]
+    messages = []
+    for error in errors or []:
+        code = error.get('statusCode') or error.get('errorCode')
+        fields = error.get('fields') or []
+        messages.append(f"{code}: {error.get('message', '')}" + (f" ({', '.join(fields)})" if fields else ''))
+    return '; '.join(messages) or None
+
+
+def _failed(subresponse):
+    return subresponse.get('httpStatusCode', 0) >= 400
+
+
+def _halted(subresponse):
+    """A node that was not run because an earlier node of its graph failed."""
+    body = subresponse.get('body')
+    return isinstance(body, list) and any(error.get('errorCode') == 'PROCESSING_HALTED' for error in body)
+
+
+class Graph:
+    """Records inserted together; a node refers to an earlier node's Id through the value add() returns."""
+
+    def __init__(self, graph_id):
+        if not re.fullmatch(r'\w+', str(graph_id)):
+            raise CompositeError(f"Invalid graph id {graph_id!r}")
+        self.graph_id = str(graph_id)
+        self.nodes = []
+
+    def add(self, sobject, record, reference_id=None):
+        """Add an insert node; returns '@{reference_id.id}' for use in later nodes' lookup fields."""
+        if len(self.nodes) >= GRAPH_NODES:
+            raise CompositeError(f"Graph {self.graph_id} has more than {GRAPH_NODES} nodes")
+        reference_id = reference_id or f"{sobject.replace('__', '_')}{len(self.nodes)}"
+        if not re.fullmatch(r'[A-Za-z]\w*', reference_id):
+            raise CompositeError(f"Invalid reference id {reference_id!r}")
+        self.nodes.append((reference_id, sobject, record))
+        return f"@{{{reference_id}.id}}"
+
+    def request(self, api_version):
+        return {
+            'graphId': self.graph_id,
+            'compositeRequest': [
+                {'method': 'POST', 'url': f"/services/data/v{api_version}/sobjects/{sobject}/",
+                 'referenceId': reference_id, 'body': record}
+                for reference_id, sobject, record in self.nodes
+            ],
+        }
+
+
+class CompositeWriter:
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_org(cls, org_alias=None):
+        return cls(org_client.connect(org_alias))
+
+    def insert_records(self, records, all_or_none=False):
+        """
+        Insert (sobject, record) pairs through sObject Collections, in calls of
+        COLLECTION_SIZE; returns a RowResult per pair in input order. With
+        all_or_none, a failure rolls back the rest of its call.
+        """
+        results = []
+        for start in range(0, len(records), COLLECTION_SIZE):
+            batch = records[start:start + COLLECTION_SIZE]
+            body = {'allOrNone': all_or_none,
+                    'records': [{'attributes': {'type': sobject}, **record} for sobject, record in batch]}
+            response = self.client.post("composite/sobjects", body)
+            for (_, record), result in zip(batch, response):
+                results.append(RowResult(bool(result.get('success')), result.get('id'),
+                                         _error_text(result.get('errors')), record))
+        return results
+
+    def insert(self, sobject, records, all_or_none=False):
+        return self.insert_records([(sobject, record) for record in records], all_or_none)
+
+    def insert_many(self, records_by_object, all_or_none=False):
+        """Insert independent records of several objects, sharing calls between objects. Returns {sobject: [RowResult]}."""
+        pairs = [(sobject, record) for sobject, records in records_by_object.items() for record in records]
+        results = {sobject: [] for sobject in records_by_object}
+        for (sobject, _), result in zip(pairs, self.insert_records(pairs, all_or_none)):
+            results[sobject].append(result)
+        return results
+
+    def insert_graphs(self, graphs):
+        """
+        Insert each graph all-or-none, GRAPHS_PER_REQUEST graphs per call.
+        Returns {graph id: GraphResult(success, {reference id: RowResult})}.
+        """
+        results = {}
+        for start in range(0, len(graphs), GRAPHS_PER_REQUEST):
+            batch = graphs[start:start + GRAPHS_PER_REQUEST]
+            body = {'graphs': [graph.request(self.client.api_version) for graph in batch]}
+            response = {graph['graphId']: graph for graph in self.client.post("composite/graph", body).get('graphs', [])}
+            for graph in batch:
+                results[graph.graph_id] = self._graph_result(graph, response.get(graph.graph_id))
+        return results
+
+    def _graph_result(self, graph, response):
+        if response is None:
+            return GraphResult(False, {reference_id: RowResult(False, None, 'graph not processed', record)
+                                       for reference_id, _, record in graph.nodes})
+        subresponses = {sub['referenceId']: sub for sub in response['graphResponse']['compositeResponse']}
+        success = bool(response.get('isSuccessful'))
+        # A failed graph is rolled back, so even nodes that "succeeded" report no Id
+        cause = None
+        if not success:
+            cause = next((_error_text(sub['body']) for sub in subresponses.values()
+                          if _failed(sub) and not _halted(sub)), 'graph rolled back')
+        results = {}
+        for reference_id, _, record in graph.nodes:
+            sub = subresponses.get(reference_id, {})
+            if success:
+                results[reference_id] = RowResult(True, (sub.get('body') or {}).get('id'), None, record)
+            else:
+                error = _error_text(sub['body']) if _failed(sub) and not _halted(sub) else None
+                results[reference_id] = RowResult(False, None, error or cause, record)
+        return GraphResult(success, results)
+
+
+def results_by_object(graphs, results):
+    """Regroup insert_graphs() results as {sobject: [RowResult]}, e.g. for bulk_loader.report()."""
+    by_object = {}
+    for graph in graphs:
+        for reference_id, sobject, _ in graph.nodes:
+            by_object.setdefault(sobject, []).append(results[graph.graph_id].results[reference_id])
+    return by_object
@@ -0,0 +1,313 @@
+"""
+Load the deployment/data exports into an org through Bulk API 2.0.
+
+Objects are loaded tier by tier in the order planned by load_planner (from
+the target org's describes); the objects of one tier go to the org as
+concurrent ingest jobs. Every record's old Id is mapped to its new Id in an
+SQLite database under deployment/data/.id-mappings, and lookup fields are
+rewritten through that map before upload. Lookups deferred to break a
+reference cycle are set in a second pass with a bulk update.
+
+The map makes the load resumable: objects that finished are skipped and
+records that were already created are not sent again, so a rerun after a
+failure only picks up what is missing.
+
+    python3 scripts/data_loader.py --target-org myorg
+    python3 scripts/data_loader.py --target-org myorg --external-id Account=Legacy_Id__c
+    python3 scripts/data_loader.py --dry-run
+
+With --external-id Object=Field the old Id is written to that external ID
+field and the object is upserted on it, so reloading into an org that
+already has the records updates them instead of creating duplicates.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import api_scheduler
+import describe_cache
+import load_planner
+import org_client
+from bulk_loader import BulkLoader, report
+
+DATA_DIR = os.path.join(load_planner.REPO_ROOT, 'deployment', 'data')
+MAPPING_DIR = os.path.join(DATA_DIR, '.id-mappings')
+
+# Read-only or org-assigned values in the exports; never sent on insert
+SYSTEM_FIELDS = {'Id', 'attributes', 'CreatedDate', 'CreatedById', 'LastModifiedDate',
+                 'LastModifiedById', 'SystemModstamp', 'LastActivityDate', 'IsDeleted'}
+# Old Ids looked up per SQLite statement; stays under SQLITE_MAX_VARIABLE_NUMBER
+LOOKUP_CHUNK = 500
+
+
+def read_data_file(path):
+    """Records of an `sf data query --json` export (or a bare {'records': [...]})."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        # Missing file, or a failed extract that left '[]' or an sf error body behind
+        return []
+    if not isinstance(data, dict):
+        return []
+    return data.get('result', data).get('records', [])
+
+
+class IdMap:
+    """Old Id -> new Id for every loaded record, plus the objects already finished."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS id_map '
+                        '(old_id TEXT PRIMARY KEY, sobject TEXT NOT NULL, new_id TEXT NOT NULL)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS completed '
+                        '(sobject TEXT NOT NULL, pass INTEGER NOT NULL, finished_at REAL NOT NULL, '
+                        'PRIMARY KEY (sobject, pass))')
+        self.db.commit()
+
+    def lookup(self, old_ids):
+        """{old Id: new Id} for the given old Ids that have been loaded."""
+        old_ids = list(set(old_ids))
+        found = {}
+        for start in range(0, len(old_ids), LOOKUP_CHUNK):
+            chunk = old_ids[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self.db.execute(
+                f'SELECT old_id, new_id FROM id_map WHERE old_id IN ({placeholders})', chunk))
+        return found
+
+    def add(self, sobject, pairs):
+        self.db.executemany('INSERT OR REPLACE INTO id_map (old_id, sobject, new_id) VALUES (?, ?, ?)',
+                            [(old_id, sobject, new_id) for old_id, new_id in pairs])
+        self.db.commit()
+
+    def count(self, sobject):
+        return self.db.execute('SELECT COUNT(*) FROM id_map WHERE sobject = ?', (sobject,)).fetchone()[0]
+
+    def is_complete(self, sobject, load_pass):
+        return self.db.execute('SELECT 1 FROM completed WHERE sobject = ? AND pass = ?',
+                               (sobject, load_pass)).fetchone() is not None
+
+    def mark_complete(self, sobject, load_pass):
+        self.db.execute('INSERT OR REPLACE INTO completed (sobject, pass, finished_at) VALUES (?, ?, ?)',
+                        (sobject, load_pass, time.time()))
+        self.db.commit()
+
+    def reset(self):
+        self.db.execute('DELETE FROM id_map')
+        self.db.execute('DELETE FROM completed')
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class DataLoader:
+    def __init__(self, loader, describes, id_map, data_dir=DATA_DIR, external_ids=None):
+        self.loader = loader
+        self.id_map = id_map
+        self.data_dir = data_dir
+        self.external_ids = external_ids or {}
+        self.objects = set(describes)
+        # Fields the load may set, and which of them are lookups, per object
+        self.createable = {}
+        self.lookups = {}
+        for sobject, describe in describes.items():
+            fields = [f for f in describe['fields'] if f.get('createable')]
+            self.createable[sobject] = {f['name'] for f in fields}
+            self.lookups[sobject] = {f['name']: f.get('referenceTo') or [] for f in fields if f.get('referenceTo')}
+        self.plan = load_planner.plan_load(self.objects, load_planner.graph_from_describes(describes))
+
+    def path(self, sobject):
+        return os.path.join(self.data_dir, load_planner.DATA_FILES[sobject][0])
+
+    def prepare(self, sobject, records, fields=None):
+        """
+        Rewrite exported records for upload: keep createable fields (or only
+        `fields`), map lookups to new Ids and drop lookups to objects that are
+        not loaded. Returns (old Ids, upload records, unresolved lookup count).
+        """
+        lookups = self.lookups[sobject]
+        wanted = self.createable[sobject] - SYSTEM_FIELDS
+        if fields is not None:
+            wanted &= set(fields)
+        referenced = [record[name] for record in records for name in lookups
+                      if name in wanted and record.get(name)]
+        new_ids = self.id_map.lookup(referenced)
+
+        external_id = self.external_ids.get(sobject)
+        old_ids, uploads, unresolved = [], [], 0
+        for record in records:
+            upload = {}
+            for name, value in record.items():
+                if name not in wanted:
+                    continue
+                if name in lookups and value:
+                    if not any(target in self.objects for target in lookups[name]):
+                        continue
+                    if value not in new_ids:
+                        unresolved += 1
+                        value = None
+                    else:
+                        value = new_ids[value]
+                upload[name] = value
+            if external_id:
+                upload[external_id] = record['Id']
+            old_ids.append(record['Id'])
+            uploads.append(upload)
+        return old_ids, uploads, unresolved
+
+    def load_tier(self, tier):
+        """First pass for the objects of one tier, submitted together."""
+        batches = {}
+        for sobject in tier:
+            if self.id_map.is_complete(sobject, 1):
+                print(f"  {sobject}: already loaded ({self.id_map.count(sobject)} records)")
+                continue
+            records = read_data_file(self.path(sobject))
+            loaded = self.id_map.lookup(record['Id'] for record in records)
+            records = [record for record in records if record['Id'] not in loaded]
+            if not records:
+                print(f"  {sobject}: nothing to load")
+                self.id_map.mark_complete(sobject, 1)
+                continue
+            deferred = self.plan.deferred.get(sobject, [])
+            records = [load_planner.split_record(record, deferred)[0] for record in records]
+            batches[sobject] = self.prepare(sobject, records)
+
+        if not batches:
+            return True
+        uploads = {sobject: batch[1] for sobject, batch in batches.items()}
+        operations = {sobject: 'upsert' if sobject in self.external_ids else 'insert' for sobject in uploads}
+        results = {}
+        for operation in set(operations.values()):
+            results.update(self.loader.load_many(
+                operation,
+                {sobject: records for sobject, records in uploads.items() if operations[sobject] == operation},
+                self.external_ids))
+
+        ok = True
+        for sobject, (old_ids, _, unresolved) in batches.items():
+            report(sobject, results[sobject])
+            if unresolved:
+                print(f"    ⚠ {unresolved} lookups pointed at records that were not loaded and were left blank")
+            self.id_map.add(sobject, [(old_id, result.id) for old_id, result in zip(old_ids, results[sobject])
+                                      if result.success and result.id])
+            if all(result.success for result in results[sobject]):
+                self.id_map.mark_complete(sobject, 1)
+            else:
+                ok = False
+        return ok
+
+    def set_deferred(self):
+        """Second pass: update the lookups that were left out to break cycles."""
+        updates = {}
+        for sobject, fields in self.plan.deferred.items():
+            if self.id_map.is_complete(sobject, 2):
+                continue
+            records = [load_planner.split_record(record, fields)[1] | {'Id': record['Id']}
+                       for record in read_data_file(self.path(sobject))]
+            records = [record for record in records if len(record) > 1]
+            new_ids = self.id_map.lookup(record['Id'] for record in records)
+            old_ids, uploads, _ = self.prepare(sobject, [r for r in records if r['Id'] in new_ids], fields)
+            for old_id, upload in zip(old_ids, uploads):
+                upload['Id'] = new_ids[old_id]
+            if uploads:
+                updates[sobject] = uploads
+            else:
+                self.id_map.mark_complete(sobject, 2)
+
+        ok = True
+        for sobject, results in self.loader.load_many('update', updates).items():
+            report(sobject, results)
+            if all(result.success for result in results):
+                self.id_map.mark_complete(sobject, 2)
+            else:
+                ok = False
+        return ok
+
+    def run(self):
+        for number, tier in enumerate(self.plan.tiers, start=1):
+            print(f"[Tier {number}/{len(self.plan.tiers)}] {', '.join(tier)}")
+            if not self.load_tier(tier):
+                print("Stopping: some records failed. Fix them and rerun to resume from this tier.")
+                return False
+        if self.plan.deferred:
+            print("[Second pass] " + ', '.join(f"{sobject}.{field}" for sobject, fields in self.plan.deferred.items()
+                                               for field in fields))
+            return self.set_deferred()
+        return True
+
+
+def dry_run(data_dir):
+    """Plan from the metadata in source and count the records of each file."""
+    objects = list(load_planner.DATA_FILES)
+    plan = load_planner.plan_load(objects, load_planner.graph_from_index(objects))
+    for number, tier in enumerate(plan.tiers, start=1):
+        print(f"[Tier {number}/{len(plan.tiers)}]")
+        for sobject in tier:
+            count = len(read_data_file(os.path.join(data_dir, load_planner.DATA_FILES[sobject][0])))
+            print(f"  {sobject}: {count} records")
+
+
+def parse_external_ids(values):
+    external_ids = {}
+    for value in values or []:
+        sobject, sep, field = value.partition('=')
+        if not sep or not field:
+            raise argparse.ArgumentTypeError(f"Expected Object=Field, got {value!r}")
+        external_ids[sobject] = field
+    return external_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load deployment/data into an org in dependency order.')
+    parser.add_argument('--target-org', help='Org alias to load into')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--external-id', action='append', metavar='OBJECT=FIELD',
+                        help='Upsert OBJECT on this external ID field, filled with the old record Id (repeatable)')
+    parser.add_argument('--restart', action='store_true', help='Forget earlier progress and load everything again')
+    parser.add_argument('--api-headroom', type=float, default=api_scheduler.HEADROOM * 100, metavar='PCT',
+                        help="Share of the org's daily API limits to leave unused (default: %(default).0f)")
+    parser.add_argument('--dry-run', action='store_true', help='Show the plan and record counts without loading')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        dry_run(args.data_dir)
+        return
+    if not args.target_org:
+        parser.error('--target-org is required unless --dry-run is given')
+    try:
+        external_ids = parse_external_ids(args.external_id)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    scheduler = org_client.connect(args.target_org).scheduler
+    scheduler.headroom = args.api_headroom / 100
+
+    describes = describe_cache.DescribeCache(args.target_org).describe_many(sorted(load_planner.DATA_FILES))
+    id_map = IdMap(os.path.join(MAPPING_DIR, f'{args.target_org}.sqlite'))
+    if args.restart:
+        id_map.reset()
+    try:
+        loader = DataLoader(BulkLoader.from_org(args.target_org), describes, id_map,
+                            args.data_dir, external_ids)
+        ok = loader.run()
+    except (load_planner.LoadOrderError, api_scheduler.ApiLimitError) as e:
+        parser.exit(1, f"Error: {e}\n")
+    finally:
+        id_map.close()
+    print(f"API: {scheduler.summary()}")
+    print("Load complete" if ok else f"Load incomplete; progress is kept in {id_map.path}")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Persistent cache of sObject describes.
+
+Describes are stored under .describe-cache/<org id>/v<api version>/<Object>.json
+at the repository root. Before a cached describe is reused it is revalidated
+against the object's EntityDefinition.LastModifiedDate, fetched for all
+requested objects in a single query; objects the org reports no date for
+fall back to a maximum age. Only stale or missing objects cost a describe
+request.
+
+The describe snapshots committed at the repository root (account_describe.json,
+property_describe.json, ...) are located with find_snapshots() when no org is
+available. It goes through the projected sidecars of describe_reader, so it
+never parses a whole snapshot twice.
+"""
+
+import glob
+import json
+import os
+import time
+
+import describe_reader
+import org_client
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CACHE_DIR = os.path.join(REPO_ROOT, '.describe-cache')
+API_VERSION = org_client.API_VERSION
+# Used when EntityDefinition has no LastModifiedDate for an object (some standard objects)
+MAX_AGE = 24 * 60 * 60
+
+
+def find_snapshots(directory=REPO_ROOT):
+    """Map object name -> describe snapshot file for the *.json files in `directory`."""
+    snapshots = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        try:
+            describe = describe_reader.read_snapshot(path)
+        except OSError:
+            continue
+        if describe is not None:
+            snapshots.setdefault(describe['name'], path)
+    return snapshots
+
+
+class DescribeCache:
+    """Describe lookups for one org, backed by the on-disk cache."""
+
+    def __init__(self, org_alias, api_version=API_VERSION, cache_dir=CACHE_DIR,
+                 max_age=MAX_AGE, refresh=False):
+        self.org_alias = org_alias
+        self.api_version = api_version
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.refresh = refresh
+        self._client = None
+        # LastModifiedDate per object from the latest revalidation query
+        self._current = {}
+        self._memory = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = org_client.connect(self.org_alias, self.api_version)
+        return self._client
+
+    @property
+    def org_id(self):
+        return self.client.org_id
+
+    def _path(self, sobject_name):
+        return os.path.join(self.cache_dir, self.org_id, f'v{self.api_version}', f'{sobject_name}.json')
+
+    def _read(self, sobject_name):
+        try:
+            with open(self._path(sobject_name), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, sobject_name, entry):
+        path = self._path(sobject_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def revalidate(self, sobject_names):
+        """Fetch LastModifiedDate for all `sobject_names` in one query."""
+        names = [name for name in sobject_names if name not in self._current]
+        if not names:
+            return
+        quoted = ", ".join(f"'{name}'" for name in names)
+        soql = ("SELECT QualifiedApiName, LastModifiedDate FROM EntityDefinition "
+                f"WHERE QualifiedApiName IN ({quoted})")
+        try:
+            for record in self.client.iter_records(soql):
+                self._current[record['QualifiedApiName']] = record.get('LastModifiedDate')
+        except Exception as e:
+            print(f"  Could not revalidate describe cache ({e}); using max age")
+        for name in names:
+            self._current.setdefault(name, None)
+
+    def _is_fresh(self, entry, sobject_name):
+        current = self._current.get(sobject_name)
+        if current:
+            return entry.get('lastModifiedDate') == current
+        return time.time() - entry.get('fetchedAt', 0) < self.max_age
+
+    def describe(self, sobject_name):
+        """Return the describe result for `sobject_name`, fetching it only when stale."""
+        if sobject_name in self._memory:
+            return self._memory[sobject_name]
+
+        entry = None if self.refresh else self._read(sobject_name)
+        if entry is not None:
+            self.revalidate([sobject_name])
+            if not self._is_fresh(entry, sobject_name):
+                entry = None
+
+        if entry is None:
+            describe = self.client.describe(sobject_name)
+            self.revalidate([sobject_name])
+            entry = {
+                'fetchedAt': time.time(),
+                'lastModifiedDate': self._current.get(sobject_name),
+                'describe': describe,
+            }
+            self._write(sobject_name, entry)
+
+        self._memory[sobject_name] = entry['describe']
+        return entry['describe']
+
+    def describe_many(self, sobject_names):
+        """Describe several objects, revalidating all cached entries in one round trip."""
+        self.revalidate(sobject_names)
+        return {name: self.describe(name) for name in sobject_names}
+
+    def fields(self, sobject_name):
+        return self.describe(sobject_name)['fields']
@@ -0,0 +1,115 @@
+"""
+Checkpointed exports that resume where a failed run stopped.
+
+A full export of an object scans it in Id order (ORDER BY Id) and appends
+every page to a part file under <data dir>/.export-state/. After each page
+the part file is synced and a small state file records the last Id, the
+record count and the part file's length. If the run dies (an expired
+session, a dropped connection, Ctrl-C), the next run truncates the part file
+to the last checkpoint and carries on with `Id > '<last Id>'` instead of
+starting again. Once the scan is done the part file is written out in the
+requested format through RecordWriter (temp file plus rename) and the state
+is removed.
+
+    count = export_checkpoint.export_resumable(org_alias, 'Room__c', fields, 'backup/data/Room__c.json')
+
+A checkpoint is only reused for the same queries and format; --restart on the
+exporters (restart=True) discards it.
+"""
+
+import json
+import os
+import time
+from itertools import islice
+
+import column_groups
+import record_export
+
+STATE_DIR = '.export-state'
+
+
+def state_paths(sobject_name, data_dir):
+    """(state file, part file) of an object's export in progress."""
+    directory = os.path.join(data_dir, STATE_DIR)
+    return os.path.join(directory, f'{sobject_name}.json'), os.path.join(directory, f'{sobject_name}.part.ndjson')
+
+
+def load_state(sobject_name, data_dir):
+    state_file, _ = state_paths(sobject_name, data_dir)
+    try:
+        with open(state_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(sobject_name, data_dir, state):
+    state_file, _ = state_paths(sobject_name, data_dir)
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(dict(state, updatedAt=time.time()), f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def clear_state(sobject_name, data_dir):
+    for path in state_paths(sobject_name, data_dir):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def pending_exports(data_dir):
+    """Objects with an unfinished export in `data_dir`."""
+    directory = os.path.join(data_dir, STATE_DIR)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def export_resumable(org_alias, sobject_name, fields, output_file, fmt='json', where=None,
+                     page_size=record_export.PAGE_SIZE, checksum=None, watermark=None, restart=False, log=print,
+                     describe_fields=None):
+    """Export `fields` of every record (matching `where`) to `output_file`; returns the record count.
+
+    Continues from the object's checkpoint in the output directory, if there
+    is one for the same queries and format. Wide objects are queried in
+    column groups (see column_groups). `checksum` and `watermark` are fed
+    every record, including those exported by an earlier, interrupted run.
+    """
+    fields = list(dict.fromkeys(['Id', *fields]))
+    data_dir = os.path.dirname(output_file) or '.'
+    query = '\n'.join(column_groups.group_queries(sobject_name, fields, where, describe_fields=describe_fields))
+    _, part_file = state_paths(sobject_name, data_dir)
+
+    state = None if restart else load_state(sobject_name, data_dir)
+    if state is not None and (state.get('query') != query or state.get('format') != fmt
+                              or not os.path.exists(part_file)):
+        state = None
+    if state is None:
+        state = {'object': sobject_name, 'query': query, 'format': fmt, 'lastId': None, 'count': 0, 'offset': 0}
+        os.makedirs(os.path.dirname(part_file), exist_ok=True)
+        open(part_file, 'w').close()
+        save_state(sobject_name, data_dir, state)
+    elif state['lastId']:
+        log(f"  ↻ Resuming after {state['count']} records (Id > {state['lastId']})")
+
+    with open(part_file, 'r+') as part:
+        # Anything past the last checkpoint is a page that was cut off
+        part.truncate(state['offset'])
+        part.seek(state['offset'])
+        records = column_groups.iter_records(org_alias, sobject_name, fields, where, state['lastId'],
+                                             describe_fields=describe_fields, page_size=page_size)
+        while page := list(islice(records, page_size)):
+            for record in page:
+                part.write(json.dumps(record) + '\n')
+            part.flush()
+            os.fsync(part.fileno())
+            state.update(lastId=page[-1]['Id'], count=state['count'] + len(page), offset=part.tell())
+            save_state(sobject_name, data_dir, state)
+
+    count = record_export.export_records(record_export.read_records(part_file), output_file, sobject_name, fmt,
+                                         checksum, watermark)
+    clear_state(sobject_name, data_dir)
+    return count
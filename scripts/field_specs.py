@@ -0,0 +1,212 @@
+"""
+Normalized view of colten_care_fields_master_list.csv.
+
+The master list has rows whose columns were shifted left or right when it
+was edited by hand. load_field_specs() reads the CSV once, repairs those
+rows and returns FieldSpec objects; every repair is recorded on the spec.
+The result is cached in CACHE_FILE keyed by the CSV's mtime/size and
+content hash, so the generators and verify_csv.py share one parse.
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+CSV_FILE = 'colten_care_fields_master_list.csv'
+CACHE_FILE = '.field-specs-cache.json'
+
+# CSV header -> FieldSpec attribute
+COLUMNS = [
+    ('Object', 'object'),
+    ('Field API Name', 'api_name'),
+    ('Field Label', 'label'),
+    ('Field Type', 'field_type'),
+    ('Length', 'length'),
+    ('Precision', 'precision'),
+    ('Scale', 'scale'),
+    ('Required', 'required'),
+    ('Unique', 'unique'),
+    ('External ID', 'external_id'),
+    ('Default Value', 'default_value'),
+    ('Description', 'description'),
+    ('Help Text', 'help_text'),
+    ('Picklist Values (pipe separated)', 'picklist_values'),
+    ('Reference To', 'reference_to'),
+    ('Relationship Name', 'relationship_name'),
+    ('Relationship Label', 'relationship_label'),
+    ('Delete Constraint', 'delete_constraint'),
+    ('Master Detail', 'master_detail'),
+    ('Track History', 'track_history'),
+    ('Track Feed', 'track_feed'),
+]
+
+# Columns that slide together when a relationship row is shifted right
+RELATIONSHIP_COLUMNS = ['Reference To', 'Relationship Name', 'Relationship Label', 'Delete Constraint', 'Master Detail']
+
+# Valid object names usually start with uppercase, contain letters, no spaces (unless standard?), end with __c or are standard
+KNOWN_STANDARD_OBJECTS = frozenset({
+    'Account', 'Contact', 'Opportunity', 'User', 'Product2', 'Pricebook2',
+    'Case', 'Solution', 'Campaign', 'Lead', 'Event', 'Task',
+})
+
+PICKLIST_TYPES = ('Picklist', 'Multi-Select Picklist')
+RELATIONSHIP_TYPES = ('Lookup', 'Master-Detail')
+
+
+class FieldSpec:
+    """One normalized row of the master field list."""
+
+    __slots__ = tuple(attr for _, attr in COLUMNS) + ('row_hash', 'repairs')
+
+    def __init__(self, **values):
+        for _, attr in COLUMNS:
+            setattr(self, attr, values.get(attr, ''))
+        self.row_hash = values.get('row_hash', '')
+        self.repairs = list(values.get('repairs', []))
+
+    @property
+    def key(self):
+        return f'{self.object}.{self.api_name}'
+
+    def to_dict(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def __repr__(self):
+        return f'FieldSpec({self.key}, {self.field_type})'
+
+
+def hash_row(row):
+    # Hash the raw CSV row (before any column repairs) so callers can track inputs
+    clean = {k.strip(): (v or '') for k, v in row.items() if k}
+    return hashlib.sha256(json.dumps(clean, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def looks_like_object(value):
+    # Simple heuristic: Ends with __c or is in a known list of standard objects
+    return value in KNOWN_STANDARD_OBJECTS or value.endswith('__c')
+
+
+def repair_row(row, field_type):
+    """Fix shifted columns in place; returns a list of repair descriptions."""
+    repairs = []
+
+    # Fix Relationship fields shifted right: the referenced object ended up in
+    # one of the columns after 'Reference To'
+    if field_type in RELATIONSHIP_TYPES and not row['Reference To'].strip():
+        for shift, col in enumerate(RELATIONSHIP_COLUMNS[1:], start=1):
+            if looks_like_object(row[col].strip()):
+                values = [row[k] for k in RELATIONSHIP_COLUMNS] + [''] * shift
+                for k_idx, key in enumerate(RELATIONSHIP_COLUMNS):
+                    row[key] = values[k_idx + shift]
+                repairs.append(f"relationship columns shifted left by {shift} ('{col}' held Reference To)")
+                break
+
+    # Fix Description shifted to Picklist Values (Lookup/Text shift right)
+    if field_type not in PICKLIST_TYPES:
+        if not row['Description'] and row['Picklist Values (pipe separated)']:
+            row['Description'] = row['Picklist Values (pipe separated)']
+            repairs.append('Description recovered from Picklist Values')
+
+    # Fix Picklist Values shifted to Help Text (Picklist shift left)
+    if field_type in PICKLIST_TYPES:
+        help_text = row['Help Text']
+        if not row['Picklist Values (pipe separated)'].strip() and help_text and '|' in help_text:
+            row['Picklist Values (pipe separated)'] = help_text
+            row['Help Text'] = ''
+            repairs.append('Picklist Values recovered from Help Text')
+
+    # Map Resident/Resident__c reference to Account
+    if field_type in RELATIONSHIP_TYPES and row['Reference To'].strip() in ('Resident', 'Resident__c'):
+        row['Reference To'] = 'Account'
+        repairs.append('Resident reference mapped to Account')
+
+    return repairs
+
+
+def normalize_row(row):
+    """Build a FieldSpec from a csv.DictReader row, or None for blank rows."""
+    if not row.get('Object') or not row.get('Field API Name'):
+        return None
+    row_hash = hash_row(row)
+
+    # Clean keys; short rows give None for the missing columns
+    row = {k.strip(): (v if isinstance(v, str) else '') for k, v in row.items() if k}
+    for column, _ in COLUMNS:
+        row.setdefault(column, '')
+
+    field_type = row['Field Type'].strip()
+    repairs = repair_row(row, field_type)
+
+    values = {attr: row[column] for column, attr in COLUMNS}
+    values['object'] = row['Object'].strip()
+    values['api_name'] = row['Field API Name'].strip()
+    values['label'] = row['Field Label'].strip()
+    values['field_type'] = field_type
+    return FieldSpec(row_hash=row_hash, repairs=repairs, **values)
+
+
+def parse_csv(csv_file=CSV_FILE):
+    specs = []
+    with open(csv_file, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            spec = normalize_row(row)
+            if spec is not None:
+                specs.append(spec)
+    return specs
+
+
+def read_header(csv_file=CSV_FILE):
+    """The CSV's header row as written, with a leading BOM (if any) left on the first name."""
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def _file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _normalizer_version():
+    # Changing the repair rules must invalidate cached specs
+    return _file_sha256(os.path.abspath(__file__))
+
+
+def _read_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_field_specs(csv_file=CSV_FILE, cache_file=CACHE_FILE):
+    """Return the normalized FieldSpec list, from the cache when the CSV is unchanged."""
+    stat = os.stat(csv_file)
+    version = _normalizer_version()
+    cache = _read_cache(cache_file) if cache_file else None
+    if cache and cache.get('version') == version and cache.get('csv') == os.path.abspath(csv_file):
+        fresh = cache.get('mtime_ns') == stat.st_mtime_ns and cache.get('size') == stat.st_size
+        if fresh or cache.get('sha256') == _file_sha256(csv_file):
+            return [FieldSpec(**values) for values in cache['specs']]
+
+    specs = parse_csv(csv_file)
+    if cache_file:
+        with open(cache_file, 'w') as f:
+            json.dump({
+                'version': version,
+                'csv': os.path.abspath(csv_file),
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': _file_sha256(csv_file),
+                'specs': [spec.to_dict() for spec in specs],
+            }, f)
+    return specs
+
+
+def group_by_object(specs):
+    """Group specs by object name, keeping CSV order."""
+    grouped = {}
+    for spec in specs:
+        grouped.setdefault(spec.object, []).append(spec)
+    return grouped
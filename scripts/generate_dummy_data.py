@@ -1,51 +1,28 @@
-import json
-import subprocess
+import argparse
 import random
-from datetime import datetime, timedelta
 
-def run_command(command):
-    print(f"Running: {command}")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
-    
-    output = result.stdout
-    if not output:
-        print(f"No STDOUT. STDERR: {result.stderr}")
-        return None
-    
-    start_index = output.find('{')
-    if start_index == -1:
-        print(f"No opening brace found in output: {output}")
-        return None
-    
-    json_str = output[start_index:]
-    end_index = json_str.rfind('}') + 1
-    json_str = json_str[:end_index]
-    
-    try:
-        data = json.loads(json_str)
-        if data.get('status') != 0:
-            print(f"Command execution status non-zero: {data}")
-        return data
-    except json.JSONDecodeError as e:
-        print(f"JSONDecodeError: {e}")
-        return None
+import org_client
+from bulk_loader import report
+from composite_writer import CompositeWriter, Graph, results_by_object
 
-def get_properties():
-    prop_data = run_command('sf data query -q "SELECT Id, Name FROM Property__c" --json')
-    if not prop_data: return []
-    return prop_data['result']['records']
+def get_properties(client):
+    return client.query("SELECT Id, Name FROM Property__c")
 
-def get_rooms():
-    room_data = run_command('sf data query -q "SELECT Id, Name, Property__c FROM Room__c" --json')
-    if not room_data: return []
-    return room_data['result']['records']
+def get_rooms(client):
+    return client.query("SELECT Id, Name, Property__c FROM Room__c")
 
 def main():
+    parser = argparse.ArgumentParser(description='Create dummy residents and their enquiry records.')
+    parser.add_argument('--target-org', help='Org alias (defaults to the sf CLI default org)')
+    parser.add_argument('--count', type=int, default=5, help='Number of residents to create')
+    args = parser.parse_args()
+
     # Setup data
     rt_resident = '012KZ000000lBWxYAM' # RecType: Resident on Account
     
-    properties = get_properties()
-    rooms = get_rooms()
+    client = org_client.connect(args.target_org)
+    properties = get_properties(client)
+    rooms = get_rooms(client)
     
     if not properties or not rooms:
         print("Required base data missing (Properties or Rooms).")
@@ -55,54 +32,40 @@ def main():
     last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"]
     
     print("Generating Dummy Data...")
-    
-    resident_ids = []
-    
-    # 1. Create Resident Accounts (Person Accounts)
-    for i in range(5):
-        fn = random.choice(first_names)
-        ln = random.choice(last_names)
-        cmd = f"sf data create record -s Account -v \"FirstName='{fn}' LastName='{ln}' RecordTypeId='{rt_resident}'\" --json"
-        res = run_command(cmd)
-        if res and res.get('status') == 0:
-            acc_id = res['result']['id']
-            resident_ids.append(acc_id)
-            print(f"Created Resident Account: {fn} {ln} ({acc_id})")
+    writer = CompositeWriter(client)
 
-    if not resident_ids:
-        print("Failed to create any Resident Accounts.")
-        return
+    # 1. Create the template Assessment the residents' assessments point at
+    template = writer.insert('Assessment__c', [{'Name': 'Initial Admission Assessment', 'Type__c': 'Initial'}])
+    ass_template_ids = report('Assessment__c', template)
+    ass_template_id = ass_template_ids[0] if ass_template_ids else None
 
-    # Create a template Assessment
-    ass_template_res = run_command('sf data create record -s Assessment__c -v "Name=\'Initial Admission Assessment\' Type__c=\'Initial\'" --json')
-    ass_template_id = ass_template_res['result']['id'] if ass_template_res and 'result' in ass_template_res else None
-    
-    # 2. For each resident, create an Opportunity (Enquiry), Resident_Assessment__c, and Contract
-    for rid in resident_ids:
+    # 2. One graph per resident: the Person Account, its Opportunity (Enquiry),
+    # Resident_Assessment__c, Contract and Room_Occupancy__c are created in a
+    # single call and roll back together if any of them fails
+    graphs = []
+    for number in range(args.count):
+        first_name, last_name = random.choice(first_names), random.choice(last_names)
         prop = random.choice(properties)
         room = random.choice([r for r in rooms if r['Property__c'] == prop['Id']])
-        
-        # Opportunity (Enquiry)
-        opp_name = f"Enquiry for {rid}"
-        opp_cmd = f"sf data create record -s Opportunity -v \"Name='{opp_name}' Resident__c='{rid}' StageName='Prospecting' CloseDate='2026-12-31'\" --json"
-        opp_res = run_command(opp_cmd)
-        
-        if opp_res and opp_res.get('status') == 0:
-            opp_id = opp_res['result']['id']
-            print(f"Created Opportunity: {opp_id}")
-            
-            # Resident_Assessment__c (Corrected object name)
-            ass_val = f"Assessment__c='{ass_template_id}' " if ass_template_id else ""
-            ass_cmd = f"sf data create record -s Resident_Assessment__c -v \"{ass_val}Opportunity__c='{opp_id}' Resident__c='{rid}' Status__c='Scheduled'\" --json"
-            run_command(ass_cmd)
-            
-            # Contract (Standard Object)
-            cont_cmd = f"sf data create record -s Contract -v \"AccountId='{rid}' StartDate='2026-01-08' ContractTerm=12 Status='Draft'\" --json"
-            run_command(cont_cmd)
-            
-            # Room_Occupancy__c (Custom Object)
-            occ_cmd = f"sf data create record -s Room_Occupancy__c -v \"Resident__c='{rid}' Room__c='{room['Id']}' Start_Date__c='2026-01-08' Status__c='Reserved'\" --json"
-            run_command(occ_cmd)
+
+        graph = Graph(f"resident{number}")
+        rid = graph.add('Account', {'FirstName': first_name, 'LastName': last_name,
+                                    'RecordTypeId': rt_resident}, 'resident')
+        opp_id = graph.add('Opportunity', {'Name': f"Enquiry for {first_name} {last_name}", 'Resident__c': rid,
+                                           'StageName': 'Prospecting', 'CloseDate': '2026-12-31'}, 'enquiry')
+        assessment = {'Opportunity__c': opp_id, 'Resident__c': rid, 'Status__c': 'Scheduled'}
+        if ass_template_id:
+            assessment['Assessment__c'] = ass_template_id
+        graph.add('Resident_Assessment__c', assessment, 'assessment')  # Corrected object name
+        graph.add('Contract', {'AccountId': rid, 'StartDate': '2026-01-08',
+                               'ContractTerm': 12, 'Status': 'Draft'}, 'contract')  # Standard Object
+        graph.add('Room_Occupancy__c', {'Resident__c': rid, 'Room__c': room['Id'],
+                                        'Start_Date__c': '2026-01-08', 'Status__c': 'Reserved'}, 'occupancy')
+        graphs.append(graph)
+
+    results = writer.insert_graphs(graphs)
+    for sobject, sobject_results in results_by_object(graphs, results).items():
+        report(sobject, sobject_results)
 
     print("Dummy data generation finished.")
 
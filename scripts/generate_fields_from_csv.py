@@ -1,10 +1,16 @@
-import csv
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
 import os
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
-CSV_FILE = 'colten_care_fields_master_list.csv'
+import field_specs
+import metadata_xml
+from field_specs import CSV_FILE, group_by_object, load_field_specs
+from metadata_xml import hash_file, hash_text, write_if_changed
+
 BASE_PATH = 'force-app/main/default/objects'
+MANIFEST_FILE = '.field-manifest.json'
 
 def create_directory(path):
     if not os.path.exists(path):
@@ -13,161 +19,119 @@ def create_directory(path):
 def get_xml_header():
     return '<?xml version="1.0" encoding="UTF-8"?>\n'
 
-def format_xml(elem):
-    rough_string = ET.tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    # Remove empty lines caused by pretty print on text nodes
-    return reparsed.toprettyxml(indent="    ")
-
-def create_object_metadata(object_name, label=None, plural_label=None):
-    # Always create/overwrite to ensure correct settings
-    object_dir = os.path.join(BASE_PATH, object_name)
-    create_directory(object_dir)
-    
-    meta_file_path = os.path.join(object_dir, f'{object_name}.object-meta.xml')
-    if os.path.exists(meta_file_path):
-        return
+# Feature flags every generated custom object gets
+OBJECT_FLAGS = ['enableHistory', 'enableActivities', 'enableReports',
+                'enableSearch', 'enableSharing', 'enableStreamingApi']
 
-    root = ET.Element('CustomObject', xmlns="http://soap.sforce.com/2006/04/metadata")
-    
-    ET.SubElement(root, 'deploymentStatus').text = 'Deployed'
-    
+def build_object_metadata(object_name, label=None, plural_label=None):
+    """Default object-level settings, in the order they are written."""
     # Calculate Label
     calculated_label = label
     if not calculated_label:
         calculated_label = object_name.replace('__c', '').replace('_', ' ')
-    
-    ET.SubElement(root, 'label').text = calculated_label
-        
-    if plural_label:
-        ET.SubElement(root, 'pluralLabel').text = plural_label
-    else:
+
+    if not plural_label:
         # Simple pluralization
         if calculated_label.endswith('s'):
-             ET.SubElement(root, 'pluralLabel').text = calculated_label
+            plural_label = calculated_label
         else:
-             ET.SubElement(root, 'pluralLabel').text = calculated_label + 's'
-        
-    ET.SubElement(root, 'sharingModel').text = 'ReadWrite'
-    
+            plural_label = calculated_label + 's'
+
+    settings = {
+        'deploymentStatus': 'Deployed',
+        'label': calculated_label,
+        'pluralLabel': plural_label,
+        'sharingModel': 'ReadWrite',
+    }
     # Add essential flags
-    ET.SubElement(root, 'enableHistory').text = 'true'
-    ET.SubElement(root, 'enableActivities').text = 'true'
-    ET.SubElement(root, 'enableReports').text = 'true'
-    ET.SubElement(root, 'enableSearch').text = 'true'
-    ET.SubElement(root, 'enableSharing').text = 'true'
-    ET.SubElement(root, 'enableStreamingApi').text = 'true'
-    
+    for flag in OBJECT_FLAGS:
+        settings[flag] = 'true'
+    return {'settings': settings, 'nameField': calculated_label + ' Name', 'overrides': set()}
+
+def set_sharing_model(object_meta, sharing_model):
+    # CSV-derived settings override whatever an existing object file says
+    object_meta['settings']['sharingModel'] = sharing_model
+    object_meta['overrides'].add('sharingModel')
+
+def merge_object_metadata(root, object_meta, custom=True):
+    """Apply object_meta to a parsed object file; returns True if anything changed.
+
+    Standard objects (custom=False) only take the CSV-derived overrides
+    (sharingModel); their label, deployment status and name field belong
+    to Salesforce.
+    """
+    ns = metadata_xml.METADATA_NS
+    existing = {}
+    for child in root:
+        existing.setdefault(metadata_xml.local_name(child.tag)[1], child)
+
+    updated = False
+    for tag, value in object_meta['settings'].items():
+        if not custom and tag not in object_meta['overrides']:
+            continue
+        elem = existing.get(tag)
+        if elem is None:
+            ET.SubElement(root, f'{{{ns}}}{tag}').text = value
+            updated = True
+        elif tag in object_meta['overrides'] and elem.text != value:
+            elem.text = value
+            updated = True
+
+    if custom and 'nameField' not in existing:
+        name_field = ET.SubElement(root, f'{{{ns}}}nameField')
+        ET.SubElement(name_field, f'{{{ns}}}label').text = object_meta['nameField']
+        ET.SubElement(name_field, f'{{{ns}}}type').text = 'Text'
+        updated = True
+    return updated
+
+def write_object_metadata(object_name, object_meta):
+    """Create or update <object>.object-meta.xml; returns True if the file was written."""
+    object_dir = os.path.join(BASE_PATH, object_name)
+    meta_file_path = os.path.join(object_dir, f'{object_name}.object-meta.xml')
+
+    if os.path.exists(meta_file_path):
+        try:
+            root = ET.parse(meta_file_path).getroot()
+            # Existing files keep their hand-maintained settings; only missing
+            # elements and CSV-derived overrides (sharingModel) are applied
+            if merge_object_metadata(root, object_meta, custom=object_name.endswith('__c')):
+                metadata_xml.write(meta_file_path, root, declaration=get_xml_header())
+                print(f"Updated object metadata: {meta_file_path}")
+                return True
+        except Exception as e:
+            print(f"Error updating object metadata for {object_name}: {e}")
+        return False
+
+    if not object_name.endswith('__c'):
+        # Standard objects are never created from scratch
+        return False
+
+    create_directory(object_dir)
+    root = ET.Element('CustomObject', xmlns=metadata_xml.METADATA_NS)
+    for tag, value in object_meta['settings'].items():
+        ET.SubElement(root, tag).text = value
     name_field = ET.SubElement(root, 'nameField')
-    ET.SubElement(name_field, 'label').text = calculated_label + ' Name'
+    ET.SubElement(name_field, 'label').text = object_meta['nameField']
     ET.SubElement(name_field, 'type').text = 'Text'
 
-    with open(meta_file_path, 'w') as f:
-        f.write(format_xml(root))
-    print(f"Created/Updated object metadata: {meta_file_path}")
+    metadata_xml.write(meta_file_path, root)
+    print(f"Created object metadata: {meta_file_path}")
+    return True
+
+def create_field_metadata(spec):
+    # spec is a field_specs.FieldSpec with shifted-column repairs already applied
+    object_name = spec.object
+    api_name = spec.api_name
+    label = spec.label
+    field_type = spec.field_type
 
-def create_field_metadata(row):
-    # Clean keys
-    row = {k.strip(): v for k, v in row.items() if k}
-    
-    object_name = row['Object']
-    api_name = row['Field API Name'].strip()
-    label = row['Field Label'].strip()
-    field_type = row['Field Type'].strip()
-
-    # --- Robust Fix for Shifted Columns ---
-    # Fix Relationship fields shifted right
-    ref_to = row.get('Reference To', '').strip()
-    if field_type in ('Lookup', 'Master-Detail') and not ref_to:
-        # Columns to check in order: Relationship Name, Relationship Label, Delete Constraint, Master Detail
-        candidates = ['Relationship Name', 'Relationship Label', 'Delete Constraint', 'Master Detail']
-        found_idx = -1
-        
-        # Valid object names usually start with uppercase, contain letters, no spaces (unless standard?), end with __c or are standard
-        # Simple heuristic: Ends with __c or is in a known list of standard objects
-        known_standard = {'Account', 'Contact', 'Opportunity', 'User', 'Product2', 'Pricebook2', 'Case', 'Solution', 'Campaign', 'Lead', 'Event', 'Task'}
-        
-        for i, col in enumerate(candidates):
-            val = row.get(col)
-            if not val: continue
-            val = val.strip()
-            # Check if looks like object
-            is_obj = (val in known_standard) or (val.endswith('__c'))
-            if is_obj:
-                found_idx = i
-                break
-        
-        if found_idx != -1:
-            # Shift Found!
-            # If found at 0 (Relationship Name), shift is 1.
-            # If found at 1 (Relationship Label), shift is 2.
-            # We need to map:
-            # Ref To <- found_col
-            # Rel Name <- found_col + 1
-            # Rel Label <- found_col + 2
-            # Del Const <- found_col + 3
-            
-            # Since dict is not ordered by index access easily, using keys
-            keys = ['Reference To', 'Relationship Name', 'Relationship Label', 'Delete Constraint', 'Master Detail']
-            # We want to pull values from (0 + shift + 1) -> (1 + shift) because 'Reference To' is conceptually index -1 in candidate list?
-            # No.
-            # Ref To is keys[0].
-            # candidates[0] is keys[1].
-            # If found at candidates[0], then value for keys[0] is at keys[1]. Shift 1.
-            # If found at candidates[1], then value for keys[0] is at keys[2]. Shift 2.
-            
-            shift = found_idx + 1 
-            # Apply shift
-            # We need to read from right to left to avoid overwriting? Or just copy to temp
-            vals = {}
-            for k_idx in range(len(keys)):
-                src_key_idx = k_idx + shift
-                if src_key_idx < len(keys):
-                    src_key = keys[src_key_idx]
-                    vals[keys[k_idx]] = row.get(src_key)
-                else:
-                     # If we run off end, check Track History/Feed? 
-                     # For now, just None/Empty is fine as we mostly care about RefTo/Names
-                     vals[keys[k_idx]] = ''
-            
-            # Update row
-            for k, v in vals.items():
-                row[k] = v
-
-    # Fix Description shifted to Picklist Values (Lookup/Text shift right)
-    if field_type not in ('Picklist', 'Multi-Select Picklist'):
-        desc = row.get('Description')
-        pick_val = row.get('Picklist Values (pipe separated)')
-        if (not desc) and pick_val:
-            row['Description'] = pick_val
-            # row['Picklist Values (pipe separated)'] = '' # Optional to clear, but harmless
-            
-    # Fix Picklist Values shifted to Help Text (Picklist shift left)
-    if field_type in ('Picklist', 'Multi-Select Picklist'):
-        pick_val = row.get('Picklist Values (pipe separated)')
-        help_text = row.get('Help Text')
-        if (not pick_val or pick_val.strip() == '') and help_text and '|' in help_text:
-            row['Picklist Values (pipe separated)'] = help_text
-            row['Help Text'] = ''
-            
-
-    # -----------------------------------------
-
-    # Debug print for specific failing field
-    if api_name == 'Allocated_Room__c':
-        print(f"DEBUG ROW: {row}")
-    
     # Helper to get value or default if empty
-    def get_val(key, default):
-        val = row.get(key)
-        if val is None or val.strip() == '':
+    def get_val(val, default):
+        if val.strip() == '':
             return default
         return val
 
-    # Create object dir if not exists (and simple metadata)
-    if object_name.endswith('__c'):
-        create_object_metadata(object_name)
-
+    # Object metadata is built in memory by main() and flushed once per object
     fields_dir = os.path.join(BASE_PATH, object_name, 'fields')
     create_directory(fields_dir)
     
@@ -176,45 +140,39 @@ def create_field_metadata(row):
     ET.SubElement(root, 'label').text = label
     ET.SubElement(root, 'type').text = map_field_type(field_type)
     
-    if row.get('Description'):
-        ET.SubElement(root, 'description').text = row['Description']
+    if spec.description:
+        ET.SubElement(root, 'description').text = spec.description
     
-    if row.get('Help Text'):
-        ET.SubElement(root, 'inlineHelpText').text = row['Help Text']
+    if spec.help_text:
+        ET.SubElement(root, 'inlineHelpText').text = spec.help_text
         
-    if row.get('Required') == 'TRUE':
+    if spec.required == 'TRUE':
         ET.SubElement(root, 'required').text = 'true'
     else:
         ET.SubElement(root, 'required').text = 'false'
         
-    # Map Resident/Resident__c reference to Account
-    if field_type in ('Lookup', 'Master-Detail'):
-        ref = row.get('Reference To', '').strip()
-        if ref in ('Resident', 'Resident__c'):
-            row['Reference To'] = 'Account'
-
     if field_type == 'Text':
-        ET.SubElement(root, 'length').text = get_val('Length', '255')
-        ET.SubElement(root, 'unique').text = 'true' if row.get('Unique') == 'TRUE' else 'false'
-        ET.SubElement(root, 'externalId').text = 'true' if row.get('External ID') == 'TRUE' else 'false'
+        ET.SubElement(root, 'length').text = get_val(spec.length, '255')
+        ET.SubElement(root, 'unique').text = 'true' if spec.unique == 'TRUE' else 'false'
+        ET.SubElement(root, 'externalId').text = 'true' if spec.external_id == 'TRUE' else 'false'
 
     elif field_type == 'Long Text Area':
-        ET.SubElement(root, 'length').text = get_val('Length', '32768')
+        ET.SubElement(root, 'length').text = get_val(spec.length, '32768')
         ET.SubElement(root, 'visibleLines').text = '3'
         
     elif field_type == 'Text Area':
          pass # No length needed usually, or default
 
     elif field_type == 'Number':
-        ET.SubElement(root, 'precision').text = get_val('Precision', '18')
-        ET.SubElement(root, 'scale').text = get_val('Scale', '0')
+        ET.SubElement(root, 'precision').text = get_val(spec.precision, '18')
+        ET.SubElement(root, 'scale').text = get_val(spec.scale, '0')
         
     elif field_type == 'Currency':
-        ET.SubElement(root, 'precision').text = get_val('Precision', '18')
-        ET.SubElement(root, 'scale').text = get_val('Scale', '2')
+        ET.SubElement(root, 'precision').text = get_val(spec.precision, '18')
+        ET.SubElement(root, 'scale').text = get_val(spec.scale, '2')
         
     elif field_type == 'Checkbox':
-        ET.SubElement(root, 'defaultValue').text = row.get('Default Value', 'false').lower()
+        ET.SubElement(root, 'defaultValue').text = spec.default_value.lower()
         
     elif field_type in ('Picklist', 'Multi-Select Picklist'):
         value_set = ET.SubElement(root, 'valueSet')
@@ -237,10 +195,10 @@ def create_field_metadata(row):
         definition = ET.SubElement(value_set, 'valueSetDefinition')
         ET.SubElement(definition, 'sorted').text = 'false'
         
-        values = row.get('Picklist Values (pipe separated)', '').split('|')
+        values = spec.picklist_values.split('|')
         
         # Ensure default value is in list
-        default_val = row.get('Default Value')
+        default_val = spec.default_value
         if default_val and default_val.strip() and default_val not in values:
              values.insert(0, default_val)
 
@@ -268,40 +226,38 @@ def create_field_metadata(row):
              ET.SubElement(root, 'visibleLines').text = '4'
 
     elif field_type == 'Lookup':
-        ET.SubElement(root, 'referenceTo').text = row['Reference To']
-        ET.SubElement(root, 'relationshipLabel').text = row.get('Relationship Label', '')
-        ET.SubElement(root, 'relationshipName').text = row.get('Relationship Name', '')
+        ET.SubElement(root, 'referenceTo').text = spec.reference_to
+        ET.SubElement(root, 'relationshipLabel').text = spec.relationship_label
+        ET.SubElement(root, 'relationshipName').text = spec.relationship_name
         
-        del_constraint = row.get('Delete Constraint')
+        del_constraint = spec.delete_constraint
         if not del_constraint or del_constraint.strip() == '':
              del_constraint = 'SetNull'
         ET.SubElement(root, 'deleteConstraint').text = del_constraint
         
     elif field_type == 'Master-Detail':
-        ET.SubElement(root, 'referenceTo').text = row['Reference To']
-        ET.SubElement(root, 'relationshipLabel').text = row.get('Relationship Label', '')
-        ET.SubElement(root, 'relationshipName').text = row.get('Relationship Name', '')
+        ET.SubElement(root, 'referenceTo').text = spec.reference_to
+        ET.SubElement(root, 'relationshipLabel').text = spec.relationship_label
+        ET.SubElement(root, 'relationshipName').text = spec.relationship_name
         ET.SubElement(root, 'writeRequiresMasterRead').text = 'false'
-        
-        # Update Object Sharing Model to ControlledByParent
-        update_sharing_model(object_name)
 
 
     # Common boolean flags
-    if row.get('Track History') == 'TRUE':
+    if spec.track_history == 'TRUE':
         ET.SubElement(root, 'trackHistory').text = 'true'
     else:
         ET.SubElement(root, 'trackHistory').text = 'false'
         
-    if row.get('Track Feed') == 'TRUE':
+    if spec.track_feed == 'TRUE':
         ET.SubElement(root, 'trackTrending').text = 'true' # Map to trackTrending or trackFeedHistory depending on object
     else:
          ET.SubElement(root, 'trackTrending').text = 'false'
 
     file_path = os.path.join(fields_dir, f'{api_name}.field-meta.xml')
-    with open(file_path, 'w') as f:
-        f.write(format_xml(root))
-    print(f"Created field: {file_path}")
+    content = metadata_xml.tostring(root)
+    if write_if_changed(file_path, content):
+        print(f"Created field: {file_path}")
+    return file_path, hash_text(content)
 
 def map_field_type(val):
     val = val.strip()
@@ -325,52 +281,130 @@ def map_field_type(val):
     }
     return mapping.get(val, 'Text')
 
-def update_sharing_model(object_name):
-    object_dir = os.path.join(BASE_PATH, object_name)
-    meta_file_path = os.path.join(object_dir, f'{object_name}.object-meta.xml')
-    
-    if not os.path.exists(meta_file_path):
-        return
+def get_generator_hash():
+    # Any change to this script or the modules shaping its output invalidates the whole manifest
+    modules = [__file__, field_specs.__file__, metadata_xml.__file__]
+    return hash_text(''.join(hash_file(os.path.abspath(m)) for m in modules))
 
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {'generator': None, 'fields': {}}
     try:
-        tree = ET.parse(meta_file_path)
-        root = tree.getroot()
-        
-        ns = {'mvn': 'http://soap.sforce.com/2006/04/metadata'}
-        ET.register_namespace('', ns['mvn'])
-        
-        updated = False
-        for child in root:
-            if child.tag.endswith('sharingModel'):
-                if child.text != 'ControlledByParent':
-                    child.text = 'ControlledByParent'
-                    updated = True
-                break
-        
-        if updated:
-            with open(meta_file_path, 'w') as f:
-                f.write(format_xml(root))
-            print(f"Updated sharingModel for {object_name} to ControlledByParent")
-            
-    except Exception as e:
-        print(f"Error updating sharing model for {object_name}: {e}")
-
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {MANIFEST_FILE}: {e}")
+        return {'generator': None, 'fields': {}}
+
+def save_manifest(manifest):
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def print_report(added, changed, unchanged, orphaned):
+    print()
+    print(f"Added: {len(added)}, Changed: {len(changed)}, Unchanged: {len(unchanged)}, Orphaned: {len(orphaned)}")
+    for label, keys in (('+', added), ('~', changed), ('-', orphaned)):
+        for key in keys:
+            print(f"  {label} {key}")
+    if orphaned:
+        print("Orphaned fields are no longer in the CSV; their files were left in place.")
+
+def generate_object_fields(specs, previous, incremental):
+    # Generates all fields of one object; runs in a worker process with --jobs
+    results = []
+    has_master_detail = False
+    for spec in specs:
+        key = spec.key
+        if spec.field_type == 'Master-Detail':
+            has_master_detail = True
+        entry = previous.get(key)
+        if (incremental and entry and entry['row'] == spec.row_hash
+                and hash_file(entry['path']) == entry['file']):
+            results.append((key, entry, False))
+            continue
+        try:
+            file_path, file_hash = create_field_metadata(spec)
+        except Exception as e:
+            print(f"Error creating field {spec.api_name}: {e}")
+            continue
+        results.append((key, {'row': spec.row_hash, 'file': file_hash, 'path': file_path}, True))
+    return results, has_master_detail
+
+def object_metadata_for(object_name, has_master_detail):
+    """In-memory object settings for an object in the CSV, or None if its file needs nothing."""
+    object_meta = build_object_metadata(object_name)
+    if has_master_detail:
+        # Detail objects inherit sharing from their master
+        set_sharing_model(object_meta, 'ControlledByParent')
+    if object_name.endswith('__c') or object_meta['overrides']:
+        return object_meta
+    return None
+
+def collect_results(manifest, field_results):
+    """Merge per-object generate_object_fields() results into manifest entries and report lists."""
+    entries = {}
+    added, changed, unchanged = [], [], []
+    for results in field_results:
+        for key, entry, generated in results:
+            entries[key] = entry
+            old = manifest['fields'].get(key)
+            if old is None:
+                added.append(key)
+            elif generated and entry['file'] != old['file']:
+                changed.append(key)
+            else:
+                # Skipped, or regenerated to byte-identical output
+                unchanged.append(key)
+    orphaned = sorted(set(manifest['fields']) - set(entries))
+    return entries, added, changed, unchanged, orphaned
+
+def previous_entries(manifest, generator_hash):
+    """Manifest entries by object, or nothing when the generator itself changed."""
+    previous = manifest['fields'] if manifest.get('generator') == generator_hash else {}
+    by_object = {}
+    for key, entry in previous.items():
+        by_object.setdefault(key.split('.', 1)[0], {})[key] = entry
+    return by_object
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate field metadata from the master field list CSV.')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Only regenerate fields whose CSV row or output file changed since the last run (tracked in {MANIFEST_FILE})')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes; fields are generated per object in parallel')
+    args = parser.parse_args()
+
     if not os.path.exists(CSV_FILE):
         print(f"Error: {CSV_FILE} not found.")
         return
 
-    with open(CSV_FILE, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Skip empty lines
-            if not row['Object'] or not row['Field API Name']:
-                continue
-            try:
-                create_field_metadata(row)
-            except Exception as e:
-                print(f"Error creating field {row.get('Field API Name')}: {e}")
+    manifest = load_manifest()
+    generator_hash = get_generator_hash()
+    previous = previous_entries(manifest, generator_hash)
+
+    # Group specs by object (in CSV order); objects write to disjoint directories
+    specs_by_object = group_by_object(load_field_specs())
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {obj: pool.submit(generate_object_fields, specs, previous.get(obj, {}), args.incremental)
+                       for obj, specs in specs_by_object.items()}
+            outcomes = {obj: future.result() for obj, future in futures.items()}
+    else:
+        outcomes = {obj: generate_object_fields(specs, previous.get(obj, {}), args.incremental)
+                    for obj, specs in specs_by_object.items()}
+
+    # Flush each object file exactly once, after all fields are known
+    for object_name, (results, has_master_detail) in outcomes.items():
+        object_meta = object_metadata_for(object_name, has_master_detail)
+        if object_meta is not None:
+            write_object_metadata(object_name, object_meta)
+
+    entries, added, changed, unchanged, orphaned = collect_results(
+        manifest, [results for results, _ in outcomes.values()])
+    save_manifest({'generator': generator_hash, 'fields': entries})
+    print_report(added, changed, unchanged, orphaned)
 
 if __name__ == '__main__':
     main()
@@ -1,11 +1,10 @@
 
-import csv
 import os
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
-from collections import defaultdict
 
-CSV_FILE = 'colten_care_fields_master_list.csv'
+import metadata_xml
+from field_specs import group_by_object, load_field_specs
+
 LAYOUTS_DIR = 'force-app/main/default/layouts'
 OBJECTS_TO_SKIP = ['Event', 'Account']
 
@@ -13,11 +12,6 @@ def create_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-def format_xml(elem):
-    rough_string = ET.tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="    ")
-
 def get_layout_name(object_name):
     # Standard objects: Account-Account Layout
     # Custom objects: Room__c-Room Layout
@@ -45,7 +39,7 @@ def generate_layout(object_name, fields):
     right_col = ET.SubElement(section, 'layoutColumns')
     
     # Ensure Name field is present (Required by SF)
-    has_name = any(f['Field API Name'].strip() == 'Name' for f in fields)
+    has_name = any(f.api_name == 'Name' for f in fields)
     if not has_name and object_name != 'Task' and object_name != 'Event':
          item = ET.Element('layoutItems')
          ET.SubElement(item, 'behavior').text = 'Required'
@@ -63,7 +57,7 @@ def generate_layout(object_name, fields):
     extra_reqs = REQUIRED_APPENDS.get(object_name, [])
     for req in extra_reqs:
         # Check if already in fields (CSV might include them)
-        if any(f['Field API Name'].strip() == req for f in fields):
+        if any(f.api_name == req for f in fields):
             continue
         
         item = ET.Element('layoutItems')
@@ -73,7 +67,7 @@ def generate_layout(object_name, fields):
         left_col.append(item)
 
     for i, field in enumerate(fields):
-        api_name = field['Field API Name'].strip()
+        api_name = field.api_name
         if api_name == 'Name': continue # Already added if present, or handled above
         
         # Create LayoutItem
@@ -129,36 +123,29 @@ def generate_layout(object_name, fields):
     ET.SubElement(root, 'showRunAssignmentRulesCheckbox').text = 'false'
     ET.SubElement(root, 'showSubmitAndAttachButton').text = 'false'
     
-    # Write file
-    content = format_xml(root)
-    # Fix XML declaration usually added by minidom to include 'standalone' or just standard header?
-    # SF usually likes: <?xml version="1.0" encoding="UTF-8"?>
-    # minidom adds: <?xml version="1.0" ?> or similar.
-    # Let's just write strictly.
-    
-    with open(file_path, 'w') as f:
-        f.write(content)
-    
-    print(f"Generated layout: {file_path}")
+    # Write file (skipped when the content is unchanged)
+    # SF usually likes: <?xml version="1.0" encoding="UTF-8"?>, but keep the
+    # <?xml version="1.0" ?> declaration the minidom-based version wrote.
+    if metadata_xml.write_if_changed(file_path, metadata_xml.tostring(root)):
+        print(f"Generated layout: {file_path}")
+        return True
+    return False
 
 def main():
     create_directory(LAYOUTS_DIR)
     
-    # Read CSV and group fields
-    fields_by_object = defaultdict(list)
-    
-    with open(CSV_FILE, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            obj = row['Object'].strip()
-            if obj in OBJECTS_TO_SKIP:
-                continue
-            fields_by_object[obj].append(row)
+    # Normalized field specs, grouped by object
+    fields_by_object = group_by_object(load_field_specs())
             
     # Generate layouts
+    unchanged = 0
     for obj, fields in fields_by_object.items():
-        if not obj: continue
-        generate_layout(obj, fields)
+        if obj in OBJECTS_TO_SKIP:
+            continue
+        if not generate_layout(obj, fields):
+            unchanged += 1
+    if unchanged:
+        print(f"{unchanged} layouts unchanged")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+"""
+Regenerate force-app/main/default from the master field list in one run.
+
+Runs the field, object, layout and permission set generators off a single
+load_field_specs() call instead of four separate scripts each reading the
+CSV. Objects are independent (they write to disjoint directories), so each
+object's fields, object file and layout are produced by one worker task;
+the permission set, which reads every field file, is built last. Every
+emitter compares content hashes and leaves unchanged files untouched.
+
+    python3 scripts/generate_metadata.py                # everything
+    python3 scripts/generate_metadata.py --incremental  # skip unchanged CSV rows
+    python3 scripts/generate_metadata.py --only layouts permset
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+import generate_fields_from_csv as fields_gen
+import generate_layouts
+import generate_master_permset
+from field_specs import CSV_FILE, group_by_object, load_field_specs
+
+EMITTERS = ('fields', 'objects', 'layouts', 'permset')
+
+
+def generate_object(object_name, specs, previous, incremental, emitters):
+    """Run the per-object emitters; returns (field results, object file written, layout written)."""
+    field_results = []
+    if 'fields' in emitters:
+        field_results, _ = fields_gen.generate_object_fields(specs, previous, incremental)
+
+    object_written = False
+    if 'objects' in emitters:
+        has_master_detail = any(spec.field_type == 'Master-Detail' for spec in specs)
+        object_meta = fields_gen.object_metadata_for(object_name, has_master_detail)
+        if object_meta is not None:
+            object_written = fields_gen.write_object_metadata(object_name, object_meta)
+
+    layout_written = False
+    if 'layouts' in emitters and object_name not in generate_layouts.OBJECTS_TO_SKIP:
+        layout_written = generate_layouts.generate_layout(object_name, specs)
+
+    return field_results, object_written, layout_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate fields, objects, layouts and the master permission set from the master field list CSV.')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes; objects are generated in parallel (default: CPU count)')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Only regenerate fields whose CSV row or output file changed (tracked in {fields_gen.MANIFEST_FILE})')
+    parser.add_argument('--only', nargs='+', choices=EMITTERS, default=list(EMITTERS),
+                        help='Run only these emitters')
+    args = parser.parse_args()
+    emitters = set(args.only)
+
+    if not os.path.exists(CSV_FILE):
+        print(f"Error: {CSV_FILE} not found.")
+        return
+
+    started = time.monotonic()
+    specs_by_object = group_by_object(load_field_specs())
+
+    manifest = fields_gen.load_manifest()
+    generator_hash = fields_gen.get_generator_hash()
+    previous = fields_gen.previous_entries(manifest, generator_hash)
+
+    if 'layouts' in emitters:
+        generate_layouts.create_directory(generate_layouts.LAYOUTS_DIR)
+
+    tasks = [(obj, specs, previous.get(obj, {}), args.incremental, emitters)
+             for obj, specs in specs_by_object.items()]
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            outcomes = list(pool.map(generate_object, *zip(*tasks)))
+    else:
+        outcomes = [generate_object(*task) for task in tasks]
+
+    if 'fields' in emitters:
+        entries, added, changed, unchanged, orphaned = fields_gen.collect_results(
+            manifest, [field_results for field_results, _, _ in outcomes])
+        fields_gen.save_manifest({'generator': generator_hash, 'fields': entries})
+        fields_gen.print_report(added, changed, unchanged, orphaned)
+
+    # Reads the field files on disk, so it runs after all objects are done
+    permset_written = 'permset' in emitters and generate_master_permset.generate_permission_set()
+
+    print()
+    if 'objects' in emitters:
+        print(f"Object files written: {sum(1 for _, written, _ in outcomes if written)}")
+    if 'layouts' in emitters:
+        print(f"Layouts written: {sum(1 for _, _, written in outcomes if written)}")
+    if 'permset' in emitters:
+        print(f"Permission set {'written' if permset_written else 'unchanged'}")
+    print(f"Generated {len(specs_by_object)} objects in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
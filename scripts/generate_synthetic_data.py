@@ -0,0 +1,456 @@
+"""
+Seeded synthetic care-home data for load testing.
+
+Generates a relationally consistent dataset for the object graph in
+deployment/data/LOAD_ORDER.md, sized by a volume profile:
+
+    python3 scripts/generate_synthetic_data.py --profile large --seed 7
+    python3 scripts/generate_synthetic_data.py --residents 250000 --format csv
+
+Every record is derived from (seed, object, index) alone, so files are
+written one record at a time and a million-row dataset never sits in
+memory. The same seed and profile always produce the same files.
+
+Records carry a referenceId (attributes.referenceId, or the ReferenceId CSV
+column) and lookups hold '@<referenceId>' of their parent, as in
+`sf data import tree` plans; no org IDs are involved. Lookups only point at
+objects from earlier tiers of deployment/data/LOAD_ORDER.md.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from bulk_loader import csv_value
+
+FORMATS = ('ndjson', 'csv')
+OUTPUT_DIR = 'synthetic-data'
+# Fixed "today" so output does not depend on when the generator runs
+AS_OF = date(2026, 1, 1)
+
+PROFILES = {
+    'small': {
+        'properties': 5, 'rooms_per_property': 20, 'residents': 80,
+        'occupancy_depth': 1, 'assessments_per_resident': 1,
+        'preferences_per_resident': 2, 'surveys': 3, 'responses_per_survey': 20,
+    },
+    'medium': {
+        'properties': 22, 'rooms_per_property': 40, 'residents': 2000,
+        'occupancy_depth': 2, 'assessments_per_resident': 2,
+        'preferences_per_resident': 3, 'surveys': 10, 'responses_per_survey': 200,
+    },
+    'large': {
+        'properties': 200, 'rooms_per_property': 60, 'residents': 100000,
+        'occupancy_depth': 4, 'assessments_per_resident': 3,
+        'preferences_per_resident': 4, 'surveys': 50, 'responses_per_survey': 5000,
+    },
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "Elizabeth", "William",
+    "Margaret", "Dorothy", "George", "Joan", "Arthur", "Betty", "Kenneth", "Doreen", "Peter", "Sheila",
+    "Brian", "Jean", "Ronald", "Joyce", "Derek", "Audrey", "Frank", "Eileen", "Harold", "Sylvia",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Taylor", "Wilson", "Evans", "Thomas", "Roberts", "Walker", "Wright", "Thompson", "White", "Hughes",
+    "Edwards", "Green", "Hall", "Wood", "Harris", "Lewis", "Martin", "Jackson", "Clarke", "Turner",
+]
+PLACE_WORDS = ["Abbey", "Avon", "Bourne", "Brook", "Castle", "Court", "Linden", "Sea", "Wood", "Fern",
+               "Amber", "King", "Belmore", "Canford", "Wellington", "Braemar"]
+PLACE_SUFFIXES = ["House", "Lodge", "View", "Grange", "Reach", "Chase", "Court"]
+REGIONS = ["Dorset", "Hampshire", "West Sussex", "Wiltshire"]
+PREFERENCES = ["Gardening", "Board Games", "TV Documentaries", "Music", "Sewing", "Films and Reading",
+               "Crosswords", "Walks", "Baking", "Church Services", "Wheelchair User", "Visual Impairment"]
+ASSESSMENT_TYPES = [
+    ("Initial Medical Assessment", "Initial"), ("Risk Assessment", "Pre-Admission"),
+    ("Nutritional Assessment", "Review"), ("Mobility Assessment", "Review"),
+    ("Skin Integrity Assessment", "Change in Condition"), ("Annual Review", "Annual Review"),
+]
+SURVEY_TYPES = ["First Impressions", "End of Respite", "Family Satisfaction", "Annual Review",
+                "Complaint Follow-up", "Exit Survey"]
+ROOM_TYPES = ["Single", "Single", "Single", "Double", "Suite"]
+CARE_LEVELS = ["Low", "Low-Medium", "Medium", "Medium-High", "High", "Complex"]
+RISKS = ["Low", "Low", "Medium", "High", "Very High"]
+RATINGS = ["Very Satisfied", "Satisfied", "Satisfied", "Neutral", "Dissatisfied"]
+
+
+def ref(sobject, index):
+    return f"{sobject.replace('__c', '')}Ref{index + 1}"
+
+
+def at(sobject, index):
+    return '@' + ref(sobject, index)
+
+
+def record(sobject, index, **fields):
+    return {'attributes': {'type': sobject, 'referenceId': ref(sobject, index)}, **fields}
+
+
+def iso(day):
+    return day.isoformat()
+
+
+def iso_datetime(day, rng):
+    return datetime(day.year, day.month, day.day, rng.randint(8, 17), rng.choice((0, 15, 30, 45))).strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+
+
+class SyntheticDataset:
+    """
+    Lazy record streams for one (seed, profile).
+
+    Each stream is a generator; any record, and any decision shared between
+    objects (e.g. which room a resident currently occupies), is recomputed
+    from its index with a dedicated Random instance rather than stored.
+    """
+
+    def __init__(self, profile, seed=0):
+        self.profile = profile
+        self.seed = seed
+        self.total_rooms = profile['properties'] * profile['rooms_per_property']
+        # Current residents are spread over rooms with a stride coprime to the
+        # room count, so no two residents share a room and no table is needed
+        self._stride = self._coprime_stride(self.total_rooms)
+
+    @staticmethod
+    def _coprime_stride(n):
+        stride = max(1, int(n * 0.618))
+        while math.gcd(stride, max(n, 1)) != 1:
+            stride += 1
+        return stride
+
+    def rng(self, sobject, index):
+        return random.Random(f"{self.seed}/{sobject}/{index}")
+
+    # --- Shared derivations -----------------------------------------------
+
+    def current_room(self, resident):
+        """Room index currently occupied by `resident`, or None."""
+        if resident >= self.total_rooms:
+            return None
+        return (resident * self._stride) % self.total_rooms
+
+    def room_is_occupied(self, room):
+        resident = (room * pow(self._stride, -1, self.total_rooms)) % self.total_rooms
+        return resident < self.profile['residents']
+
+    def property_of(self, room):
+        return room // self.profile['rooms_per_property']
+
+    def weekly_rate(self, room):
+        return self.rng('Room__c', room).randrange(950, 1750, 5)
+
+    def resident_name(self, resident):
+        rng = self.rng('Account', resident)
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    def admission_date(self, resident):
+        return AS_OF - timedelta(days=self.rng('Admission', resident).randint(7, 5 * 365))
+
+    def placement(self, resident):
+        """(room, property) for the resident: the current room, else a room they enquired about."""
+        room = self.current_room(resident)
+        if room is None:
+            room = self.rng('Placement', resident).randrange(self.total_rooms)
+        return room, self.property_of(room)
+
+    # --- Streams ----------------------------------------------------------
+
+    def preferences(self):
+        for i, name in enumerate(PREFERENCES):
+            yield record('Preference__c', i, Name=name)
+
+    def assessment_types(self):
+        for i, (name, kind) in enumerate(ASSESSMENT_TYPES):
+            yield record('Assessment__c', i, Name=name, Type__c=kind)
+
+    def properties(self):
+        for i in range(self.profile['properties']):
+            rng = self.rng('Property__c', i)
+            name = f"{rng.choice(PLACE_WORDS)} {rng.choice(PLACE_SUFFIXES)}"
+            if i >= len(PLACE_WORDS) * len(PLACE_SUFFIXES) // 2:
+                name += f" {i + 1}"
+            yield record(
+                'Property__c', i,
+                Name=name,
+                Property_Code__c=f"SYN-{i + 1:04d}",
+                Region__c=rng.choice(REGIONS),
+                City__c=rng.choice(["Poole", "Bournemouth", "Salisbury", "Winchester", "Chichester", "Dorchester"]),
+                CQC_Rating__c=rng.choice(["Outstanding", "Good", "Good", "Requires Improvement"]),
+                Status__c='Active',
+                Total_Beds__c=self.profile['rooms_per_property'],
+            )
+
+    def rooms(self):
+        per_property = self.profile['rooms_per_property']
+        for i in range(self.total_rooms):
+            rng = self.rng('Room__c', i)
+            rate = rng.randrange(950, 1750, 5)  # same draw as weekly_rate()
+            floor = rng.randint(0, 2)
+            yield record(
+                'Room__c', i,
+                Name=f"R{i % per_property + 1}",
+                Property__c=at('Property__c', self.property_of(i)),
+                Room_Type__c=rng.choice(ROOM_TYPES),
+                Floor_Number__c=floor,
+                Ground_Floor__c=floor == 0,
+                Ensuite__c=rng.random() < 0.7,
+                Garden_View__c=rng.random() < 0.4,
+                Base_Weekly_Rate__c=rate,
+                Availability_Status__c='Occupied' if self.room_is_occupied(i) else 'Available',
+            )
+
+    def accounts(self):
+        for i in range(self.profile['residents']):
+            first, last = self.resident_name(i)
+            yield record('Account', i, FirstName=first, LastName=last)
+
+    def residents(self):
+        for i in range(self.profile['residents']):
+            rng = self.rng('Resident__c', i)
+            room = self.current_room(i)
+            fields = {
+                'Account__c': at('Account', i),
+                'Care_Level__c': rng.choice(CARE_LEVELS),
+                'Dementia_Care_Required__c': rng.random() < 0.35,
+                'Nursing_Care_Required__c': rng.random() < 0.3,
+                'Resident_Status__c': 'Prospective',
+            }
+            if room is not None:
+                fields.update(
+                    Current_Room__c=at('Room__c', room),
+                    Current_Care_Home__c=at('Property__c', self.property_of(room)),
+                    Resident_Since__c=iso(self.admission_date(i)),
+                    Resident_Status__c='Permanent',
+                )
+            yield record('Resident__c', i, **fields)
+
+    def resident_preferences(self):
+        per_resident = min(self.profile['preferences_per_resident'], len(PREFERENCES))
+        index = 0
+        for resident in range(self.profile['residents']):
+            rng = self.rng('Resident_Preference__c', resident)
+            for preference in rng.sample(range(len(PREFERENCES)), per_resident):
+                yield record('Resident_Preference__c', index,
+                             Resident__c=at('Account', resident),
+                             Preference__c=at('Preference__c', preference),
+                             Type__c='Need' if PREFERENCES[preference] in ('Wheelchair User', 'Visual Impairment') else 'Interest')
+                index += 1
+
+    def resident_assessments(self):
+        index = 0
+        for resident in range(self.profile['residents']):
+            rng = self.rng('Resident_Assessment__c', resident)
+            day = self.admission_date(resident) - timedelta(days=14)
+            for _ in range(self.profile['assessments_per_resident']):
+                completed = day < AS_OF
+                yield record('Resident_Assessment__c', index,
+                             Resident__c=at('Account', resident),
+                             Assessment__c=at('Assessment__c', rng.randrange(len(ASSESSMENT_TYPES))),
+                             Assessment_Date__c=iso_datetime(day, rng),
+                             Status__c='Completed' if completed else 'Scheduled',
+                             Falls_Risk__c=rng.choice(RISKS),
+                             Nutrition_Risk__c=rng.choice(RISKS),
+                             Care_Level_Recommendation__c=rng.choice(CARE_LEVELS))
+                day += timedelta(days=rng.randint(60, 240))
+                index += 1
+
+    def room_occupancies(self):
+        """Completed history stays, then the current stay for placed residents."""
+        index = 0
+        depth = self.profile['occupancy_depth']
+        for resident in range(self.profile['residents']):
+            rng = self.rng('Room_Occupancy__c', resident)
+            current = self.current_room(resident)
+            end = self.admission_date(resident) if current is not None else AS_OF - timedelta(days=rng.randint(30, 400))
+            stays = []
+            for _ in range(depth):
+                start = end - timedelta(days=rng.randint(7, 42))
+                stays.append((rng.randrange(self.total_rooms), start, end))
+                end = start - timedelta(days=rng.randint(30, 365))
+            for room, start, finish in reversed(stays):
+                yield record('Room_Occupancy__c', index,
+                             Resident__c=at('Account', resident), Room__c=at('Room__c', room),
+                             Start_Date__c=iso(start), Actual_End_Date__c=iso(finish),
+                             Occupancy_Type__c='Respite', Status__c='Completed',
+                             Weekly_Rate__c=self.weekly_rate(room))
+                index += 1
+            if current is not None:
+                yield record('Room_Occupancy__c', index,
+                             Resident__c=at('Account', resident), Room__c=at('Room__c', current),
+                             Start_Date__c=iso(self.admission_date(resident)),
+                             Occupancy_Type__c='Permanent', Status__c='Current',
+                             Weekly_Rate__c=self.weekly_rate(current))
+                index += 1
+
+    def enquiries(self):
+        for i in range(self.profile['residents']):
+            rng = self.rng('Enquiry__c', i)
+            _, prop = self.placement(i)
+            placed = self.current_room(i) is not None
+            yield record('Enquiry__c', i,
+                         Prospective_Resident__c=at('Account', i),
+                         Preferred_Location__c=at('Property__c', prop),
+                         Enquiry_Date__c=iso_datetime(self.admission_date(i) - timedelta(days=rng.randint(21, 90)), rng),
+                         Enquiry_Source__c=rng.choice(["Phone Call", "Website", "Email", "Walk-in"]),
+                         Status__c='Converted to Opportunity' if placed else rng.choice(["New", "Contacted", "Information Sent"]))
+
+    def opportunities(self):
+        for i in range(self.profile['residents']):
+            rng = self.rng('Opportunity', i)
+            room, prop = self.placement(i)
+            placed = self.current_room(i) is not None
+            first, last = self.resident_name(i)
+            admitted = self.admission_date(i)
+            yield record('Opportunity', i,
+                         Name=f"{first} {last} Enquiry",
+                         AccountId=at('Account', i),
+                         Resident__c=at('Account', i),
+                         Care_Home__c=at('Property__c', prop),
+                         Preferred_Room__c=at('Room__c', room),
+                         StageName='Closed Won' if placed else 'Prospecting',
+                         CloseDate=iso(admitted if placed else AS_OF + timedelta(days=rng.randint(14, 120))),
+                         Expected_Move_In_Date__c=iso(admitted),
+                         Weekly_Rate__c=self.weekly_rate(room))
+
+    def surveys(self):
+        for i in range(self.profile['surveys']):
+            kind = SURVEY_TYPES[i % len(SURVEY_TYPES)]
+            yield record('Survey__c', i, Name=f"{kind} {i // len(SURVEY_TYPES) + 1}",
+                         Survey_Type__c=kind, Active__c=True)
+
+    def survey_responses(self):
+        index = 0
+        residents = self.profile['residents']
+        for survey in range(self.profile['surveys']):
+            rng = self.rng('Survey_Response__c', survey)
+            for _ in range(self.profile['responses_per_survey'] if residents else 0):
+                resident = rng.randrange(residents)
+                yield record('Survey_Response__c', index,
+                             Survey__c=at('Survey__c', survey),
+                             Resident__c=at('Account', resident),
+                             Response_Date__c=iso_datetime(AS_OF - timedelta(days=rng.randint(1, 365)), rng),
+                             Overall_Rating__c=rng.choice(RATINGS),
+                             Food_Rating__c=rng.randint(1, 5),
+                             Staff_Rating__c=rng.randint(1, 5),
+                             Room_Rating__c=rng.randint(1, 5))
+                index += 1
+
+    def contracts(self):
+        index = 0
+        for resident in range(self.profile['residents']):
+            room = self.current_room(resident)
+            if room is None:
+                continue
+            start = self.admission_date(resident)
+            yield record('Contract__c', index,
+                         Resident__c=at('Account', resident),
+                         Opportunity__c=at('Opportunity', resident),
+                         Contract_Type__c='Permanent Residence',
+                         Contract_Start_Date__c=iso(start),
+                         Signed_Date__c=iso(start - timedelta(days=3)),
+                         Status__c='Active',
+                         Weekly_Rate__c=self.weekly_rate(room),
+                         Payment_Frequency__c='Monthly')
+            index += 1
+
+
+# (LOAD_ORDER.md path without extension, sObject, stream method, CSV columns)
+LOAD_PLAN = [
+    ('01-reference-data/preferences', 'Preference__c', 'preferences', ['Name']),
+    ('01-reference-data/assessment-types', 'Assessment__c', 'assessment_types', ['Name', 'Type__c']),
+    ('02-properties/properties', 'Property__c', 'properties',
+     ['Name', 'Property_Code__c', 'Region__c', 'City__c', 'CQC_Rating__c', 'Status__c', 'Total_Beds__c']),
+    ('03-rooms/rooms', 'Room__c', 'rooms',
+     ['Name', 'Property__c', 'Room_Type__c', 'Floor_Number__c', 'Ground_Floor__c', 'Ensuite__c',
+      'Garden_View__c', 'Base_Weekly_Rate__c', 'Availability_Status__c']),
+    ('04-accounts-contacts/accounts', 'Account', 'accounts', ['FirstName', 'LastName']),
+    ('05-residents/residents', 'Resident__c', 'residents',
+     ['Account__c', 'Care_Level__c', 'Dementia_Care_Required__c', 'Nursing_Care_Required__c',
+      'Resident_Status__c', 'Current_Room__c', 'Current_Care_Home__c', 'Resident_Since__c']),
+    ('05-residents/resident-preferences', 'Resident_Preference__c', 'resident_preferences',
+     ['Resident__c', 'Preference__c', 'Type__c']),
+    ('06-assessments/resident-assessments', 'Resident_Assessment__c', 'resident_assessments',
+     ['Resident__c', 'Assessment__c', 'Assessment_Date__c', 'Status__c',
+      'Falls_Risk__c', 'Nutrition_Risk__c', 'Care_Level_Recommendation__c']),
+    ('07-occupancy/room-occupancy', 'Room_Occupancy__c', 'room_occupancies',
+     ['Resident__c', 'Room__c', 'Start_Date__c', 'Actual_End_Date__c',
+      'Occupancy_Type__c', 'Status__c', 'Weekly_Rate__c']),
+    ('08-opportunities/enquiries', 'Enquiry__c', 'enquiries',
+     ['Prospective_Resident__c', 'Preferred_Location__c', 'Enquiry_Date__c', 'Enquiry_Source__c', 'Status__c']),
+    ('08-opportunities/opportunities', 'Opportunity', 'opportunities',
+     ['Name', 'AccountId', 'Resident__c', 'Care_Home__c', 'Preferred_Room__c', 'StageName', 'CloseDate',
+      'Expected_Move_In_Date__c', 'Weekly_Rate__c']),
+    ('09-surveys/surveys', 'Survey__c', 'surveys', ['Name', 'Survey_Type__c', 'Active__c']),
+    ('09-surveys/survey-responses', 'Survey_Response__c', 'survey_responses',
+     ['Survey__c', 'Resident__c', 'Response_Date__c', 'Overall_Rating__c', 'Food_Rating__c',
+      'Staff_Rating__c', 'Room_Rating__c']),
+    ('09-surveys/contracts', 'Contract__c', 'contracts',
+     ['Resident__c', 'Opportunity__c', 'Contract_Type__c', 'Contract_Start_Date__c', 'Signed_Date__c',
+      'Status__c', 'Weekly_Rate__c', 'Payment_Frequency__c']),
+]
+
+
+def write_stream(records, path, fmt, columns):
+    """Write records one at a time; returns the record count."""
+    count = 0
+    with open(path, 'w', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['ReferenceId'] + columns)
+            for rec in records:
+                writer.writerow([rec['attributes']['referenceId']] + [csv_value(rec.get(c)) for c in columns])
+                count += 1
+        else:
+            for rec in records:
+                f.write(json.dumps(rec) + '\n')
+                count += 1
+    return count
+
+
+def generate(dataset, output_dir, fmt='ndjson', only=None):
+    """Write every LOAD_PLAN file (or just the sObjects in `only`); returns {sobject: count}."""
+    counts = {}
+    for stem, sobject, stream, columns in LOAD_PLAN:
+        if only and sobject not in only:
+            continue
+        path = os.path.join(output_dir, f"{stem}.{fmt}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        counts[sobject] = write_stream(getattr(dataset, stream)(), path, fmt, columns)
+        print(f"  {sobject:<24} {counts[sobject]:>9}  {path}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a seeded synthetic dataset following LOAD_ORDER.md.')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small', help='Base volume profile')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed + profile = same files)')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson', dest='fmt', help='Output file format')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--only', nargs='+', metavar='SOBJECT', help='Only write these objects')
+    for key in PROFILES['small']:
+        parser.add_argument('--' + key.replace('_', '-'), type=int, dest=key, help='Override the profile value')
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    for key in profile:
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+    if profile['properties'] < 1 or profile['rooms_per_property'] < 1:
+        parser.error('at least one property and one room per property are required')
+
+    print(f"Generating synthetic data (profile={args.profile}, seed={args.seed})")
+    for key, value in profile.items():
+        print(f"  {key}: {value}")
+    print()
+
+    counts = generate(SyntheticDataset(profile, args.seed), args.output_dir, args.fmt, args.only)
+    print(f"\n✅ {sum(counts.values())} records written to {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
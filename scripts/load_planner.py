@@ -0,0 +1,331 @@
+"""
+Plan the data load order from the lookup/master-detail graph.
+
+The graph is built either from the <referenceTo> elements of the generated
+field metadata (MetadataIndex) or from sObject describes (an org through
+DescribeCache, or the describe snapshots at the repository root). An edge
+Room__c.Property__c -> Property__c means Room__c has to load after
+Property__c.
+
+Objects are topologically sorted into tiers: every object in a tier only
+depends on objects in earlier tiers, so the objects of one tier can load
+concurrently. Cycles (an object looking up an object that looks back at
+it, or at itself) are broken by deferring optional lookups inside the
+cycle: the records load without those fields first and a second pass sets
+them once every tier is in. A cycle made only of required fields
+(Master-Detail or non-nillable lookups) can't be loaded and is an error.
+
+    python3 scripts/load_planner.py                   # tiers from the metadata index
+    python3 scripts/load_planner.py --source describe --target-org myorg
+    python3 scripts/load_planner.py --format tsv      # read by deployment/scripts/load-data.sh
+    python3 scripts/load_planner.py --format markdown > deployment/data/LOAD_ORDER.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+
+import describe_cache
+import describe_reader
+from metadata_index import CACHE_FILE, MetadataIndex
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+OBJECTS_DIR = os.path.join(REPO_ROOT, 'force-app', 'main', 'default', 'objects')
+
+# sObject -> (file under deployment/data, description) for the objects load-data.sh imports
+DATA_FILES = {
+    'Preference__c': ('01-reference-data/preferences.json', 'Preferences'),
+    'Assessment__c': ('01-reference-data/assessment-types.json', 'Assessment Types'),
+    'Product2': ('01-reference-data/products.json', 'Products'),
+    'Property__c': ('02-properties/properties.json', 'Properties'),
+    'Room__c': ('03-rooms/rooms.json', 'Rooms'),
+    'Account': ('04-accounts-contacts/accounts.json', 'Accounts'),
+    'Contact': ('04-accounts-contacts/contacts.json', 'Contacts'),
+    'Resident__c': ('05-residents/residents.json', 'Residents'),
+    'Resident_Preference__c': ('05-residents/resident-preferences.json', 'Resident Preferences'),
+    'Resident_Assessment__c': ('06-assessments/resident-assessments.json', 'Resident Assessments'),
+    'Room_Occupancy__c': ('07-occupancy/room-occupancy.json', 'Room Occupancy Records'),
+    'Enquiry__c': ('08-opportunities/enquiries.json', 'Enquiries'),
+    'Opportunity': ('08-opportunities/opportunities.json', 'Opportunities'),
+    'Survey__c': ('09-surveys/surveys.json', 'Surveys'),
+    'Survey_Response__c': ('09-surveys/survey-responses.json', 'Survey Responses'),
+    'Contract__c': ('09-surveys/contracts.json', 'Contracts'),
+}
+
+# Standard lookups between loaded objects that have no field file in source
+STANDARD_REFERENCES = [
+    ('Contact', 'AccountId', 'Account'),
+    ('Opportunity', 'AccountId', 'Account'),
+]
+
+Reference = namedtuple('Reference', ['source', 'field', 'target', 'required'])
+LoadPlan = namedtuple('LoadPlan', ['tiers', 'deferred'])
+
+
+class LoadOrderError(Exception):
+    pass
+
+
+# --- Graph ------------------------------------------------------------------
+
+def graph_from_index(objects, index=None):
+    """References between `objects` from the field metadata in source."""
+    index = index or MetadataIndex(OBJECTS_DIR, cache_file=os.path.join(REPO_ROOT, CACHE_FILE))
+    objects = set(objects)
+    references = [Reference(source, field, target, False)
+                  for source, field, target in STANDARD_REFERENCES
+                  if source in objects and target in objects]
+    for source in sorted(objects):
+        for field, target in index.references(source).items():
+            if target not in objects:
+                continue
+            info = index.field(source, field)
+            references.append(Reference(source, field, target, info.type == 'MasterDetail' or info.required))
+    return references
+
+
+def graph_from_describes(describes):
+    """References between the described objects; `describes` maps object -> describe."""
+    references = []
+    for source in sorted(describes):
+        for field in describes[source]['fields']:
+            # System lookups (CreatedById, PersonContactId, ...) are never loaded
+            if not field.get('createable'):
+                continue
+            required = not field.get('nillable', True) and not field.get('defaultedOnCreate', False)
+            for target in field.get('referenceTo') or ():
+                if target in describes:
+                    references.append(Reference(source, field['name'], target, required))
+    return references
+
+
+def load_describes(objects, org_alias=None):
+    """Describes of `objects` from an org, or from the committed snapshots when no org is given."""
+    if org_alias:
+        return describe_cache.DescribeCache(org_alias).describe_many(sorted(objects))
+    snapshots = describe_cache.find_snapshots()
+    return {name: describe_reader.read_snapshot(path) for name, path in snapshots.items() if name in objects}
+
+
+# --- Planning -----------------------------------------------------------------
+
+def dependencies(objects, references):
+    """{object: set of objects it must load after}"""
+    depends = {name: set() for name in objects}
+    for ref in references:
+        if ref.source != ref.target:
+            depends[ref.source].add(ref.target)
+    return depends
+
+
+def strongly_connected(objects, references):
+    """Strongly connected components of the reference graph (Tarjan), each a sorted list."""
+    depends = dependencies(objects, references)
+    index, low, stack, on_stack, components = {}, {}, [], set(), []
+
+    def visit(name):
+        index[name] = low[name] = len(index)
+        stack.append(name)
+        on_stack.add(name)
+        for target in sorted(depends[name]):
+            if target not in index:
+                visit(target)
+                low[name] = min(low[name], low[target])
+            elif target in on_stack:
+                low[name] = min(low[name], index[target])
+        if low[name] == index[name]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == name:
+                    break
+            components.append(sorted(component))
+
+    for name in sorted(objects):
+        if name not in index:
+            visit(name)
+    return components
+
+
+def tiers(objects, references):
+    """Kahn's algorithm by levels; raises LoadOrderError if the graph still has a cycle."""
+    depends = dependencies(objects, references)
+    placed = set()
+    result = []
+    while len(placed) < len(depends):
+        tier = sorted(name for name, targets in depends.items()
+                      if name not in placed and targets <= placed)
+        if not tier:
+            remaining = sorted(set(depends) - placed)
+            raise LoadOrderError(f"Cycle between {', '.join(remaining)}")
+        result.append(tier)
+        placed.update(tier)
+    return result
+
+
+def break_cycle(component, references):
+    """Optional references to defer so that `component` loads in some order.
+
+    Members are ordered by their required references (which must not form a
+    cycle themselves), objects with fewer optional dependencies first; every
+    optional reference pointing at an object later in that order, or at the
+    object itself, is deferred.
+    """
+    members = set(component)
+    inside = [ref for ref in references if ref.source in members and ref.target in members]
+    required = [ref for ref in inside if ref.required]
+    for ref in required:
+        if ref.source == ref.target:
+            raise LoadOrderError(f"{ref.source}.{ref.field} is a required reference to its own object")
+    try:
+        required_tiers = tiers(component, required)
+    except LoadOrderError:
+        fields = ', '.join(f"{ref.source}.{ref.field}" for ref in required)
+        raise LoadOrderError(f"Required references form a cycle: {fields}") from None
+
+    optional_count = {name: sum(1 for ref in inside if ref.source == name and not ref.required)
+                      for name in component}
+    order = [name for tier in required_tiers for name in sorted(tier, key=lambda n: (optional_count[n], n))]
+    position = {name: i for i, name in enumerate(order)}
+    return [ref for ref in inside
+            if not ref.required and position[ref.target] >= position[ref.source]]
+
+
+def plan_load(objects, references):
+    """LoadPlan(tiers, deferred) where deferred maps object -> fields set in a second pass."""
+    objects = sorted(objects)
+    deferred = []
+    for component in strongly_connected(objects, references):
+        self_loops = [ref for ref in references
+                      if ref.source == ref.target and ref.source in component]
+        if len(component) > 1 or self_loops:
+            deferred.extend(break_cycle(component, references))
+
+    remaining = [ref for ref in references if ref not in deferred]
+    deferred_fields = {}
+    for ref in deferred:
+        deferred_fields.setdefault(ref.source, []).append(ref.field)
+    return LoadPlan(tiers(objects, remaining),
+                    {name: sorted(set(fields)) for name, fields in sorted(deferred_fields.items())})
+
+
+def split_record(record, deferred_fields):
+    """Split a record into its first-pass fields and the deferred ones for the second pass."""
+    first = {key: value for key, value in record.items() if key not in deferred_fields}
+    second = {key: record[key] for key in deferred_fields if record.get(key) is not None}
+    return first, second
+
+
+# --- Output -----------------------------------------------------------------
+
+def print_plan(plan, references):
+    targets = {}
+    for ref in references:
+        targets.setdefault(ref.source, set()).add(ref.target)
+    for number, tier in enumerate(plan.tiers, start=1):
+        print(f"Tier {number}:")
+        for name in tier:
+            after = sorted(targets.get(name, set()) - {name})
+            print(f"  {name}" + (f" (→ {', '.join(after)})" if after else ""))
+    if plan.deferred:
+        print("Second pass:")
+        for name, fields in plan.deferred.items():
+            print(f"  {name}: {', '.join(fields)}")
+
+
+def print_tsv(plan):
+    """tier, object, data file, description, deferred fields — one object per line."""
+    for number, tier in enumerate(plan.tiers, start=1):
+        for name in tier:
+            data_file, description = DATA_FILES.get(name, ('', name))
+            print('\t'.join([str(number), name, data_file, description, ','.join(plan.deferred.get(name, []))]))
+
+
+MARKDOWN_HEADER = """# Data Load Order
+
+Generated from the lookup/master-detail references in the field metadata by
+`scripts/load_planner.py`; `deployment/scripts/load-data.sh` asks the planner for
+the tiers on every run. Objects in the same tier don't depend on each other and
+load concurrently. Regenerate this file after adding a lookup:
+
+```bash
+python3 scripts/load_planner.py --format markdown > deployment/data/LOAD_ORDER.md
+```
+"""
+
+MARKDOWN_NOTES = """---
+
+**Important Notes:**
+- References that form a cycle (e.g. two objects looking each other up) are
+  loaded without the looping lookup first and set in a second pass; the planner
+  lists those fields under "Second pass"
+- External IDs should be used for data loading to enable relationship mapping
+- Use `sf data import tree` or SFDX Data Loader for bulk imports
+- For production deployments, use incremental loads with proper validation"""
+
+
+def print_markdown(plan, references):
+    """deployment/data/LOAD_ORDER.md"""
+    targets = {}
+    for ref in references:
+        targets.setdefault(ref.source, set()).add(ref.target)
+    print(MARKDOWN_HEADER)
+    number = 0
+    for tier_number, tier in enumerate(plan.tiers, start=1):
+        tier_targets = sorted(set().union(*(targets.get(name, set()) - {name} for name in tier)))
+        heading = f"Depends on {', '.join(tier_targets)}" if tier_targets else "No Dependencies"
+        print(f"## Tier {tier_number}: {heading}")
+        for name in tier:
+            number += 1
+            data_file = DATA_FILES.get(name, (f'{name}.json',))[0]
+            after = sorted(targets.get(name, set()) - {name})
+            print(f"{number}. `{data_file}` - {name}" + (f" (→ {', '.join(after)})" if after else ""))
+        print()
+    if plan.deferred:
+        print("## Second pass")
+        for name, fields in plan.deferred.items():
+            print(f"- {name}: {', '.join(fields)}")
+        print()
+    print(MARKDOWN_NOTES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan the data load order from the lookup/master-detail graph.')
+    parser.add_argument('--source', choices=('index', 'describe'), default='index',
+                        help='Build the graph from field metadata in source (default) or from describes')
+    parser.add_argument('--target-org', help='Org to describe with --source describe (default: describe snapshots)')
+    parser.add_argument('--objects', nargs='+', default=list(DATA_FILES),
+                        help='Objects to plan (default: the objects load-data.sh imports)')
+    parser.add_argument('--format', choices=('text', 'json', 'tsv', 'markdown'), default='text')
+    args = parser.parse_args()
+
+    if args.source == 'describe':
+        describes = load_describes(args.objects, args.target_org)
+        missing = sorted(set(args.objects) - set(describes))
+        if missing:
+            print(f"No describe for {', '.join(missing)}; planned without their references", file=sys.stderr)
+        references = graph_from_describes(describes)
+    else:
+        references = graph_from_index(args.objects)
+
+    try:
+        plan = plan_load(args.objects, references)
+    except LoadOrderError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+    if args.format == 'json':
+        print(json.dumps({'tiers': plan.tiers, 'deferred': plan.deferred}, indent=2))
+    elif args.format == 'tsv':
+        print_tsv(plan)
+    elif args.format == 'markdown':
+        print_markdown(plan, references)
+    else:
+        print_plan(plan, references)
+
+
+if __name__ == '__main__':
+    main()
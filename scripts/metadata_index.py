@@ -0,0 +1,248 @@
+"""
+In-memory index of the objects and fields under force-app/main/default/objects.
+
+The tree is walked once with os.scandir. Each object and field file is read
+with a streaming iterparse that only looks at the top-level elements, so
+text inside a description or help text can never be mistaken for a
+<formula> or a <type>. Parsed results are persisted in CACHE_FILE keyed by
+file mtime and size; later runs only re-parse files that changed, using a
+process pool when there are many of them.
+
+    index = MetadataIndex()
+    index.objects()                          # ['Account', 'Assessment__c', ...]
+    index.field('Room__c', 'Property__c')    # FieldInfo(type='MasterDetail', ...)
+    index.references('Room_Occupancy__c')    # {'Room__c': 'Room__c', ...}
+    index.referenced_by('Property__c')       # [('Room__c', 'Property__c'), ...]
+
+Scripts that change files on disk call refresh() afterwards (or forget()
+the paths they removed) and save() to keep the cache current.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+import metadata_xml
+
+OBJECTS_DIR = 'force-app/main/default/objects'
+CACHE_FILE = '.metadata-index.json'
+# Bump when FieldInfo/ObjectInfo or the scanners change so old caches are ignored
+INDEX_VERSION = 2
+# Re-parsing fewer files than this is faster than starting a process pool
+PARALLEL_THRESHOLD = 200
+
+OBJECT_SUFFIX = '.object-meta.xml'
+FIELD_SUFFIX = '.field-meta.xml'
+
+FieldInfo = namedtuple('FieldInfo', ['type', 'formula', 'required', 'reference_to',
+                                     'relationship_name', 'label'])
+ObjectInfo = namedtuple('ObjectInfo', ['label', 'plural_label', 'sharing_model'])
+
+
+def _top_level(path, tags):
+    """Text of the wanted direct children of a metadata file's root."""
+    values = {}
+    depth = 0
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            tag = metadata_xml.local_name(elem.tag)[1]
+            if tag in tags:
+                values[tag] = elem.text or ''
+            # Top-level children are finished with; keep memory flat
+            elem.clear()
+    return values
+
+
+def scan_field(path):
+    values = _top_level(path, ('type', 'formula', 'required', 'referenceTo', 'relationshipName', 'label'))
+    return FieldInfo(
+        type=values.get('type', ''),
+        formula='formula' in values,
+        required=values.get('required', '').strip() == 'true',
+        reference_to=values.get('referenceTo') or None,
+        relationship_name=values.get('relationshipName') or None,
+        label=values.get('label', ''),
+    )
+
+
+def scan_object(path):
+    values = _top_level(path, ('label', 'pluralLabel', 'sharingModel'))
+    return ObjectInfo(
+        label=values.get('label', ''),
+        plural_label=values.get('pluralLabel', ''),
+        sharing_model=values.get('sharingModel') or None,
+    )
+
+
+def scan_file(path):
+    # Module-level so it can run in a worker process
+    try:
+        info = scan_object(path) if path.endswith(OBJECT_SUFFIX) else scan_field(path)
+    except ET.ParseError as e:
+        print(f"Skipping unreadable metadata file {path}: {e}")
+        return None
+    return list(info)
+
+
+class MetadataIndex:
+    """Objects and fields of a source tree, answered from memory."""
+
+    def __init__(self, objects_dir=OBJECTS_DIR, cache_file=CACHE_FILE, jobs=None):
+        self.objects_dir = objects_dir
+        self.cache_file = cache_file
+        self.jobs = jobs or os.cpu_count() or 1
+        self._entries = self._load()
+        self._dirty = False
+        self.refresh()
+
+    # --- Cache ------------------------------------------------------------
+
+    def _load(self):
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != INDEX_VERSION or cache.get('root') != os.path.abspath(self.objects_dir):
+            return {}
+        return cache.get('files', {})
+
+    def save(self):
+        if not self.cache_file or not self._dirty:
+            return
+        with open(self.cache_file, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'root': os.path.abspath(self.objects_dir),
+                       'files': self._entries}, f)
+        self._dirty = False
+
+    # --- Scanning ---------------------------------------------------------
+
+    def _walk(self):
+        """Yield (object name, field name or None, DirEntry) for every metadata file."""
+        if not os.path.isdir(self.objects_dir):
+            return
+        for obj_entry in os.scandir(self.objects_dir):
+            if not obj_entry.is_dir():
+                continue
+            yield obj_entry.name, None, None
+            for entry in os.scandir(obj_entry.path):
+                if entry.name == obj_entry.name + OBJECT_SUFFIX:
+                    yield obj_entry.name, None, entry
+                elif entry.name == 'fields' and entry.is_dir():
+                    for field_entry in os.scandir(entry.path):
+                        if field_entry.name.endswith(FIELD_SUFFIX):
+                            yield obj_entry.name, field_entry.name[:-len(FIELD_SUFFIX)], field_entry
+
+    def refresh(self):
+        """Rescan the tree, re-parsing only files whose mtime or size changed."""
+        found = {}
+        stale = []
+        object_dirs = []
+        for object_name, field_name, entry in self._walk():
+            if entry is None:
+                object_dirs.append(object_name)
+                continue
+            stat = entry.stat()
+            found[entry.path] = (object_name, field_name)
+            cached = self._entries.get(entry.path)
+            if not cached or cached['mtime_ns'] != stat.st_mtime_ns or cached['size'] != stat.st_size:
+                stale.append(entry.path)
+                self._entries[entry.path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'info': None}
+
+        if stale:
+            if self.jobs > 1 and len(stale) >= PARALLEL_THRESHOLD:
+                with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                    infos = list(pool.map(scan_file, stale, chunksize=32))
+            else:
+                infos = [scan_file(path) for path in stale]
+            for path, info in zip(stale, infos):
+                self._entries[path]['info'] = info
+            self._dirty = True
+
+        removed = set(self._entries) - set(found)
+        for path in removed:
+            del self._entries[path]
+        self._dirty = self._dirty or bool(removed)
+
+        self._objects = {name: None for name in object_dirs}
+        self._fields = {name: {} for name in object_dirs}
+        self._paths = {}
+        for path in sorted(found):
+            object_name, field_name = found[path]
+            info = self._entries[path]['info']
+            self._paths[(object_name, field_name)] = path
+            if info is None:
+                continue
+            if field_name is None:
+                self._objects[object_name] = ObjectInfo(*info)
+            else:
+                self._fields[object_name][field_name] = FieldInfo(*info)
+        return self
+
+    def forget(self, path):
+        """Drop a file the caller removed, without rescanning."""
+        for key, known in list(self._paths.items()):
+            if known == path:
+                object_name, field_name = key
+                del self._paths[key]
+                if field_name is None:
+                    self._objects[object_name] = None
+                else:
+                    self._fields[object_name].pop(field_name, None)
+        if self._entries.pop(path, None) is not None:
+            self._dirty = True
+
+    # --- Queries ----------------------------------------------------------
+
+    def objects(self):
+        """Object directory names, sorted."""
+        return sorted(self._objects)
+
+    def has_object(self, object_name):
+        return object_name in self._objects
+
+    def object_info(self, object_name):
+        """ObjectInfo from <Object>.object-meta.xml, or None if the object has no such file."""
+        return self._objects.get(object_name)
+
+    def field_names(self, object_name):
+        return sorted(self._fields.get(object_name, {}))
+
+    def fields(self, object_name):
+        """[(field name, FieldInfo)] for an object, sorted by name."""
+        fields = self._fields.get(object_name, {})
+        return [(name, fields[name]) for name in sorted(fields)]
+
+    def field(self, object_name, field_name):
+        return self._fields.get(object_name, {}).get(field_name)
+
+    def has_field(self, object_name, field_name):
+        # Also true for a field file that failed to parse
+        return (object_name, field_name) in self._paths
+
+    def path(self, object_name, field_name=None):
+        """Source file of an object (field_name=None) or field, or None."""
+        return self._paths.get((object_name, field_name))
+
+    def references(self, object_name):
+        """{field name: referenced object} for the object's Lookup and Master-Detail fields."""
+        return {name: info.reference_to for name, info in self.fields(object_name) if info.reference_to}
+
+    def referenced_by(self, target):
+        """[(object, field)] whose Lookup or Master-Detail fields point at `target`."""
+        return [(object_name, name)
+                for object_name in self.objects()
+                for name, info in self.fields(object_name)
+                if info.reference_to == target]
+
+    def relationship_names(self, object_name):
+        """{relationship name: field name} for the object's relationship fields."""
+        return {info.relationship_name: name for name, info in self.fields(object_name) if info.relationship_name}
@@ -0,0 +1,140 @@
+"""
+Single-pass writer for Salesforce metadata XML.
+
+Produces the same indented output the generators used to get from
+ET.tostring -> minidom.parseString -> toprettyxml(indent="    "), without
+the intermediate byte string or DOM.
+"""
+
+import hashlib
+import io
+import os
+
+METADATA_NS = 'http://soap.sforce.com/2006/04/metadata'
+XML_DECLARATION = '<?xml version="1.0" ?>\n'
+INDENT = '    '
+
+
+def escape(text):
+    # Same escaping minidom applies to text and attribute values. The ET -> expat
+    # round trip also normalised line endings, so do that here as well.
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+def local_name(tag):
+    # '{namespace}tag' -> ('namespace', 'tag')
+    if tag.startswith('{'):
+        ns, _, name = tag[1:].partition('}')
+        return ns, name
+    return None, tag
+
+
+class MetadataWriter:
+    """Streams indented metadata XML to `out` (a text file or StringIO)."""
+
+    def __init__(self, out=None, declaration=XML_DECLARATION, indent=INDENT):
+        self.out = out if out is not None else io.StringIO()
+        self.indent = indent
+        self.stack = []
+        # True while the last start tag is still waiting for its '>' (so an
+        # element without children can be closed as '<tag/>')
+        self.pending = False
+        if declaration:
+            self.out.write(declaration)
+
+    def _close_pending(self):
+        if self.pending:
+            self.out.write('>\n')
+            self.pending = False
+
+    def _open(self, tag, attrib):
+        self._close_pending()
+        self.out.write(self.indent * len(self.stack) + '<' + tag)
+        for name, value in (attrib or {}).items():
+            self.out.write(f' {name}="{escape(value)}"')
+
+    def start(self, tag, attrib=None):
+        self._open(tag, attrib)
+        self.stack.append(tag)
+        self.pending = True
+
+    def end(self):
+        tag = self.stack.pop()
+        if self.pending:
+            self.out.write('/>\n')
+            self.pending = False
+        else:
+            self.out.write(self.indent * len(self.stack) + f'</{tag}>\n')
+
+    def element(self, tag, text=None, attrib=None):
+        self._open(tag, attrib)
+        if text:
+            self.out.write(f'>{escape(text)}</{tag}>\n')
+        else:
+            self.out.write('/>\n')
+
+    def text(self, text):
+        # Mixed content inside an element that also has child elements
+        self._close_pending()
+        self.out.write(self.indent * len(self.stack) + escape(text) + '\n')
+
+    def getvalue(self):
+        return self.out.getvalue()
+
+
+def _write_tree(writer, elem, root=False):
+    ns, tag = local_name(elem.tag)
+    attrib = dict(elem.attrib)
+    if root and ns and 'xmlns' not in attrib:
+        attrib = {'xmlns': ns, **attrib}
+
+    children = list(elem)
+    if not children:
+        writer.element(tag, elem.text, attrib)
+        return
+
+    writer.start(tag, attrib)
+    # Whitespace-only text is indentation left over from a parsed file; the
+    # writer re-indents, so dropping it avoids the blank lines minidom emitted
+    if elem.text and elem.text.strip():
+        writer.text(elem.text)
+    for child in children:
+        _write_tree(writer, child)
+        if child.tail and child.tail.strip():
+            writer.text(child.tail)
+    writer.end()
+
+
+def tostring(elem, declaration=XML_DECLARATION):
+    """Serialize an ElementTree element as indented metadata XML."""
+    writer = MetadataWriter(declaration=declaration)
+    _write_tree(writer, elem, root=True)
+    return writer.getvalue()
+
+
+def write(path, elem, declaration=XML_DECLARATION):
+    """Serialize an ElementTree element straight to `path`."""
+    with open(path, 'w') as f:
+        _write_tree(MetadataWriter(f, declaration=declaration), elem, root=True)
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_file(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def write_if_changed(path, content):
+    """Write `content` unless the file already holds it; returns True if written."""
+    # Leave identical files untouched so git/source tracking don't see them
+    if hash_file(path) == hash_text(content):
+        return False
+    with open(path, 'w') as f:
+        f.write(content)
+    return True
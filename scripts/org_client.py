@@ -0,0 +1,320 @@
+"""
+Direct REST access to an org for the Python tooling.
+
+The sf CLI is only run once per org, for `sf org display --json`, to get
+the instance URL and access token; every call after that is an HTTP
+request on a pooled keep-alive connection instead of a new Node process.
+Responses are gzip-compressed on the wire and parsed from JSON. Dropped
+connections and 502/503/504 responses are retried with backoff for
+idempotent methods (GET, HEAD, PUT, DELETE); a POST or PATCH is only
+retried when it provably never reached the org (the connection could not
+be opened, or a pooled keep-alive connection had already been closed by
+the org), since composite and collection inserts are not idempotent. An
+expired session (401) is refreshed through the CLI once. Every request
+goes through the client's ApiScheduler (see api_scheduler), which limits
+how many are in flight and keeps a share of the org's daily API limits in
+reserve.
+
+    client = org_client.connect('my-org')      # shared per alias
+    client.query('SELECT Id FROM Room__c')     # all records, following locators
+    client.describe('Room__c')
+    client.get('limits')                       # relative to /services/data/vXX.X/
+
+connect() hands out one client per alias, so modules that take an
+org_alias keep their signatures and still share connections. An OrgClient
+can also be built from any base URL and token, e.g. a local stand-in for
+the API.
+"""
+
+import contextlib
+import gzip
+import http.client
+import json
+import queue
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import quote, urlsplit
+
+import api_scheduler
+from api_scheduler import ApiLimitError
+
+API_VERSION = '64.0'
+# Idle connections kept per client; more are opened on demand by parallel callers
+POOL_SIZE = 8
+RETRIES = 3
+RETRY_STATUSES = (502, 503, 504)
+# Methods that are safe to send twice; others are only retried if they never left
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+# How a pooled connection fails when the org closed it while it sat idle
+STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+TIMEOUT = 120
+# Request bodies above this many bytes are not timed by the scheduler
+LARGE_BODY = 1 << 20
+
+QueryPage = namedtuple('QueryPage', ['records', 'total_size', 'done', 'next_url'])
+
+
+class ApiError(Exception):
+    """A non-2xx response; `code` is Salesforce's errorCode when the body has one."""
+
+    def __init__(self, method, path, status, code, message):
+        super().__init__(f"{method} {path} failed: {status} {code or ''} {message}".replace('  ', ' '))
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def org_display(org_alias=None):
+    """`sf org display --json` result for an alias (or the default org)."""
+    command = ["sf", "org", "display", "--json"]
+    if org_alias:
+        command += ["--target-org", org_alias]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)['result']
+
+
+class OrgClient:
+    def __init__(self, instance_url, access_token, api_version=API_VERSION, org_alias=None, org_id=None,
+                 pool_size=POOL_SIZE, retries=RETRIES, timeout=TIMEOUT):
+        parts = urlsplit(instance_url)
+        self.instance_url = instance_url.rstrip('/')
+        self.access_token = access_token
+        self.api_version = api_version
+        self.org_alias = org_alias
+        self.org_id = org_id
+        self.retries = retries
+        self.timeout = timeout
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._token_lock = threading.Lock()
+        self.scheduler = api_scheduler.ApiScheduler(lambda: self.request('GET', 'limits', limit=None))
+
+    @classmethod
+    def from_org(cls, org_alias=None, **kwargs):
+        """Use the session of an org authenticated with the sf CLI."""
+        org = org_display(org_alias)
+        return cls(org['instanceUrl'], org['accessToken'], org_alias=org_alias, org_id=org.get('id'), **kwargs)
+
+    # --- Connections ------------------------------------------------------
+
+    def _connect(self):
+        if self._scheme == 'http':
+            return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _refresh_token(self, stale_token):
+        with self._token_lock:
+            # Another thread may have refreshed it already
+            if self.access_token == stale_token:
+                self.access_token = org_display(self.org_alias)['accessToken']
+
+    # --- HTTP -------------------------------------------------------------
+
+    def url_path(self, path):
+        """Full request path; paths not starting with /services/ are relative to the data API."""
+        if path.startswith('/services/'):
+            return path
+        return f"/services/data/v{self.api_version}/{path.lstrip('/')}"
+
+    def request(self, method, path, body=None, content_type='application/json', headers=None,
+                limit='DailyApiRequests'):
+        """
+        Send a request and return the parsed JSON body (or text for other content types).
+
+        The request waits for a slot from the client's scheduler and counts
+        against `limit`; limit=None sends it unscheduled.
+        """
+        path = self.url_path(path)
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        refreshed = False
+        stale_retried = False
+        attempt = 0
+        while True:
+            token = self.access_token
+            request_headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json',
+                               'Accept-Encoding': 'gzip', **(headers or {})}
+            if body is not None:
+                request_headers['Content-Type'] = content_type
+            # Large uploads are slow by nature; their latency says nothing about congestion
+            timed = body is None or len(body) < LARGE_BODY
+            with self._slot(limit, timed) as slot:
+                connection = self._connect() if stale_retried else self._checkout()
+                reused = connection.sock is not None
+                sent = False
+                response = None
+                try:
+                    if not reused:
+                        connection.connect()
+                    # From here on the org may have received (and acted on) the request
+                    sent = True
+                    connection.request(method, path, body=body, headers=request_headers)
+                    response = connection.getresponse()
+                    payload = response.read()
+                except (http.client.HTTPException, ConnectionError, TimeoutError, OSError) as error:
+                    connection.close()
+                    # The org closes idle keep-alive connections; a request that dies on one
+                    # before any response arrives was never read, so resend it once on a new one
+                    if reused and response is None and not stale_retried and isinstance(error, STALE_ERRORS):
+                        stale_retried = True
+                        continue
+                    slot.congested()
+                    # A POST/PATCH that may have been processed is not sent again:
+                    # inserts would be duplicated, so the caller has to reconcile
+                    if attempt >= self.retries or (sent and not idempotent):
+                        raise
+                    attempt += 1
+                    response = None
+                if response is not None and response.status in RETRY_STATUSES:
+                    slot.congested()
+            if response is None:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+            else:
+                self._checkin(connection)
+            self.scheduler.observe_usage(response.getheader('Sforce-Limit-Info'))
+            if response.getheader('Content-Encoding', '') == 'gzip':
+                payload = gzip.decompress(payload)
+            text = payload.decode('utf-8')
+            is_json = 'json' in response.getheader('Content-Type', '')
+
+            if 200 <= response.status < 300:
+                return (json.loads(text) if text else {}) if is_json else text
+            if response.status == 401 and not refreshed and self.org_alias is not None:
+                refreshed = True
+                self._refresh_token(token)
+                continue
+            if response.status in RETRY_STATUSES and idempotent and attempt < self.retries:
+                attempt += 1
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            code, message = None, text
+            if is_json and text:
+                error = json.loads(text)
+                if isinstance(error, list) and error:
+                    error = error[0]
+                if isinstance(error, dict):
+                    code, message = error.get('errorCode'), error.get('message', text)
+            if code == 'REQUEST_LIMIT_EXCEEDED':
+                if 'TotalRequests' in message:
+                    raise ApiLimitError(f"DailyApiRequests exhausted: {message}")
+                # Too many concurrent (long-running) requests: narrow the window and retry.
+                # The org rejected the request without running it, so this is safe for any method
+                self.scheduler.congested(slot)
+                if attempt < self.retries:
+                    attempt += 1
+                    time.sleep(min(2 ** attempt, 30))
+                    continue
+            raise ApiError(method, path, response.status, code, message)
+
+    def _slot(self, limit, timed):
+        if limit is None:
+            return contextlib.nullcontext(api_scheduler.Slot())
+        return self.scheduler.slot(limit, timed)
+
+    def get(self, path, headers=None):
+        return self.request('GET', path, headers=headers)
+
+    def post(self, path, body, headers=None):
+        return self.request('POST', path, body, headers=headers)
+
+    def patch(self, path, body, headers=None):
+        return self.request('PATCH', path, body, headers=headers)
+
+    # --- Resources ----------------------------------------------------------
+
+    def query_pages(self, soql, page_size=None, include_deleted=False, tooling=False):
+        """Yield a QueryPage per query locator page."""
+        resource = 'queryAll' if include_deleted else 'query'
+        if tooling:
+            resource = f'tooling/{resource}'
+        path = f"{resource}?q={quote(soql)}"
+        headers = {'Sforce-Query-Options': f'batchSize={page_size}'} if page_size else None
+        while path:
+            page = self.get(path, headers)
+            next_url = None if page.get('done', True) else page.get('nextRecordsUrl')
+            yield QueryPage(page.get('records', []), page.get('totalSize', 0), page.get('done', True), next_url)
+            path = next_url
+
+    def iter_records(self, soql, page_size=None, include_deleted=False, tooling=False):
+        for page in self.query_pages(soql, page_size, include_deleted, tooling):
+            yield from page.records
+
+    def query(self, soql, tooling=False):
+        """Every record matched by `soql` as a list."""
+        return list(self.iter_records(soql, tooling=tooling))
+
+    def describe(self, sobject_name):
+        return self.get(f"sobjects/{sobject_name}/describe")
+
+    def sobjects(self):
+        """The describeGlobal entry of every object in the org."""
+        return self.get("sobjects").get('sobjects', [])
+
+    def limits(self):
+        return self.request('GET', "limits", limit=None)
+
+    def composite_batch(self, requests, halt_on_error=False):
+        """Run up to 25 independent subrequests in one call; returns their results."""
+        body = {'batchRequests': requests, 'haltOnError': halt_on_error}
+        return self.post("composite/batch", body).get('results', [])
+
+    def composite(self, requests, all_or_none=True):
+        """Run dependent subrequests (referenceId / @{ref.id}) in one call; returns the subresponses."""
+        body = {'allOrNone': all_or_none, 'compositeRequest': requests}
+        return self.post("composite", body).get('compositeResponse', [])
+
+    def installed_packages(self):
+        """{package name: version number} of the installed managed packages (Tooling API)."""
+        soql = ("SELECT SubscriberPackage.Name, SubscriberPackageVersion.MajorVersion, "
+                "SubscriberPackageVersion.MinorVersion, SubscriberPackageVersion.PatchVersion, "
+                "SubscriberPackageVersion.BuildNumber FROM InstalledSubscriberPackage")
+        packages = {}
+        for record in self.iter_records(soql, tooling=True):
+            version = record['SubscriberPackageVersion']
+            packages[record['SubscriberPackage']['Name']] = '.'.join(
+                str(version[part]) for part in ('MajorVersion', 'MinorVersion', 'PatchVersion', 'BuildNumber'))
+        return packages
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def connect(org_alias=None, api_version=API_VERSION):
+    """The shared OrgClient of an alias (None: the sf CLI default org), created on first use."""
+    with _clients_lock:
+        key = (org_alias, api_version)
+        if key not in _clients:
+            _clients[key] = OrgClient.from_org(org_alias, api_version=api_version)
+        return _clients[key]
@@ -0,0 +1,255 @@
+"""
+Paginated record export shared by the backup exporters.
+
+Queries go through the REST query endpoint (on the pooled OrgClient of the
+org) and follow `nextRecordsUrl` (query locators) page by page, so only one page of records is held in
+memory. Records are written to disk as they arrive, either in the
+existing pretty-printed backup JSON layout or as NDJSON.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import columnar
+import org_client
+
+API_VERSION = org_client.API_VERSION
+# Records per query locator page (REST allows 200-2000)
+PAGE_SIZE = 2000
+FORMATS = ('json', 'ndjson', 'columnar')
+# Subrequests allowed in one composite/batch call
+COMPOSITE_BATCH_LIMIT = 25
+# Fields that identify one version of a record for RecordChecksum
+CHECKSUM_FIELDS = ('Id', 'SystemModstamp')
+
+
+def query_pages(org_alias, soql, page_size=PAGE_SIZE, include_deleted=False):
+    """Yield one list of records per query locator page.
+
+    include_deleted uses queryAll, which also returns records in the recycle
+    bin (IsDeleted = true).
+    """
+    for page in org_client.connect(org_alias).query_pages(soql, page_size, include_deleted):
+        yield page.records
+
+
+def iter_records(org_alias, soql, page_size=PAGE_SIZE, include_deleted=False):
+    for page in query_pages(org_alias, soql, page_size, include_deleted):
+        yield from page
+
+
+class RecordWriter:
+    """
+    Writes records incrementally; the file is only created once a record arrives.
+
+    Records go to a hidden temp file next to `output_file` that replaces it on
+    close(), so a failed export never leaves a half-written file behind or
+    clobbers the previous one. Leaving the `with` block on an exception
+    discards the temp file.
+    """
+
+    def __init__(self, output_file, sobject_name, fmt='json'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.output_file = output_file
+        self.sobject_name = sobject_name
+        self.fmt = fmt
+        self.count = 0
+        directory, name = os.path.split(output_file)
+        self.tmp_file = os.path.join(directory, f'.{name}.tmp')
+        self._f = None
+        self._columnar = columnar.ColumnarWriter(self.tmp_file, sobject_name) if fmt == 'columnar' else None
+
+    def write(self, record):
+        if self._columnar is not None:
+            self._columnar.write(record)
+            self.count += 1
+            return
+        if self._f is None:
+            self._f = open(self.tmp_file, 'w')
+            if self.fmt == 'json':
+                self._f.write('{\n  "records": [')
+        if self.fmt == 'json':
+            # Same layout json.dump(..., indent=2) produced for the whole document
+            body = json.dumps(record, indent=2).replace('\n', '\n    ')
+            self._f.write((',' if self.count else '') + '\n    ' + body)
+        else:
+            self._f.write(json.dumps(record) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self._columnar is not None:
+            self._columnar.close()
+        elif self._f is not None:
+            if self.fmt == 'json':
+                self._f.write('\n  ],\n')
+                self._f.write(f'  "totalSize": {self.count},\n')
+                self._f.write(f'  "object": {json.dumps(self.sobject_name)}\n}}')
+            self._f.close()
+            self._f = None
+        if self.count and os.path.exists(self.tmp_file):
+            os.replace(self.tmp_file, self.output_file)
+
+    def discard(self):
+        """Drop what was written; `output_file` is left as it was."""
+        if self._columnar is not None:
+            self._columnar.close()
+        elif self._f is not None:
+            self._f.close()
+            self._f = None
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def record_digest(record):
+    """sha256 of a record's Id and SystemModstamp."""
+    key = '|'.join(str(record.get(field) or '') for field in CHECKSUM_FIELDS)
+    return hashlib.sha256(key.encode('utf-8')).digest()
+
+
+class HighWaterMark:
+    """Latest SystemModstamp among the records added."""
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, record):
+        stamp = record.get('SystemModstamp')
+        # API timestamps share one fixed-width UTC format, so they sort as strings
+        if stamp and (self.value is None or stamp > self.value):
+            self.value = stamp
+
+
+class RecordChecksum:
+    """
+    Order-independent checksum of a set of records.
+
+    Per-record digests are summed modulo 2**256, so records can be added in
+    any order (query order and backup file order differ) without sorting or
+    holding them in memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._total = 0
+
+    def add(self, record):
+        self._total = (self._total + int.from_bytes(record_digest(record), 'big')) % (1 << 256)
+        self.count += 1
+
+    def update(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def hexdigest(self):
+        return f"{self._total:064x}"
+
+
+def export_query(org_alias, soql, output_file, sobject_name, fmt='json', page_size=PAGE_SIZE, checksum=None,
+                 watermark=None, include_deleted=False):
+    """Stream every record matched by `soql` into `output_file`; returns the record count.
+
+    Records are also added to `checksum` (a RecordChecksum) and `watermark`
+    (a HighWaterMark) when they are given.
+    """
+    records = iter_records(org_alias, soql, page_size, include_deleted)
+    return export_records(records, output_file, sobject_name, fmt, checksum, watermark)
+
+
+def export_records(records, output_file, sobject_name, fmt='json', checksum=None, watermark=None):
+    """export_query() for records from any source, e.g. column_groups.iter_records()."""
+    with RecordWriter(output_file, sobject_name, fmt) as writer:
+        for record in records:
+            writer.write(record)
+            if checksum is not None:
+                checksum.add(record)
+            if watermark is not None:
+                watermark.add(record)
+    return writer.count
+
+
+def read_records(path, fields=None):
+    """Iterate the records of a backup file written in any of FORMATS.
+
+    With `fields`, records only carry those fields; columnar files then only
+    decompress the columns asked for.
+    """
+    if path.endswith(columnar.EXTENSION):
+        yield from columnar.ColumnarReader(path).records(fields)
+        return
+    if path.endswith('.ndjson'):
+        with open(path, 'r') as f:
+            records = (json.loads(line) for line in f if line.strip())
+            yield from _project(records, fields)
+    else:
+        with open(path, 'r') as f:
+            yield from _project(json.load(f).get('records', []), fields)
+
+
+def _project(records, fields):
+    if fields is None:
+        yield from records
+        return
+    for record in records:
+        yield {field: record[field] for field in fields if field in record}
+
+
+def _timed(task, sobject_name, log):
+    started = time.monotonic()
+    return task(sobject_name, log), time.monotonic() - started
+
+
+def run_per_object(sobject_names, task, parallel=1, verb='Processing'):
+    """
+    Run task(sobject_name, log) for every object and return {name: count} in input order.
+
+    With parallel > 1 the tasks run on a thread pool; their output is buffered
+    and printed as each object finishes. How many of their requests reach the
+    org at once is up to the client's ApiScheduler, not `parallel`.
+    """
+    counts = {}
+    if parallel <= 1:
+        for sobject_name in sobject_names:
+            print(f"{verb} {sobject_name}...")
+            counts[sobject_name] = task(sobject_name, print)
+            print()
+        return counts
+
+    total = len(sobject_names)
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = {}
+        for sobject_name in sobject_names:
+            messages = []
+            future = pool.submit(_timed, task, sobject_name, messages.append)
+            futures[future] = (sobject_name, messages)
+        for done, future in enumerate(as_completed(futures), start=1):
+            sobject_name, messages = futures[future]
+            try:
+                counts[sobject_name], elapsed = future.result()
+            except Exception as e:
+                counts[sobject_name], elapsed = 0, 0.0
+                messages.append(f"  ✗ Error exporting {sobject_name}: {e}")
+            print(f"[{done}/{total}] {sobject_name} ({elapsed:.1f}s)")
+            for message in messages:
+                print(message)
+    return {name: counts[name] for name in sobject_names}
+
+
+def print_object_counts(counts):
+    """Per-object breakdown for the combined export summary."""
+    width = max((len(name) for name in counts), default=0)
+    for sobject_name, count in counts.items():
+        print(f"  {sobject_name:<{width}}  {count:>8}")
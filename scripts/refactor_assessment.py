@@ -1,6 +1,8 @@
 import os
 import shutil
 
+from metadata_index import MetadataIndex
+
 SOURCE_DIR = "force-app/main/default/objects/Assessment__c/fields"
 TARGET_DIR = "force-app/main/default/objects/Resident_Assessment__c/fields"
 
@@ -31,13 +33,13 @@ FIELDS_TO_MOVE = [
     "Opportunity__c.field-meta.xml" # Moving Opportunity link to instance too
 ]
 
-def move_fields():
+def move_fields(index):
     print("Moving fields...")
     for filename in FIELDS_TO_MOVE:
         src = os.path.join(SOURCE_DIR, filename)
         dst = os.path.join(TARGET_DIR, filename)
         
-        if os.path.exists(src):
+        if index.has_field("Assessment__c", filename.replace(".field-meta.xml", "")):
             shutil.move(src, dst)
             print(f"Moved {filename}")
         else:
@@ -62,14 +64,14 @@ def create_lookup_to_assessment():
     with open(os.path.join(TARGET_DIR, "Assessment_Type__c.field-meta.xml"), "w") as f:
         f.write(content)
 
-def update_assessment_archetype():
+def update_assessment_archetype(index):
     print("Updating Assessment__c archetype fields...")
     
     # 1. Rename Assessment_Type__c to Type__c (if it exists)
     old_type = os.path.join(SOURCE_DIR, "Assessment_Type__c.field-meta.xml")
     new_type = os.path.join(SOURCE_DIR, "Type__c.field-meta.xml")
     
-    if os.path.exists(old_type):
+    if index.has_field("Assessment__c", "Assessment_Type__c"):
         with open(old_type, "r") as f:
             data = f.read()
         
@@ -104,6 +106,9 @@ if __name__ == "__main__":
     if not os.path.exists(TARGET_DIR):
         os.makedirs(TARGET_DIR)
     
-    move_fields()
+    # One scan answers every "does this field exist" check below
+    index = MetadataIndex()
+    move_fields(index)
     create_lookup_to_assessment()
-    update_assessment_archetype()
+    update_assessment_archetype(index)
+    index.refresh().save()
@@ -0,0 +1,92 @@
+"""
+A local stand-in for the Salesforce REST API.
+
+Routes map (method, path) to responses that are served in turn, the last
+one repeating; a response is (status, body) or (status, body, headers),
+with dict/list bodies sent as JSON and strings as CSV. Every request is
+recorded as (method, path, headers, body). drop_connections() closes the
+server side of open keep-alive connections.
+
+    with StubServer() as server:
+        server.route('GET', '/services/data/v64.0/limits', (200, {}))
+        client = org_client.OrgClient(server.url, 'token')
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# The modules under test live in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+NOT_FOUND = (404, [{'errorCode': 'NOT_FOUND', 'message': 'no route'}])
+
+
+class StubServer:
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.connections = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                server.connections.append(self.connection)
+
+            def _serve(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                server.requests.append((self.command, self.path, dict(self.headers), body))
+                responses = server.routes.get((self.command, urlsplit(self.path).path)) or [NOT_FOUND]
+                response = responses.pop(0) if len(responses) > 1 else responses[0]
+                status, payload, headers = response if len(response) == 3 else (*response, {})
+                headers = dict(headers)
+                if isinstance(payload, (dict, list)):
+                    data, content_type = json.dumps(payload).encode(), 'application/json'
+                else:
+                    data, content_type = (payload or '').encode(), 'text/csv'
+                self.send_response(status)
+                self.send_header('Content-Type', headers.pop('Content-Type', content_type))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _serve
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self._httpd.server_address[1]}'
+
+    def route(self, method, path, *responses):
+        self.routes[(method, path)] = list(responses)
+
+    def calls(self, method, path):
+        """Recorded requests to one route."""
+        return [r for r in self.requests if r[0] == method and urlsplit(r[1]).path == path]
+
+    def drop_connections(self):
+        """Close every open client connection, as the org does with idle keep-alives."""
+        for connection in self.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connections = []
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from stub_server import StubServer
+
+import org_client
+from bulk_loader import BulkLoader, RowResult
+
+INGEST = '/services/data/v64.0/jobs/ingest'
+
+
+class BulkLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        client = org_client.OrgClient(self.server.url, 'token')
+        client.scheduler.fetch_limits = None
+        self.addCleanup(client.close)
+        self.loader = BulkLoader(client, poll_interval=0.01)
+
+    def test_insert_runs_a_job_and_maps_results(self):
+        self.server.route('POST', f'{INGEST}/', (200, {'id': '750A', 'state': 'Open'}))
+        self.server.route('PUT', f'{INGEST}/750A/batches', (201, ''))
+        self.server.route('PATCH', f'{INGEST}/750A/', (200, {'id': '750A', 'state': 'UploadComplete'}))
+        self.server.route('GET', f'{INGEST}/750A/',
+                          (200, {'id': '750A', 'state': 'InProgress'}),
+                          (200, {'id': '750A', 'state': 'JobComplete'}))
+        self.server.route('GET', f'{INGEST}/750A/successfulResults/',
+                          (200, 'sf__Id,sf__Created,Name,Active__c\n001A,true,Acme,true\n'))
+        self.server.route('GET', f'{INGEST}/750A/failedResults/',
+                          (200, 'sf__Id,sf__Error,Name,Active__c\n,REQUIRED_FIELD_MISSING:Name,,false\n'))
+
+        records = [{'Name': None, 'Active__c': False}, {'Name': 'Acme', 'Active__c': True}]
+        results = self.loader.insert('Account', records)
+
+        self.assertEqual(results, [
+            RowResult(False, None, 'REQUIRED_FIELD_MISSING:Name', records[0]),
+            RowResult(True, '001A', None, records[1]),
+        ])
+        (_, _, _, job), = self.server.calls('POST', f'{INGEST}/')
+        self.assertEqual(json.loads(job), {'object': 'Account', 'operation': 'insert',
+                                           'contentType': 'CSV', 'lineEnding': 'LF'})
+        (_, _, headers, upload), = self.server.calls('PUT', f'{INGEST}/750A/batches')
+        self.assertEqual(headers['Content-Type'], 'text/csv')
+        self.assertEqual(upload.decode(), 'Name,Active__c\n,false\nAcme,true\n')
+        (_, _, _, close), = self.server.calls('PATCH', f'{INGEST}/750A/')
+        self.assertEqual(json.loads(close), {'state': 'UploadComplete'})
+        self.assertEqual(len(self.server.calls('GET', f'{INGEST}/750A/')), 2)
+
+    def test_records_of_a_failed_job_report_its_error(self):
+        self.server.route('POST', f'{INGEST}/', (200, {'id': '750B', 'state': 'Open'}))
+        self.server.route('PUT', f'{INGEST}/750B/batches', (201, ''))
+        self.server.route('PATCH', f'{INGEST}/750B/', (200, {'id': '750B', 'state': 'UploadComplete'}))
+        self.server.route('GET', f'{INGEST}/750B/',
+                          (200, {'id': '750B', 'state': 'Failed', 'errorMessage': 'InvalidBatch'}))
+        self.server.route('GET', f'{INGEST}/750B/successfulResults/', (200, ''))
+        self.server.route('GET', f'{INGEST}/750B/failedResults/', (200, ''))
+
+        results = self.loader.upsert('Room__c', [{'Name__c': 'R1'}], 'Name__c')
+
+        self.assertEqual(results, [RowResult(False, None, 'InvalidBatch', {'Name__c': 'R1'})])
+        (_, _, _, job), = self.server.calls('POST', f'{INGEST}/')
+        self.assertEqual(json.loads(job)['externalIdFieldName'], 'Name__c')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import http.client
+import unittest
+from unittest import mock
+
+from stub_server import StubServer
+
+import org_client
+from api_scheduler import ApiLimitError
+
+DATA = '/services/data/v64.0'
+
+
+class RefusedOnce(http.client.HTTPConnection):
+    """A connection whose first connect fails, as when the org drops the TCP handshake."""
+    refused = 0
+
+    def connect(self):
+        if RefusedOnce.refused == 0:
+            RefusedOnce.refused += 1
+            raise ConnectionRefusedError('refused')
+        super().connect()
+
+
+class OrgClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        sleep = mock.patch('org_client.time.sleep')
+        sleep.start()
+        self.addCleanup(sleep.stop)
+        self.client = self.client_for()
+
+    def client_for(self, cls=org_client.OrgClient, **kwargs):
+        client = cls(self.server.url, 'token', **kwargs)
+        # No /limits calls; only the requests under test reach the server
+        client.scheduler.fetch_limits = None
+        self.addCleanup(client.close)
+        return client
+
+    def test_query_follows_next_records_url(self):
+        self.server.route('GET', f'{DATA}/query', (200, {
+            'totalSize': 3, 'done': False, 'nextRecordsUrl': f'{DATA}/query/01g-2000',
+            'records': [{'Id': '001A'}, {'Id': '001B'}]}))
+        self.server.route('GET', f'{DATA}/query/01g-2000', (200, {
+            'totalSize': 3, 'done': True, 'records': [{'Id': '001C'}]}))
+
+        records = list(self.client.iter_records('SELECT Id FROM Account', page_size=2))
+
+        self.assertEqual([r['Id'] for r in records], ['001A', '001B', '001C'])
+        (_, path, headers, _), = self.server.calls('GET', f'{DATA}/query')
+        self.assertIn('q=SELECT%20Id%20FROM%20Account', path)
+        self.assertEqual(headers['Sforce-Query-Options'], 'batchSize=2')
+
+    def test_expired_session_is_refreshed_once(self):
+        client = self.client_for(org_alias='stub')
+        self.server.route('GET', f'{DATA}/limits',
+                          (401, [{'errorCode': 'INVALID_SESSION_ID', 'message': 'Session expired'}]),
+                          (200, {}))
+        with mock.patch('org_client.org_display', return_value={'accessToken': 'fresh'}) as display:
+            self.assertEqual(client.get('limits'), {})
+
+        display.assert_called_once_with('stub')
+        tokens = [headers['Authorization'] for _, _, headers, _ in self.server.requests]
+        self.assertEqual(tokens, ['Bearer token', 'Bearer fresh'])
+
+    def test_unavailable_get_is_retried(self):
+        self.server.route('GET', f'{DATA}/sobjects', (503, 'Service Unavailable'), (200, {'sobjects': []}))
+
+        self.assertEqual(self.client.sobjects(), [])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_unavailable_post_is_not_retried(self):
+        self.server.route('POST', f'{DATA}/composite/graph', (503, 'Service Unavailable'))
+
+        with self.assertRaises(org_client.ApiError) as raised:
+            self.client.post('composite/graph', {'graphs': []})
+        self.assertEqual(raised.exception.status, 503)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_post_is_retried_when_it_was_never_sent(self):
+        client = self.client_for()
+        client._connect = lambda: RefusedOnce(client._host, client._port, timeout=client.timeout)
+        self.server.route('POST', f'{DATA}/composite/sobjects', (200, [{'success': True, 'id': '001A'}]))
+
+        self.assertEqual(client.post('composite/sobjects', {'records': []}), [{'success': True, 'id': '001A'}])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_post_is_resent_when_an_idle_connection_was_closed(self):
+        self.server.route('POST', f'{DATA}/composite/sobjects', (200, [{'success': True, 'id': '001A'}]))
+        self.client.post('composite/sobjects', {'records': []})
+        self.server.drop_connections()
+
+        self.assertEqual(self.client.post('composite/sobjects', {'records': []}), [{'success': True, 'id': '001A'}])
+        self.assertEqual(len(self.server.calls('POST', f'{DATA}/composite/sobjects')), 2)
+        self.assertEqual(self.client.scheduler.throttled, 0)
+
+    def test_concurrent_request_limit_backs_off_and_retries(self):
+        self.server.route('POST', f'{DATA}/composite/sobjects',
+                          (403, [{'errorCode': 'REQUEST_LIMIT_EXCEEDED',
+                                  'message': 'ConcurrentPerOrgLongTxn Limit exceeded'}]),
+                          (200, []))
+
+        self.assertEqual(self.client.post('composite/sobjects', {'records': []}), [])
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.client.scheduler.throttled, 1)
+
+    def test_daily_request_limit_stops(self):
+        self.server.route('GET', f'{DATA}/sobjects',
+                          (403, [{'errorCode': 'REQUEST_LIMIT_EXCEEDED',
+                                  'message': 'TotalRequests Limit exceeded.'}]))
+
+        with self.assertRaises(ApiLimitError):
+            self.client.sobjects()
+        self.assertEqual(len(self.server.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,56 +1,39 @@
-import json
-import subprocess
-import random
-
-def run_command(command):
-    print(f"Running: {command}")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
-    output = result.stdout
-    start_index = output.find('{')
-    if start_index == -1: return None
-    json_str = output[start_index:]
-    end_index = json_str.rfind('}') + 1
-    try:
-        data = json.loads(json_str[:end_index])
-        return data
-    except: return None
+import org_client
+from composite_writer import CompositeWriter, Graph
 
 def main():
+    client = org_client.connect()
+
     # 1. Get Property
-    prop_res = run_command('sf data query -q "SELECT Id FROM Property__c LIMIT 1" --json')
-    if not prop_res or not prop_res['result']['records']:
+    properties = client.query("SELECT Id FROM Property__c LIMIT 1")
+    if not properties:
         print("No Property found.")
         return
-    prop_id = prop_res['result']['records'][0]['Id']
+    prop_id = properties[0]['Id']
 
     # 2. Get Room
-    room_res = run_command(f'sf data query -q "SELECT Id FROM Room__c WHERE Property__c = \'{prop_id}\' LIMIT 1" --json')
-    if not room_res or not room_res['result']['records']:
+    rooms = client.query(f"SELECT Id FROM Room__c WHERE Property__c = '{prop_id}' LIMIT 1")
+    if not rooms:
         print("No Room found.")
         return
-    room_id = room_res['result']['records'][0]['Id']
-
-    # 3. Create Resident Account
-    acc_res = run_command('sf data create record -s Account -v "FirstName=Dummy LastName=Resident RecordTypeId=012KZ000000lBWxYAM" --json')
-    if not acc_res or 'result' not in acc_res:
-        print(f"Failed to create Account: {acc_res}")
-        return
-    acc_id = acc_res['result']['id']
-    print(f"Created Account: {acc_id}")
-
-    # 4. Create Resident Record
-    res_res = run_command(f'sf data create record -s Resident__c -v "Account__c=\'{acc_id}\' Current_Care_Home__c=\'{prop_id}\' Current_Room__c=\'{room_id}\' Resident_Status__c=Permanent" --json')
-    if not res_res or 'result' not in res_res:
-        print(f"Failed to create Resident__c: {res_res}")
-    else:
-        print(f"Created Resident__c: {res_res['result']['id']}")
+    room_id = rooms[0]['Id']
 
-    # 5. Create Enquiry
-    enq_res = run_command(f'sf data create record -s Enquiry__c -v "Prospective_Resident__c=\'{acc_id}\' Preferred_Location__c=\'{prop_id}\' Enquiry_Source__c=Website Status__c=New" --json')
-    if not enq_res or 'result' not in enq_res:
-        print(f"Failed to create Enquiry__c: {enq_res}")
-    else:
-        print(f"Created Enquiry__c: {enq_res['result']['id']}")
+    # 3. Resident Account, 4. Resident Record and 5. Enquiry in one graph:
+    # all three are created together or not at all
+    graph = Graph('verification')
+    acc_id = graph.add('Account', {'FirstName': 'Dummy', 'LastName': 'Resident',
+                                   'RecordTypeId': '012KZ000000lBWxYAM'}, 'newAccount')
+    graph.add('Resident__c', {'Account__c': acc_id, 'Current_Care_Home__c': prop_id,
+                              'Current_Room__c': room_id, 'Resident_Status__c': 'Permanent'}, 'newResident')
+    graph.add('Enquiry__c', {'Prospective_Resident__c': acc_id, 'Preferred_Location__c': prop_id,
+                             'Enquiry_Source__c': 'Website', 'Status__c': 'New'}, 'newEnquiry')
+    result = CompositeWriter(client).insert_graphs([graph])[graph.graph_id]
+    for reference_id, sobject, _ in graph.nodes:
+        row = result.results[reference_id]
+        if not row.success:
+            print(f"Failed to create {sobject}: {row.error}")
+        else:
+            print(f"Created {sobject}: {row.id}")
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,53 @@
-import csv
-
-CSV_FILE = 'colten_care_fields_master_list.csv'
-
-with open(CSV_FILE, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    print(f"HEADERS: {reader.fieldnames}")
-    for row in reader:
-        if row['Field API Name'] == 'Event_Category__c':
-            print(f"ROW: {row}")
-            print(f"Default Value: '{row.get('Default Value')}'")
-            print(f"Picklist Values: '{row.get('Picklist Values (pipe separated)')}'")
-            break
+import argparse
+
+from describe_cache import DescribeCache
+from field_specs import COLUMNS, group_by_object, load_field_specs, read_header
+
+parser = argparse.ArgumentParser(description='Inspect the normalized master field list.')
+parser.add_argument('--org', help='Also report master-list fields missing from this org (uses the describe cache)')
+args = parser.parse_args()
+
+headers = read_header()
+print(f"HEADERS: {headers}")
+if headers and headers[0].startswith('\ufeff'):
+    print("Note: the CSV starts with a UTF-8 BOM")
+expected = [column for column, _ in COLUMNS]
+actual = [header.lstrip('\ufeff') for header in headers]
+if actual != expected:
+    print("Warning: CSV headers differ from the columns field_specs expects")
+    for column in expected:
+        if column not in actual:
+            print(f"  missing: {column}")
+    for header in actual:
+        if header not in expected:
+            print(f"  unexpected: {header}")
+    if sorted(actual) == sorted(expected):
+        print("  (same columns, different order)")
+
+specs = load_field_specs()
+for spec in specs:
+    if spec.api_name == 'Event_Category__c':
+        print(f"ROW: {spec.to_dict()}")
+        print(f"Default Value: '{spec.default_value}'")
+        print(f"Picklist Values: '{spec.picklist_values}'")
+        break
+
+repaired = [spec for spec in specs if spec.repairs]
+print(f"Repaired rows: {len(repaired)}/{len(specs)}")
+for spec in repaired:
+    print(f"  {spec.key}: {'; '.join(spec.repairs)}")
+
+if args.org:
+    describes = DescribeCache(args.org)
+    specs_by_object = group_by_object(specs)
+    describes.revalidate(list(specs_by_object))
+    print(f"Fields missing from {args.org}:")
+    for object_name, object_specs in specs_by_object.items():
+        try:
+            deployed = {f['name'] for f in describes.fields(object_name)}
+        except Exception as e:
+            print(f"  {object_name}: describe failed ({e})")
+            continue
+        missing = [spec.api_name for spec in object_specs if spec.api_name not in deployed]
+        if missing:
+            print(f"  {object_name}: {', '.join(missing)}")